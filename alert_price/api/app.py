@@ -4,19 +4,36 @@ from pathlib import Path
 
 import asyncio
 import logging
-from contextlib import asynccontextmanager
+import os
+from contextlib import asynccontextmanager, suppress
 import uvicorn
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 
+from alert_price.api.middleware import RequestMetricsMiddleware
+from alert_price.api.owner_auth import OwnerAuth
 from alert_price.api.routers import router
+from alert_price.services.alert_engine import AlertEngine
+from alert_price.services.candle_history import CandleHistory
+from alert_price.services.database_gateway import DatabaseGateway
+from alert_price.services.leader_lease import LeaderLease
+from alert_price.services.ohlc_rollup import OHLCRollup
+from alert_price.services.local_price_cache import LocalPriceCache
+from alert_price.services.notification_dispatcher import (
+    NotificationDispatcher, create_webhook_session, sinks_from_env)
+from alert_price.services.price_broadcaster import PriceBroadcaster
 from alert_price.services.price_cache import PriceCache
-from alert_price.services.redis_client import init_redis
-from alert_price.utils.logger import setup_logging
+from alert_price.services.prices_request import (
+    PriceRequest, create_moex_session)
+from alert_price.services.tick_store import TickStore
+from alert_price.services.redis_client import (
+    close_redis, create_connection_pool, init_redis)
+from alert_price.utils.logger import ensure_logging, setup_logging
 from alert_price.services.event_loop_handler import (
-    handles_event_loop, stop_event)
+    POLL_INTERVAL, begin_leader_term, handles_event_loop,
+    handles_health_check, relay_snapshots, stop_event)
 
 logger = logging.getLogger(__name__)
 
@@ -24,23 +41,126 @@ BASE_DIR = Path(__file__).resolve().parent.parent.parent
 STATIC_DIR = BASE_DIR / "static"
 
 
+def _l1_cache_enabled() -> bool:
+    """Включен ли L1-кеш снимка цен (PRICE_L1_CACHE, по умолчанию да)."""
+    return os.environ.get("PRICE_L1_CACHE", "1").lower() not in (
+        "0", "false", "no", "off")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """ Запускает фоновые задачи """
+    """
+    Создает общие ресурсы приложения и запускает фоновые задачи.
+
+    Пул соединений Redis создается один раз и хранится в app.state,
+    зависимости выдают привязанный к нему PriceCache (или L1-кеш
+    перед ним для чтения снимка цен). Шлюз SQLite также открывается
+    один раз: при открытии применяются миграции схемы. Сессия HTTP
+    к MOEX живет все время работы приложения.
+
+    Опрос MOEX и проверку его доступности выполняет только процесс,
+    владеющий арендой ведущего в Redis. Остальные воркеры только
+    обслуживают чтение и ретранслируют подписчикам потока снимки,
+    записанные ведущим.
+
+    Оповещения о пересечении порогов доставляют воркеры диспетчера
+    (NOTIFY_*), при остановке им дается время отправить очереди.
 
-    task = None
+    Заголовок владельца X-Owner-Id принимается только от прокси,
+    заданного OWNER_PROXY_SECRET или OWNER_TRUSTED_PROXIES.
+
+    Логирование настраивается здесь, если приложение запущено через
+    CLI uvicorn (как в Dockerfile), а не из этого модуля.
+    """
+
+    ensure_logging()
+    tasks = []
+    candle_history = None
+    notifier = None
+    pool = create_connection_pool()
+    redis = None
+    database = DatabaseGateway()
+    moex_session = create_moex_session()
+    webhook_session = create_webhook_session()
     try:
         logger.info("Запуск цикла сопрограмм\n")
-        redis = await init_redis()
+        await database.open()
+        app.state.database = database
+        owner_auth = OwnerAuth.from_env()
+        app.state.owner_auth = owner_auth
+        if not owner_auth.enabled:
+            logger.info("Доверенный прокси не настроен (OWNER_PROXY_SECRET,"
+                        " OWNER_TRUSTED_PROXIES): списки владельцев "
+                        "X-Owner-Id отключены")
+        redis = await init_redis(pool)
         price_cache = PriceCache(redis)
-
-        task = asyncio.create_task(handles_event_loop(price_cache))
+        app.state.redis_pool = pool
+        app.state.price_cache = price_cache
+        app.state.local_price_cache = None
+        app.state.price_reader = price_cache
+        if _l1_cache_enabled():
+            local_cache = LocalPriceCache(
+                price_cache,
+                ttl=float(os.environ.get("PRICE_L1_TTL", POLL_INTERVAL)))
+            app.state.local_price_cache = local_cache
+            app.state.price_reader = local_cache
+            tasks.append(asyncio.create_task(
+                local_cache.listen_invalidations(stop_event)))
+        alert_engine = AlertEngine()
+        app.state.alert_engine = alert_engine
+        broadcaster = PriceBroadcaster()
+        app.state.price_broadcaster = broadcaster
+
+        price_request = PriceRequest(moex_session)
+        app.state.price_request = price_request
+        candle_history = CandleHistory(redis, moex_session,
+                                       price_request.sources)
+        app.state.candle_history = candle_history
+
+        tick_store = TickStore(redis)
+        app.state.tick_store = tick_store
+        ohlc_rollup = OHLCRollup(redis)
+        app.state.ohlc_rollup = ohlc_rollup
+
+        notifier = NotificationDispatcher(sinks_from_env(webhook_session))
+        notifier.start()
+        app.state.notifier = notifier
+
+        lease = LeaderLease(redis)
+        app.state.leader_lease = lease
+
+        def leader_tasks():
+            begin_leader_term(price_cache, alert_engine)
+            return [
+                handles_health_check(price_request),
+                handles_event_loop(price_cache, database, alert_engine,
+                                   broadcaster, price_request,
+                                   tick_store=tick_store,
+                                   rollup=ohlc_rollup, notifier=notifier)
+            ]
+
+        tasks.append(asyncio.create_task(lease.run(stop_event, leader_tasks)))
+        tasks.append(asyncio.create_task(relay_snapshots(
+            price_cache, broadcaster, lambda: lease.is_leader)))
         yield
     finally:
         stop_event.set()
-        task.cancel()
-        await redis.close()
-        await task
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with suppress(asyncio.CancelledError):
+                await task
+        if candle_history is not None:
+            await candle_history.close()
+        if notifier is not None:
+            await notifier.close()
+        if redis is not None:
+            await close_redis(redis, pool)
+        else:
+            await pool.disconnect()
+        await database.close()
+        await moex_session.close()
+        await webhook_session.close()
 
 app = FastAPI(
     lifespan=lifespan,
@@ -53,6 +173,8 @@ app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 app.include_router(router)
 
+app.add_middleware(RequestMetricsMiddleware)
+
 
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request,
@@ -83,4 +205,5 @@ async def general_exception_handler(request: Request, exc: Exception):
 if __name__ == "__main__":
     setup_logging()
     logger.info("Запуск сервера Uvicorn")
-    uvicorn.run(app, host="127.0.0.1", port=8088)
+    # log_config=None: логгеры uvicorn пишут через очередь setup_logging
+    uvicorn.run(app, host="127.0.0.1", port=8088, log_config=None)
@@ -1,32 +1,244 @@
 """Модуль для управления зависимостями (Dependency Injection) приложения.
 
-Содержит функции-провайдеры для создания и внедрения зависимостей,
+Содержит функции-провайдеры для внедрения зависимостей,
 связанных с кешированием цен и работой с Redis.
 
 Основные зависимости:
-- get_price_cache: Создает и возвращает экземпляр кеша цен
+- get_price_cache: Возвращает экземпляр кеша цен приложения
+- get_price_reader: Возвращает источник снимка цен (L1-кеш или PriceCache)
+- get_alert_engine: Возвращает индекс порогов оповещений
+- get_price_broadcaster: Возвращает рассыльщик потока цен
+- get_database: Возвращает шлюз базы данных приложения
+- get_owner_id: Возвращает владельца списка отслеживания
+- get_price_request: Возвращает клиент MOEX приложения
+- get_leader_lease: Возвращает аренду ведущего процесса
+- get_candle_history: Возвращает кеш истории свечей MOEX
+- get_tick_store: Возвращает хранилище тиков
+- get_ohlc_rollup: Возвращает свертку цен в свечи OHLC
+- get_notifier: Возвращает диспетчер оповещений
 """
 
-from alert_price.services.redis_client import init_redis
+from typing import Optional, Union
+
+from fastapi import Header, HTTPException, Request
+
+from alert_price.api.owner_auth import OwnerAuth
+from alert_price.services.alert_engine import AlertEngine
+from alert_price.services.candle_history import CandleHistory
+from alert_price.services.database_gateway import (
+    DEFAULT_OWNER, DatabaseGateway)
+from alert_price.services.leader_lease import LeaderLease
+from alert_price.services.local_price_cache import LocalPriceCache
+from alert_price.services.notification_dispatcher import (
+    NotificationDispatcher)
+from alert_price.services.ohlc_rollup import OHLCRollup
+from alert_price.services.price_broadcaster import PriceBroadcaster
 from alert_price.services.price_cache import PriceCache
+from alert_price.services.prices_request import PriceRequest
+from alert_price.services.tick_store import TickStore
+
 
+async def get_price_cache(request: Request) -> PriceCache:
+    """Возвращает экземпляр кеша цен приложения.
 
-async def get_price_cache() -> PriceCache:
-    """Создает и возвращает экземпляр кеша цен.
+    Кеш создается один раз в lifespan и привязан к общему пулу
+    соединений Redis (app.state.redis_pool), поэтому запрос не
+    открывает новых подключений и не выполняет PING.
 
-    Инициализирует подключение к Redis и создает на его основе
-    экземпляр PriceCache для работы с кешем биржевых цен.
+    Args:
+        request: Текущий запрос FastAPI.
 
     Returns:
-        PriceCache: Экземпляр кеша цен, связанный с Redis
+        PriceCache: Экземпляр кеша цен, связанный с пулом Redis
 
     Example:
-        >>> cache = await get_price_cache()
+        >>> cache = await get_price_cache(request)
         >>> prices = await cache.get_prices()
 
     Note:
-        Автоматически управляет подключением к Redis. Не требует
-        ручного закрытия соединения при использовании через FastAPI Depends.
+        Соединения возвращаются в пул после каждой команды и
+        закрываются при остановке приложения.
+    """
+    return request.app.state.price_cache
+
+
+async def get_price_reader(
+    request: Request
+) -> Union[LocalPriceCache, PriceCache]:
+    """Возвращает источник снимка цен для чтения.
+
+    Если включен L1-кеш (PRICE_L1_CACHE), снимок читается из памяти
+    воркера, иначе - напрямую из PriceCache.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        Union[LocalPriceCache, PriceCache]: Объект с методами
+        get_snapshot и get_meta.
+    """
+    return request.app.state.price_reader
+
+
+async def get_local_price_cache(request: Request):
+    """Возвращает L1-кеш снимка цен или None, если он отключен.
+
+    Args:
+        request: Текущий запрос FastAPI.
+    """
+    return request.app.state.local_price_cache
+
+
+async def get_alert_engine(request: Request) -> AlertEngine:
+    """Возвращает индекс порогов оповещений приложения.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        AlertEngine: Индекс, проверяемый фоновым циклом опроса цен.
+    """
+    return request.app.state.alert_engine
+
+
+async def get_price_broadcaster(request: Request) -> PriceBroadcaster:
+    """Возвращает рассыльщик снимков цен приложения.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        PriceBroadcaster: Рассыльщик, которому фоновый цикл публикует
+        снимок цен после каждого обновления.
+    """
+    return request.app.state.price_broadcaster
+
+
+async def get_database(request: Request) -> DatabaseGateway:
+    """Возвращает шлюз базы данных приложения.
+
+    Шлюз открывается один раз в lifespan, поэтому запрос берет
+    соединение из пула, а не открывает новое.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        DatabaseGateway: Открытый шлюз SQLite.
+    """
+    return request.app.state.database
+
+
+async def get_owner_id(
+    request: Request,
+    x_owner_id: Optional[str] = Header(
+        None, min_length=1, max_length=64, pattern=r"^[\w.@-]+$"),
+    x_proxy_secret: Optional[str] = Header(None)
+) -> str:
+    """Возвращает владельца списка отслеживания.
+
+    Владелец передается заголовком X-Owner-Id, который выставляет
+    прокси аутентификации. Заголовок принимается только от доверенного
+    прокси (app.state.owner_auth, см. owner_auth.py), иначе любой
+    клиент мог бы читать и менять чужой список. Без заголовка
+    используется общий список.
+
+    Args:
+        request: Текущий запрос FastAPI.
+        x_owner_id: Значение заголовка X-Owner-Id.
+        x_proxy_secret: Общий секрет прокси (заголовок X-Proxy-Secret).
+
+    Returns:
+        str: Идентификатор владельца.
+
+    Raises:
+        HTTPException: Если X-Owner-Id пришел не от доверенного
+            прокси (код 403).
+    """
+    if x_owner_id is None:
+        return DEFAULT_OWNER
+
+    owner_auth: Optional[OwnerAuth] = getattr(
+        request.app.state, "owner_auth", None)
+    client_host = request.client.host if request.client else None
+    if owner_auth is None or not owner_auth.is_trusted(client_host,
+                                                       x_proxy_secret):
+        raise HTTPException(
+            status_code=403,
+            detail="Заголовок X-Owner-Id принимается только от "
+                   "доверенного прокси")
+    return x_owner_id
+
+
+async def get_price_request(request: Request) -> PriceRequest:
+    """Возвращает клиент MOEX приложения.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        PriceRequest: Клиент с сессией на время жизни приложения и
+        результатом последней проверки доступности MOEX.
+    """
+    return request.app.state.price_request
+
+
+async def get_leader_lease(request: Request) -> LeaderLease:
+    """Возвращает аренду ведущего процесса (опрашивающего MOEX).
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        LeaderLease: Аренда этого процесса.
+    """
+    return request.app.state.leader_lease
+
+
+async def get_candle_history(request: Request) -> CandleHistory:
+    """Возвращает кеш истории свечей MOEX.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        CandleHistory: Кеш, общий для всех запросов процесса (на нем
+        объединяются одновременные запросы одной серии).
+    """
+    return request.app.state.candle_history
+
+
+async def get_tick_store(request: Request) -> TickStore:
+    """Возвращает хранилище тиков, которое пополняет поллер.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        TickStore: Хранилище тиков в Redis.
+    """
+    return request.app.state.tick_store
+
+
+async def get_ohlc_rollup(request: Request) -> OHLCRollup:
+    """Возвращает свертку цен в свечи OHLC.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        OHLCRollup: Свертка, из которой читаются свечи в Redis.
+    """
+    return request.app.state.ohlc_rollup
+
+
+async def get_notifier(request: Request) -> NotificationDispatcher:
+    """Возвращает диспетчер оповещений о пересечении порогов.
+
+    Args:
+        request: Текущий запрос FastAPI.
+
+    Returns:
+        NotificationDispatcher: Диспетчер с очередями получателей.
     """
-    redis = await init_redis()
-    return PriceCache(redis)
+    return request.app.state.notifier
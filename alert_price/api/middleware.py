@@ -0,0 +1,54 @@
+"""Промежуточные обработчики (ASGI middleware) приложения."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from alert_price.utils.metrics import Histogram
+
+HTTP_SECONDS = Histogram("http_request_duration_seconds",
+                         "Время до начала ответа по маршрутам",
+                         ("method", "route", "status"))
+
+
+class RequestMetricsMiddleware:
+    """Записывает время обработки запросов в HTTP_SECONDS.
+
+    Особенности работы:
+    - Метка route - шаблон маршрута (/api/bars/{ticker}), а не путь
+      запроса, поэтому число рядов метрики не зависит от тикеров
+    - Время измеряется до отправки заголовков ответа: для потоков
+      (SSE, выгрузки) учитывается подготовка, а не время передачи
+    - Чистый ASGI-обработчик, без буферизации тела ответа
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive,
+                       send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        recorded = False
+
+        def record(status: str) -> None:
+            nonlocal recorded
+            recorded = True
+            route = scope.get("route")
+            HTTP_SECONDS.labels(
+                scope["method"], getattr(route, "path", "unmatched"),
+                status).observe(time.perf_counter() - start)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and not recorded:
+                record(str(message["status"]))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                record("500")
@@ -0,0 +1,74 @@
+"""
+Модуль проверки источника заголовка владельца X-Owner-Id.
+
+Основные особенности:
+- Владельца списка отслеживания определяет прокси аутентификации,
+  само приложение пользователей не аутентифицирует
+- Заголовок X-Owner-Id принимается только от доверенного прокси:
+  с адреса из OWNER_TRUSTED_PROXIES (адреса и сети через запятую)
+  или с общим секретом OWNER_PROXY_SECRET в заголовке X-Proxy-Secret
+- Если ни то ни другое не настроено, X-Owner-Id не принимается ни от
+  кого и все запросы работают с общим списком
+"""
+
+import hmac
+import ipaddress
+import os
+from typing import Iterable, Optional, Tuple, Union
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class OwnerAuth:
+    """Проверка того, что X-Owner-Id выставил доверенный прокси."""
+
+    def __init__(self, secret: Optional[str] = None,
+                 trusted_proxies: Iterable[str] = ()):
+        """Инициализация проверки.
+
+        Args:
+            secret: Общий секрет прокси (заголовок X-Proxy-Secret).
+            trusted_proxies: Адреса или сети (CIDR) прокси.
+
+        Raises:
+            ValueError: Если адрес или сеть записаны с ошибкой.
+        """
+        self.secret = secret or None
+        self.trusted_proxies: Tuple[Network, ...] = tuple(
+            ipaddress.ip_network(item.strip(), strict=False)
+            for item in trusted_proxies if item.strip())
+
+    @classmethod
+    def from_env(cls) -> "OwnerAuth":
+        """Создает проверку из OWNER_PROXY_SECRET и OWNER_TRUSTED_PROXIES."""
+        return cls(os.environ.get("OWNER_PROXY_SECRET"),
+                   os.environ.get("OWNER_TRUSTED_PROXIES", "").split(","))
+
+    @property
+    def enabled(self) -> bool:
+        """Настроен ли хотя бы один способ доверия прокси."""
+        return self.secret is not None or bool(self.trusted_proxies)
+
+    def is_trusted(self, client_host: Optional[str],
+                   proxy_secret: Optional[str]) -> bool:
+        """Пришел ли запрос от доверенного прокси.
+
+        Args:
+            client_host: Адрес собеседника TCP-соединения.
+            proxy_secret: Значение заголовка X-Proxy-Secret.
+
+        Returns:
+            bool: True, если совпал секрет или адрес входит в сети
+            доверенных прокси.
+        """
+        if self.secret is not None and proxy_secret is not None and (
+                hmac.compare_digest(proxy_secret.encode(),
+                                    self.secret.encode())):
+            return True
+        if not self.trusted_proxies or not client_host:
+            return False
+        try:
+            address = ipaddress.ip_address(client_host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.trusted_proxies)
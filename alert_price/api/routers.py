@@ -1,17 +1,43 @@
 """Маршруты FastAPI."""
 
 import logging
+import zlib
+from urllib.parse import quote
 import aiosqlite
-import aiohttp
-from fastapi import APIRouter, Depends, Form, HTTPException, Request
-from fastapi.responses import HTMLResponse
+from fastapi import (
+    APIRouter, Depends, File, Form, Header, HTTPException, Query, Request,
+    Response, UploadFile)
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import List, Optional, Union
 
-from alert_price.api.depends import get_price_cache
+from alert_price.api.depends import (
+    get_alert_engine, get_candle_history, get_database, get_leader_lease,
+    get_local_price_cache, get_notifier, get_ohlc_rollup, get_owner_id,
+    get_price_broadcaster, get_price_cache, get_price_reader,
+    get_price_request, get_tick_store)
 from alert_price.api.schemas import TrackingParameters, DeleteResponse
+from alert_price.services.alert_engine import AlertEngine
+from alert_price.services.candle_history import CandleHistory
 from alert_price.services.database_gateway import DatabaseGateway
-from alert_price.services.price_cache import PriceCache
+from alert_price.services.event_loop_handler import POLL_INTERVAL
+from alert_price.services.leader_lease import LeaderLease
+from alert_price.services.local_price_cache import LocalPriceCache
+from alert_price.services.notification_dispatcher import (
+    NotificationDispatcher)
+from alert_price.services.ohlc_rollup import INTERVALS, OHLCRollup
+from alert_price.services.price_broadcaster import PriceBroadcaster
+from alert_price.services.price_cache import PriceCache, PriceSnapshot
+from alert_price.services.prices_request import PriceRequest
+from alert_price.services.tick_store import TickStore
+from alert_price.services.tracking_io import (
+    FIELDS as TRACKING_FIELDS, MEDIA_TYPES, encode_tracking_rows,
+    parse_tracking_parameters)
+from alert_price.utils.downsample import lttb
+from alert_price.utils.metrics import REGISTRY
+from alert_price.utils.fast_json import (
+    FastJSONResponse, dumps, encode_json_array)
 
 logger = logging.getLogger(__name__)
 
@@ -28,28 +54,362 @@ async def read_root(request: Request):
                                       context={"request": request})
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверяет, совпадает ли ETag с одним из значений If-None-Match."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _prices_etag(version: int, updated_at: Optional[datetime],
+                 variant: str) -> str:
+    """ETag снимка цен.
+
+    Время обновления входит в тег: опрос без изменений цен не меняет
+    версию, но меняет last_updated в теле ответа.
+    """
+    stamp = int(updated_at.timestamp() * 1000) if updated_at else 0
+    return f'"prices-{version}-{stamp}{variant}"'
+
+
+def _prices_cache_headers(etag: str, updated_at: Optional[datetime],
+                          next_poll_at: Optional[datetime] = None) -> dict:
+    """Заголовки кеширования ответа с ценами.
+
+    max-age равен времени до следующего опроса MOEX, который назначил
+    планировщик поллера (интервал зависит от фазы торгов и близости
+    цен к порогам), поэтому клиенты и обратные прокси не
+    перезапрашивают снимок, который не мог измениться. Без времени
+    следующего опроса max-age отсчитывается от POLL_INTERVAL.
+    """
+    max_age = 0
+    if next_poll_at is not None:
+        max_age = int(max((next_poll_at - datetime.now()).total_seconds(),
+                          0))
+    elif updated_at is not None:
+        elapsed = (datetime.now() - updated_at).total_seconds()
+        max_age = int(min(max(POLL_INTERVAL - elapsed, 0), POLL_INTERVAL))
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}, must-revalidate"
+    }
+
+
+def _parse_tickers(tickers: Optional[str]) -> Optional[List[str]]:
+    """Разбирает список тикеров через запятую без повторов.
+
+    Returns:
+        Optional[List[str]]: Тикеры в порядке запроса или None,
+        если фильтр не задан.
+    """
+    if tickers is None:
+        return None
+    parsed = [ticker.strip().upper() for ticker in tickers.split(",")]
+    return list(dict.fromkeys(ticker for ticker in parsed if ticker))
+
+
+# Закодированный полный снимок цен последней версии: {(версия, время): тело}
+_full_snapshot_body: dict = {}
+
+
+def _encode_full_snapshot(snapshot: PriceSnapshot) -> bytes:
+    """Кодирует полный снимок цен один раз на версию снимка."""
+    key = (snapshot.version, snapshot.updated_at)
+    body = _full_snapshot_body.get(key)
+    if body is None:
+        body = dumps({
+            "prices": snapshot.prices,
+            "version": snapshot.version,
+            "full": True,
+            "last_updated": (snapshot.updated_at.isoformat()
+                             if snapshot.updated_at else None)
+        })
+        _full_snapshot_body.clear()
+        _full_snapshot_body[key] = body
+    return body
+
+
 @router.get("/api/prices", response_model=None)
-async def get_prices(price_cache: PriceCache = Depends(get_price_cache)):
+async def get_prices(
+    since: Optional[int] = Query(None, ge=0),
+    tickers: Optional[str] = Query(None, max_length=20000),
+    if_none_match: Optional[str] = Header(None),
+    price_cache: PriceCache = Depends(get_price_cache),
+    price_reader: Union[LocalPriceCache, PriceCache] = Depends(
+        get_price_reader),
+    local_cache: Optional[LocalPriceCache] = Depends(get_local_price_cache)
+):
     """
     Возвращает кешированные цены акций с MOEX.
     response_model=None отключает автоматическую валидацию ответа
+
+    Ответ помечается ETag по версии и времени снимка. Если клиент прислал
+    совпадающий If-None-Match, возвращается 304 без чтения цен.
+    Полный снимок читается через L1-кеш воркера, если он включен, и
+    кодируется в JSON один раз на версию.
+
+    Args:
+        since: Версия снимка, которая уже есть у клиента. Если задана,
+            возвращаются только изменившиеся тикеры (или полный снимок,
+            если клиент отстал больше, чем хранит журнал изменений).
+            Удаленные из кеша тикеры приходят со значением null.
+        tickers: Тикеры через запятую. Если заданы, читаются только их
+            цены (HMGET или свежий L1-снимок), а в поле missing
+            перечисляются тикеры, которых нет в кеше.
     """
+    watchlist = _parse_tickers(tickers)
+    variant = "" if since is None else f"-since-{since}"
+    if watchlist is not None:
+        variant += f"-t{zlib.crc32(','.join(watchlist).encode()):08x}"
+    missing = None
     try:
-        prices = await price_cache.get_prices()
-        last_update = await price_cache.get_last_update_time()
-        return {
-            "prices": prices,
-            "last_updated": last_update.isoformat() if last_update else None
-        }
+        version, updated_at, next_poll_at = await price_reader.get_meta()
+        etag = _prices_etag(version, updated_at, variant)
+        if _etag_matches(if_none_match, etag):
+            return Response(
+                status_code=304,
+                headers=_prices_cache_headers(etag, updated_at,
+                                              next_poll_at))
+
+        if since is not None:
+            snapshot, full = await price_cache.get_changes_since(since)
+        elif watchlist is None:
+            snapshot = await price_reader.get_snapshot()
+            full = True
+        else:
+            snapshot = (local_cache.get_fresh()
+                        if local_cache is not None else None)
+            if snapshot is None:
+                snapshot, missing = await price_cache.get_prices_for(
+                    watchlist)
+            full = True
+
+        if watchlist is not None and missing is None:
+            prices = snapshot.prices
+            found = {ticker: prices[ticker]
+                     for ticker in watchlist if ticker in prices}
+            # В инкрементальном ответе отсутствие тикера означает
+            # "не изменился", поэтому missing возвращается только
+            # для полного снимка
+            missing = ([ticker for ticker in watchlist
+                        if ticker not in found] if full else [])
+            snapshot = PriceSnapshot(snapshot.version, found,
+                                     snapshot.updated_at,
+                                     snapshot.next_poll_at)
     except Exception as e:
         raise HTTPException(503, detail=str(e)) from e
 
+    headers = _prices_cache_headers(
+        _prices_etag(snapshot.version, snapshot.updated_at, variant),
+        snapshot.updated_at, snapshot.next_poll_at)
+    if since is None and watchlist is None:
+        return Response(_encode_full_snapshot(snapshot),
+                        media_type="application/json", headers=headers)
+
+    result = {
+        "prices": snapshot.prices,
+        "version": snapshot.version,
+        "full": full,
+        "last_updated": (snapshot.updated_at.isoformat()
+                         if snapshot.updated_at else None)
+    }
+    if missing is not None:
+        result["missing"] = missing
+    return FastJSONResponse(result, headers=headers)
+
+
+@router.get("/api/prices/stream")
+async def stream_prices(
+    price_reader: Union[LocalPriceCache, PriceCache] = Depends(
+        get_price_reader),
+    broadcaster: PriceBroadcaster = Depends(get_price_broadcaster)
+):
+    """
+    Поток обновлений цен в формате Server-Sent Events.
+
+    Фоновый цикл публикует снимок один раз за опрос MOEX, и он
+    рассылается всем подписчикам без обращений к Redis.
+    """
+    initial = None
+    if not broadcaster.has_snapshot:
+        try:
+            snapshot = await price_reader.get_snapshot()
+            initial = {
+                "prices": snapshot.prices,
+                "version": snapshot.version,
+                "last_updated": (snapshot.updated_at.isoformat()
+                                 if snapshot.updated_at else None)
+            }
+        except HTTPException:
+            logger.warning("Кеш цен пуст, поток начнется с heartbeat")
+
+    return StreamingResponse(
+        broadcaster.subscribe(initial),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.get("/api/prices/cache-stats")
+async def get_prices_cache_stats(
+    local_cache: Optional[LocalPriceCache] = Depends(get_local_price_cache)
+):
+    """Возвращает счетчики попаданий и промахов L1-кеша цен воркера."""
+    if local_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **local_cache.stats()}
+
+
+@router.get("/api/ticks", response_model=None)
+async def get_ticks(
+    tickers: str = Query(..., min_length=1, max_length=20000),
+    limit: int = Query(100, ge=1, le=1000),
+    since: Optional[float] = Query(None, ge=0),
+    tick_store: TickStore = Depends(get_tick_store)
+):
+    """
+    Возвращает последние изменения цен из локального хранилища тиков.
+
+    Args:
+        tickers: Тикеры через запятую.
+        limit: Максимум тиков одного тикера (самые свежие).
+        since: Только тики не раньше этого времени (unix, сек).
+
+    Returns:
+        {"ticks": {тикер: [[время в мс, цена], ...]}} по возрастанию
+        времени.
+    """
+    watchlist = _parse_tickers(tickers)
+    if not watchlist:
+        raise HTTPException(status_code=422, detail="Не заданы тикеры")
+    try:
+        ticks = await tick_store.read(watchlist, limit, since)
+    except Exception as e:
+        logger.error("Ошибка чтения тиков: %s", e)
+        raise HTTPException(503, detail="Ошибка доступа к данным.") from e
+    return FastJSONResponse({"ticks": ticks})
+
+
+@router.get("/api/bars/{ticker}", response_model=None)
+async def get_bars(
+    ticker: str,
+    interval: str = Query("1m", pattern="^(" + "|".join(INTERVALS) + ")$"),
+    since: Optional[float] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=5000),
+    rollup: OHLCRollup = Depends(get_ohlc_rollup)
+):
+    """
+    Возвращает свечи OHLC, построенные из цен поллера.
+
+    Args:
+        interval: Интервал свечей (1m, 5m, 1h, 1d).
+        since: Только свечи, начавшиеся не раньше (unix, сек).
+        limit: Максимум последних свечей.
+
+    Returns:
+        {"bars": [[начало, open, high, low, close], ...]}.
+    """
+    try:
+        bars = await rollup.get_bars(ticker.upper(), interval, since, limit)
+    except Exception as e:
+        logger.error("Ошибка чтения свечей: %s", e)
+        raise HTTPException(503, detail="Ошибка доступа к данным.") from e
+    return FastJSONResponse({"bars": [bar.as_list() for bar in bars]})
+
+
+@router.get("/api/chart/{ticker}", response_model=None)
+async def get_chart(
+    ticker: str,
+    source: str = Query("ticks",
+                        pattern="^(ticks|" + "|".join(INTERVALS) + ")$"),
+    points: int = Query(200, ge=3, le=5000),
+    since: Optional[float] = Query(None, ge=0),
+    tick_store: TickStore = Depends(get_tick_store),
+    rollup: OHLCRollup = Depends(get_ohlc_rollup)
+):
+    """
+    Возвращает ряд для графика, прореженный до points точек (LTTB).
+
+    Args:
+        source: Тики (ticks) или цены закрытия свечей интервала.
+        points: Максимальное число точек ответа.
+        since: Начало диапазона (unix, сек).
+
+    Returns:
+        {"points": [[время в мс, цена], ...], "total": точек до
+        прореживания}.
+    """
+    ticker = ticker.upper()
+    try:
+        if source == "ticks":
+            series = (await tick_store.read(
+                [ticker], tick_store.maxlen, since))[ticker]
+        else:
+            series = [(bar.start * 1000, bar.close) for bar in
+                      await rollup.get_bars(ticker, source, since)]
+    except Exception as e:
+        logger.error("Ошибка чтения ряда для графика: %s", e)
+        raise HTTPException(503, detail="Ошибка доступа к данным.") from e
+    return FastJSONResponse({"points": lttb(series, points),
+                             "total": len(series)})
+
+
+@router.get("/api/moex/health")
+async def get_moex_health(
+    price_request: PriceRequest = Depends(get_price_request)
+):
+    """Возвращает результат последней проверки доступности MOEX."""
+    return {
+        "healthy": price_request.healthy,
+        "checked_at": (datetime.fromtimestamp(
+            price_request.last_health_check).isoformat()
+            if price_request.last_health_check else None),
+        "error": price_request.last_health_error,
+        "boards": [source.board for source in price_request.sources],
+        "board_errors": price_request.source_errors
+    }
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Возвращает метрики процесса в текстовом формате Prometheus."""
+    return Response(REGISTRY.render(), media_type=REGISTRY.CONTENT_TYPE)
+
+
+@router.get("/api/poller/status")
+async def get_poller_status(
+    lease: LeaderLease = Depends(get_leader_lease)
+):
+    """Возвращает процесс, опрашивающий MOEX, и возраст его аренды."""
+    try:
+        return await lease.status()
+    except Exception as e:
+        logger.error("Ошибка чтения аренды ведущего: %s", e)
+        raise HTTPException(status_code=503,
+                            detail="Ошибка доступа к данным.") from e
+
+
+@router.get("/api/notifications/status")
+async def get_notifications_status(
+    notifier: NotificationDispatcher = Depends(get_notifier)
+):
+    """Возвращает очереди и счетчики доставки оповещений."""
+    return notifier.status()
+
 
 @router.post("/api/stock-alerts")
 async def create_stock_alert(
-    ticker: str = Form(...),
-    buy_price: str = Form(...),
-    sell_price: str = Form(...)
+    ticker: str = Form(..., min_length=1),
+    buy_price: float = Form(..., gt=0, allow_inf_nan=False),
+    sell_price: float = Form(..., gt=0, allow_inf_nan=False),
+    alert_engine: AlertEngine = Depends(get_alert_engine),
+    database: DatabaseGateway = Depends(get_database),
+    owner_id: str = Depends(get_owner_id)
 ):
     """
     Добавляет запись в бд.
@@ -58,6 +418,9 @@ async def create_stock_alert(
         ticker: тикер акции.
         buy_price: цена покупки.
         sell_price: цена продажи.
+        alert_engine: индекс порогов, помечаемый устаревшим.
+        database: шлюз базы данных приложения.
+        owner_id: владелец списка отслеживания.
     """
     parameters = TrackingParameters(
         ticker=ticker,
@@ -65,36 +428,126 @@ async def create_stock_alert(
         sell_price=sell_price
     )
 
-    async with DatabaseGateway() as gateway:
-        results = await gateway.save_share(parameters)
+    results = await database.save_share(parameters, owner_id)
+    alert_engine.mark_stale()
     if not results:
         return {"success": False, "error": "Нет данных для записи."}
 
     return {"success": True}
 
 
+@router.post("/api/stock-alerts/bulk")
+async def import_stock_alerts(
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Query(None, alias="format",
+                               pattern="^(csv|ndjson)$"),
+    alert_engine: AlertEngine = Depends(get_alert_engine),
+    database: DatabaseGateway = Depends(get_database),
+    owner_id: str = Depends(get_owner_id)
+):
+    """
+    Загружает список отслеживания из файла CSV или NDJSON.
+
+    Все прошедшие проверку строки записываются одной транзакцией,
+    ошибки проверки возвращаются построчно и не мешают загрузке
+    остальных строк.
+
+    Args:
+        file: Файл со строками ticker, buy_price, sell_price.
+        fmt: Формат файла. По умолчанию определяется по расширению
+            (.csv - CSV, иначе NDJSON).
+        alert_engine: Индекс порогов, помечаемый устаревшим.
+        database: Шлюз базы данных приложения.
+        owner_id: Владелец списка отслеживания.
+    """
+    if fmt is None:
+        fmt = ("csv" if (file.filename or "").lower().endswith(".csv")
+               else "ndjson")
+    try:
+        text = (await file.read()).decode("utf-8-sig")
+        result = parse_tracking_parameters(text, fmt)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    try:
+        imported = await database.save_shares(result.parameters, owner_id)
+    except aiosqlite.Error as e:
+        logger.error("Database error: %s", str(e))
+        raise HTTPException(
+            status_code=500,
+            detail="Произошла ошибка при загрузке списка отслеживания"
+        ) from e
+    if imported:
+        alert_engine.mark_stale()
+
+    return {
+        "success": True,
+        "imported": imported,
+        "rejected": result.rejected,
+        "errors": result.errors
+    }
+
+
+@router.get("/api/stock-alerts/export")
+async def export_stock_alerts(
+    fmt: str = Query("ndjson", alias="format", pattern="^(csv|ndjson)$"),
+    page_size: int = Query(1000, ge=1, le=10000),
+    database: DatabaseGateway = Depends(get_database),
+    owner_id: str = Depends(get_owner_id)
+):
+    """
+    Выгружает список отслеживания потоком в формате CSV или NDJSON.
+
+    Таблица читается страницами по page_size строк, поэтому выгрузка
+    не загружает всю таблицу в память.
+    """
+    async def pages():
+        header = fmt == "csv"
+        async for rows in database.iter_tracking_parameters(owner_id,
+                                                            page_size):
+            yield encode_tracking_rows(rows, fmt, header=header)
+            header = False
+        if header:
+            yield encode_tracking_rows([], fmt, header=True)
+
+    return StreamingResponse(
+        pages(),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition":
+                 f'attachment; filename="stock-alerts.{fmt}"'}
+    )
+
+
 @router.delete("/api/stock-alerts/{ticker}")
-async def delete_stock_alert(ticker: str) -> DeleteResponse:
+async def delete_stock_alert(
+    ticker: str,
+    alert_engine: AlertEngine = Depends(get_alert_engine),
+    database: DatabaseGateway = Depends(get_database),
+    owner_id: str = Depends(get_owner_id)
+) -> DeleteResponse:
     """
     Удаляет акцию из системы отслеживания по её тикеру.
 
     Args:
         ticker: Тикер акции для удаления (например: AAPL, GOOGL).
+        alert_engine: Индекс порогов, помечаемый устаревшим.
+        database: Шлюз базы данных приложения.
+        owner_id: Владелец списка отслеживания.
     """
     try:
-        async with DatabaseGateway() as gateway:
-            success = await gateway.delete_share(ticker)
-
-            if not success:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Акция с тикером {ticker} не найдена"
-                )
-
-            return DeleteResponse(
-                success=True,
-                message=f"Акция {ticker} успешно удалена"
+        success = await database.delete_share(ticker, owner_id)
+
+        if not success:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Акция с тикером {ticker} не найдена"
             )
+        alert_engine.mark_stale()
+
+        return DeleteResponse(
+            success=True,
+            message=f"Акция {ticker} успешно удалена"
+        )
 
     except aiosqlite.Error as e:
         logger.error("Database error: %s", str(e))
@@ -105,37 +558,129 @@ async def delete_stock_alert(ticker: str) -> DeleteResponse:
 
 
 @router.get("/api/tracked-stocks")
-async def get_tracked_stocks():
-    """Возвращает отслеживаемые акции из базы данных."""
-    async with DatabaseGateway() as gateway:
-        stocks = await gateway.get_all_tracked_stocks()
-    return [{
-        "ticker": stock.ticker,
-        "buy_price": stock.buy_price,
-        "sell_price": stock.sell_price
-    } for stock in stocks]
+async def get_tracked_stocks(
+    after: Optional[str] = Query(None, max_length=36),
+    limit: int = Query(100, ge=1, le=10000),
+    database: DatabaseGateway = Depends(get_database),
+    owner_id: str = Depends(get_owner_id)
+):
+    """
+    Возвращает страницу отслеживаемых акций владельца.
+
+    Страница читается пачками строк до отправки ответа (ошибка базы
+    возвращается кодом 500, а не обрезанным телом), соединение с
+    базой освобождается до передачи ответа. Пачки кодируются в JSON
+    по одной, без моделей Pydantic. Если страница заполнена, ее
+    последний тикер - курсор следующей страницы - передается в
+    заголовках X-Next-Cursor и Link (rel="next").
+
+    Args:
+        after: Курсор - последний тикер предыдущей страницы.
+        limit: Максимальное количество акций на странице.
+    """
+    headers = {}
+    try:
+        chunks = await database.fetch_tracked_stocks(owner_id, after, limit)
+    except aiosqlite.Error as e:
+        raise HTTPException(
+            status_code=500,
+            detail="Произошла ошибка при чтении списка акций") from e
+    if sum(len(rows) for rows in chunks) == limit:
+        page_end = chunks[-1][-1][0]
+        headers["X-Next-Cursor"] = page_end
+        headers["Link"] = (
+            f'</api/tracked-stocks?after={quote(page_end)}&limit={limit}>; '
+            f'rel="next"')
+
+    return Response(encode_json_array(chunks, TRACKING_FIELDS),
+                    media_type="application/json", headers=headers)
+
+
+# Максимум тикеров в одном пакетном запросе истории
+HISTORY_BATCH_MAX = 200
+
+
+def _downsample_closes(closes: List[float],
+                       points: Optional[int]) -> List[float]:
+    """Прореживает цены закрытия до points точек (LTTB)."""
+    if points is None:
+        return closes
+    return [price for _, price in lttb(list(enumerate(closes)), points)]
+
+
+@router.get("/api/stock-history", response_model=None)
+async def get_stocks_history(
+    tickers: str = Query(..., min_length=1, max_length=20000),
+    points: Optional[int] = Query(None, ge=3, le=1000),
+    candle_history: CandleHistory = Depends(get_candle_history)
+):
+    """
+    Возвращает историю нескольких тикеров одним ответом.
+
+    Серии из кеша отдаются сразу, недостающие запрашиваются у MOEX
+    параллельно с ограничением CANDLE_CONCURRENCY. Ошибка одного тикера
+    не прерывает ответ: она возвращается в поле errors.
+
+    Args:
+        tickers: Тикеры через запятую (не больше HISTORY_BATCH_MAX).
+        points: Число точек каждого ряда после прореживания (LTTB).
+
+    Returns:
+        {"prices": {тикер: [цены закрытия]}, "errors": {тикер: ошибка}}.
+    """
+    watchlist = _parse_tickers(tickers)
+    if not watchlist or len(watchlist) > HISTORY_BATCH_MAX:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Нужно от 1 до {HISTORY_BATCH_MAX} тикеров")
+
+    try:
+        results = await candle_history.get_many(watchlist)
+    except Exception as e:
+        logger.error("Ошибка при получении исторических данных: %s", e)
+        raise HTTPException(503, detail="Ошибка доступа к данным.") from e
+
+    prices = {}
+    errors = {}
+    for ticker, series in results.items():
+        if isinstance(series, KeyError):
+            errors[ticker] = "Режим торгов тикера не настроен"
+        elif isinstance(series, Exception):
+            logger.warning("История %s недоступна: %s", ticker, series)
+            errors[ticker] = "Ошибка при получении исторических данных"
+        elif not series.candles:
+            errors[ticker] = "Нет исторических данных"
+        else:
+            prices[ticker] = _downsample_closes(series.closes, points)
+    return FastJSONResponse({"prices": prices, "errors": errors})
 
 
 @router.get("/api/stock-history/{ticker}")
-async def get_stock_history(ticker: str):
+async def get_stock_history(
+    ticker: str,
+    response: Response,
+    points: Optional[int] = Query(None, ge=3, le=1000),
+    candle_history: CandleHistory = Depends(get_candle_history)
+):
     """
     Возвращает исторические данные акции за последние 2 дня (1-часовые свечи).
+
+    Серия берется из кеша Redis и обновляется из MOEX не чаще раза в
+    CANDLE_FRESH_TTL секунд; устаревшая серия отдается сразу и
+    обновляется в фоне (заголовок X-Cache: hit, stale или miss).
+    Если задан points, ряд прореживается до points точек (LTTB).
     """
     try:
-        async with aiohttp.ClientSession() as session:
-            from_date = (datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d')
-            url = (
-                f"http://iss.moex.com/iss/engines/stock/markets/shares/boards/TQBR/"
-                f"securities/{ticker}/candles.json?interval=60&from={from_date}&iss.meta=off&iss.only=candles&candles.columns=close"
-            )
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise HTTPException(status_code=404, detail=f"Данные для тикера {ticker} не найдены")
-                data = await response.json()
-                if not data.get("candles", {}).get("data"):
-                    raise HTTPException(status_code=404, detail=f"Нет исторических данных для тикера {ticker}")
-                prices = [candle[0] for candle in data["candles"]["data"]]
-                return {"prices": prices}
-    except Exception as e:
+        series = await candle_history.get(ticker)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Данные для тикера {ticker} не найдены")
+    except ValueError as e:
         logger.error("Ошибка при получении исторических данных: %s", str(e))
-        raise HTTPException(status_code=500, detail="Ошибка при получении исторических данных")
+        raise HTTPException(status_code=502, detail="Ошибка при получении исторических данных")
+
+    if not series.candles:
+        raise HTTPException(status_code=404, detail=f"Нет исторических данных для тикера {ticker}")
+    response.headers["X-Cache"] = series.cache_status
+    response.headers["Cache-Control"] = (
+        f"private, max-age={int(candle_history.fresh_ttl)}")
+    return {"prices": _downsample_closes(series.closes, points)}
@@ -1,20 +1,25 @@
 "Содержит модели Pydantic."
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TrackingParameters(BaseModel):
     """
     Модель для входных данных списка отслеживания.
 
+    Цены принимаются и строками ("245.5"), но хранятся числами и
+    должны быть конечными и больше нуля.
+
     Атрибуты:
         ticker (str): Тикер акции.
-        buy_price (str): Цена покупки акций.
-        sell_price (str): Цена продажи акций.
+        buy_price (float): Цена покупки акций.
+        sell_price (float): Цена продажи акций.
     """
-    ticker: str
-    buy_price: str
-    sell_price: str
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    ticker: str = Field(min_length=1, max_length=36)
+    buy_price: float = Field(gt=0, allow_inf_nan=False)
+    sell_price: float = Field(gt=0, allow_inf_nan=False)
 
 
 class DeleteResponse(BaseModel):
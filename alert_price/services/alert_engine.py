@@ -0,0 +1,206 @@
+"""
+Модуль серверного контроля пересечения ценовых порогов.
+
+Основные особенности:
+- Пороги каждого тикера хранятся в отсортированных списках
+- За один тик просматриваются только пороги между старой и новой ценой
+  (bisect, O(log n + k))
+- Цена покупки срабатывает при падении цены до порога,
+  цена продажи - при росте до порога
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import datetime
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_threshold = itemgetter(0)
+
+
+@dataclass(frozen=True, slots=True)
+class CrossingEvent:
+    """Событие пересечения ценового порога.
+
+    Атрибуты:
+        alert_id: Идентификатор записи в tracking_parameters.
+        ticker: Тикер акции.
+        direction: "buy" - цена опустилась до цены покупки,
+            "sell" - цена поднялась до цены продажи.
+        threshold: Пересеченный порог.
+        price: Новая цена.
+        previous_price: Цена на предыдущем тике.
+        time: Время обнаружения пересечения.
+    """
+    alert_id: int
+    ticker: str
+    direction: str
+    threshold: float
+    price: float
+    previous_price: float
+    time: datetime
+
+
+class AlertEngine:
+    """Индекс порогов отслеживания с поиском пересечений.
+
+    Особенности работы:
+    - Индекс строится из строк (id, ticker, buy_price, sell_price)
+    - Первая цена тикера только запоминается, событий не порождает
+    - После изменения списка отслеживания индекс помечается устаревшим
+      и перестраивается владельцем перед следующим тиком
+    """
+
+    BUY = "buy"
+    SELL = "sell"
+
+    def __init__(self):
+        """Инициализация пустого индекса."""
+        # {тикер: [(порог, id), ...]} отсортировано по порогу
+        self._buy_index: Dict[str, List[Tuple[float, int]]] = {}
+        self._sell_index: Dict[str, List[Tuple[float, int]]] = {}
+        self._last_prices: Dict[str, float] = {}
+        self._stale = True
+        # Отпечаток таблицы порогов, из которой построен индекс
+        self.source_version = None
+
+    @property
+    def is_stale(self) -> bool:
+        """Требуется ли перестроить индекс из базы данных."""
+        return self._stale
+
+    def mark_stale(self) -> None:
+        """Помечает индекс устаревшим после изменения списка отслеживания."""
+        self._stale = True
+
+    def reset(self) -> None:
+        """Забывает последние цены тикеров и помечает индекс устаревшим.
+
+        Вызывается, когда процесс снова становится ведущим: цены его
+        прошлого срока могли устареть, и сравнение с ними породило бы
+        пересечения, которых не было.
+        """
+        self._last_prices = {}
+        self._stale = True
+
+    def __len__(self) -> int:
+        """Количество порогов в индексе."""
+        return (sum(map(len, self._buy_index.values()))
+                + sum(map(len, self._sell_index.values())))
+
+    def load(self, rows: Iterable[tuple], source_version=None) -> None:
+        """Перестраивает индекс порогов.
+
+        Args:
+            rows: Строки (id, ticker, buy_price, sell_price).
+            source_version: Отпечаток таблицы порогов, по которому
+                владелец определяет, что индекс устарел.
+        """
+        buy_index: Dict[str, List[Tuple[float, int]]] = {}
+        sell_index: Dict[str, List[Tuple[float, int]]] = {}
+        skipped = 0
+
+        for alert_id, ticker, buy_price, sell_price in rows:
+            try:
+                buy = float(buy_price)
+                sell = float(sell_price)
+            except (TypeError, ValueError):
+                skipped += 1
+                continue
+            buy_index.setdefault(ticker, []).append((buy, alert_id))
+            sell_index.setdefault(ticker, []).append((sell, alert_id))
+
+        for entries in buy_index.values():
+            entries.sort()
+        for entries in sell_index.values():
+            entries.sort()
+
+        self._buy_index = buy_index
+        self._sell_index = sell_index
+        self._stale = False
+        self.source_version = source_version
+
+        if skipped:
+            logger.warning("Пропущено порогов с некорректной ценой: %s",
+                           skipped)
+        logger.info("Индекс порогов построен: %s тикеров, %s порогов",
+                    len(buy_index), len(self))
+
+    def nearest_gap(self, prices: Dict[str, float]) -> Optional[float]:
+        """Находит минимальное относительное расстояние от цены до порога.
+
+        Args:
+            prices: Словарь {тикер: цена}.
+
+        Returns:
+            Optional[float]: |цена - порог| / цена для ближайшего порога
+            или None, если у тикеров из prices нет порогов.
+        """
+        nearest = None
+        for ticker, price in prices.items():
+            if price <= 0:
+                continue
+            for index in (self._buy_index, self._sell_index):
+                entries = index.get(ticker)
+                if not entries:
+                    continue
+                position = bisect_left(entries, price, key=_threshold)
+                for entry in entries[max(position - 1, 0):position + 1]:
+                    gap = abs(price - entry[0]) / price
+                    if nearest is None or gap < nearest:
+                        nearest = gap
+        return nearest
+
+    def process(self, prices: Dict[str, float],
+                now: Optional[datetime] = None) -> List[CrossingEvent]:
+        """Находит пороги, пересеченные при переходе к новым ценам.
+
+        Args:
+            prices: Словарь {тикер: цена} текущего цикла опроса.
+            now: Время тика (по умолчанию текущее).
+
+        Returns:
+            List[CrossingEvent]: События пересечения порогов.
+        """
+        now = now or datetime.now()
+        events = []
+        last_prices = self._last_prices
+
+        for ticker, price in prices.items():
+            previous = last_prices.get(ticker)
+            last_prices[ticker] = price
+            if previous is None or previous == price:
+                continue
+
+            if price < previous:
+                # Падение: срабатывают цены покупки в [price, previous)
+                entries = self._buy_index.get(ticker)
+                if not entries:
+                    continue
+                lo = bisect_left(entries, price, key=_threshold)
+                hi = bisect_left(entries, previous, lo, key=_threshold)
+                direction = self.BUY
+            else:
+                # Рост: срабатывают цены продажи в (previous, price]
+                entries = self._sell_index.get(ticker)
+                if not entries:
+                    continue
+                lo = bisect_right(entries, previous, key=_threshold)
+                hi = bisect_right(entries, price, lo, key=_threshold)
+                direction = self.SELL
+
+            for threshold, alert_id in entries[lo:hi]:
+                events.append(CrossingEvent(
+                    alert_id=alert_id,
+                    ticker=ticker,
+                    direction=direction,
+                    threshold=threshold,
+                    price=price,
+                    previous_price=previous,
+                    time=now
+                ))
+
+        return events
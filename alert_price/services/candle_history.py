@@ -0,0 +1,296 @@
+"""
+Модуль кеширования истории свечей MOEX.
+
+Основные особенности:
+- Серия свечей хранится в Redis по ключу (режим, тикер, интервал) и
+  общая для всех воркеров
+- При обновлении запрашиваются только свечи, начиная с последней
+  сохраненной (она могла еще формироваться), старые отбрасываются по
+  окну истории
+- Одновременные запросы одной серии в процессе ждут один запрос к
+  MOEX (single-flight)
+- Устаревшая серия отдается сразу, а обновляется в фоне
+  (stale-while-revalidate)
+- Число одновременных запросов свечей к MOEX ограничено семафором,
+  серии нескольких тикеров читаются из Redis одной командой MGET
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import aiohttp
+from redis.asyncio import Redis
+
+from alert_price.services.iss_parser import column_indexes
+from alert_price.services.prices_request import (
+    DEFAULT_SOURCES, PRIMARY_BOARD, MarketSource)
+from alert_price.utils.fast_json import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CandleSeries:
+    """Серия свечей одного тикера.
+
+    Атрибуты:
+        candles: Пары (начало свечи, цена закрытия) по возрастанию.
+        fetched_at: Время последнего обновления из MOEX (unix).
+        cache_status: "hit" - свежая серия из кеша, "stale" - устаревшая
+            (обновляется в фоне), "miss" - серия только что получена.
+    """
+    candles: List[Tuple[str, float]]
+    fetched_at: float
+    cache_status: str = "hit"
+
+    @property
+    def closes(self) -> List[float]:
+        """Цены закрытия свечей."""
+        return [close for _, close in self.candles]
+
+
+class CandleHistory:
+    """Кеш истории свечей MOEX в Redis.
+
+    Особенности работы:
+    - Серия моложе fresh_ttl отдается без обращения к MOEX
+    - Тикер вида "<режим>:<тикер>" ищется в режиме торгов из sources,
+      тикер без префикса - в PRIMARY_BOARD
+    - Если MOEX недоступен, отдается последняя сохраненная серия
+    """
+
+    CANDLES_URL = ("http://iss.moex.com/iss/engines/{engine}/markets/"
+                   "{market}/boards/{board}/securities/{ticker}/"
+                   "candles.json")
+
+    def __init__(self, redis_client: Redis, session: aiohttp.ClientSession,
+                 sources: Iterable[MarketSource] = DEFAULT_SOURCES,
+                 days: float = None, fresh_ttl: float = None,
+                 concurrency: int = None, key_prefix: str = "moex:candles"):
+        """Инициализация кеша.
+
+        Незаданные параметры берутся из переменных окружения.
+
+        Args:
+            redis_client: Асинхронный клиент Redis.
+            session: Сессия HTTP приложения к MOEX.
+            sources: Режимы торгов, для которых отдается история.
+            days: Глубина истории (дней, CANDLE_HISTORY_DAYS).
+            fresh_ttl: Время (сек), в течение которого серия не
+                обновляется (CANDLE_FRESH_TTL).
+            concurrency: Максимум одновременных запросов свечей к MOEX
+                (CANDLE_CONCURRENCY).
+            key_prefix: Префикс ключей Redis.
+        """
+        self.redis = redis_client
+        self.session = session
+        self.sources: Dict[str, MarketSource] = {
+            source.board: source for source in sources}
+        self.days = float(days or os.environ.get("CANDLE_HISTORY_DAYS", 2))
+        self.fresh_ttl = float(
+            fresh_ttl or os.environ.get("CANDLE_FRESH_TTL", 60))
+        self.key_prefix = key_prefix
+        self._semaphore = asyncio.Semaphore(int(
+            concurrency or os.environ.get("CANDLE_CONCURRENCY", 8)))
+
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+        # Счетчики для оценки нагрузки на MOEX
+        self.upstream_requests = 0
+        self.coalesced_requests = 0
+
+    def _source(self, ticker: str) -> Tuple[MarketSource, str]:
+        """Режим торгов и код бумаги для тикера из кеша цен.
+
+        Raises:
+            KeyError: Если режим торгов тикера не настроен.
+        """
+        board, _, secid = ticker.rpartition(":")
+        return self.sources[board or PRIMARY_BOARD], secid
+
+    def _key(self, ticker: str, interval: int) -> str:
+        source, secid = self._source(ticker)
+        return f"{self.key_prefix}:{source.board}:{secid}:{interval}"
+
+    def _cutoff(self) -> str:
+        """Начало окна истории (дата, как в запросе from)."""
+        return (datetime.now() - timedelta(days=self.days)).strftime(
+            "%Y-%m-%d")
+
+    @staticmethod
+    def _decode(raw: Optional[bytes]) -> Optional[CandleSeries]:
+        """Декодирует серию, сохраненную _refresh()."""
+        if raw is None:
+            return None
+        data = loads(raw)
+        return CandleSeries([tuple(candle) for candle in data["candles"]],
+                            data["fetched_at"])
+
+    async def _request(self, ticker: str, interval: int,
+                       since: str) -> List[Tuple[str, float]]:
+        """Запрашивает у MOEX свечи, начиная с since.
+
+        Raises:
+            ValueError: Если MOEX не ответил или вернул некорректные
+                данные.
+        """
+        source, secid = self._source(ticker)
+        url = self.CANDLES_URL.format(engine=source.engine,
+                                      market=source.market,
+                                      board=source.board, ticker=secid)
+        params = {"interval": interval, "from": since, "iss.meta": "off",
+                  "iss.only": "candles", "candles.columns": "begin,close"}
+        try:
+            async with self._semaphore:
+                self.upstream_requests += 1
+                async with self.session.get(url,
+                                            params=params) as response:
+                    response.raise_for_status()
+                    body = await response.read()
+            block = loads(body)["candles"]
+            begin_index, close_index = column_indexes(
+                block, ("begin", "close"))
+            return [(row[begin_index], float(row[close_index]))
+                    for row in block["data"]]
+        except (aiohttp.ClientError, TimeoutError) as e:
+            raise ValueError(f"Не удалось получить свечи {ticker} "
+                             f"с MOEX: {e}") from e
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise ValueError(f"Некорректные свечи {ticker} от MOEX: "
+                             f"{e}") from e
+
+    async def _refresh(self, ticker: str, interval: int,
+                       cached: Optional[CandleSeries]) -> CandleSeries:
+        """Дополняет серию новыми свечами и сохраняет ее в Redis."""
+        cutoff = self._cutoff()
+        candles = [candle for candle in (cached.candles if cached else [])
+                   if candle[0] >= cutoff]
+        if candles:
+            # Последняя свеча могла еще формироваться - запросим ее заново
+            since = candles.pop()[0]
+        else:
+            since = cutoff
+        fresh = await self._request(ticker, interval, since)
+        candles.extend(candle for candle in fresh if candle[0] >= since)
+
+        series = CandleSeries(candles, time.time(), "miss")
+        ttl = int(self.days * 86400)
+        await self.redis.set(self._key(ticker, interval), dumps({
+            "candles": series.candles, "fetched_at": series.fetched_at}),
+            ex=ttl)
+        return series
+
+    def _single_flight(self, ticker: str, interval: int,
+                       cached: Optional[CandleSeries]) -> asyncio.Task:
+        """Возвращает общую задачу обновления серии."""
+        key = self._key(ticker, interval)
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced_requests += 1
+            return task
+
+        task = asyncio.create_task(self._refresh(ticker, interval, cached))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    def _revalidate(self, ticker: str, interval: int,
+                    cached: CandleSeries) -> None:
+        """Обновляет устаревшую серию в фоне."""
+        task = self._single_flight(ticker, interval, cached)
+        if task in self._background:
+            return
+        self._background.add(task)
+
+        def done(finished: asyncio.Task) -> None:
+            self._background.discard(finished)
+            if not finished.cancelled() and finished.exception():
+                logger.warning("Фоновое обновление свечей %s: %s", ticker,
+                               finished.exception())
+
+        task.add_done_callback(done)
+
+    async def get(self, ticker: str, interval: int = 60) -> CandleSeries:
+        """Возвращает серию свечей тикера.
+
+        Args:
+            ticker: Тикер из кеша цен (возможно, с префиксом режима).
+            interval: Интервал свечей MOEX (мин).
+
+        Returns:
+            CandleSeries: Серия из кеша или только что полученная.
+
+        Raises:
+            KeyError: Если режим торгов тикера не настроен.
+            ValueError: Если серии нет в кеше и MOEX недоступен.
+        """
+        cached = self._decode(await self.redis.get(self._key(ticker,
+                                                             interval)))
+        return await self._serve(ticker, interval, cached)
+
+    async def _serve(self, ticker: str, interval: int,
+                     cached: Optional[CandleSeries]) -> CandleSeries:
+        """Отдает серию из кеша или дожидается ее загрузки."""
+        if cached is not None:
+            if time.time() - cached.fetched_at < self.fresh_ttl:
+                return cached
+            self._revalidate(ticker, interval, cached)
+            return CandleSeries(cached.candles, cached.fetched_at, "stale")
+
+        # asyncio.shield: отмена одного запроса клиента не отменяет
+        # общую задачу остальных ожидающих
+        return await asyncio.shield(
+            self._single_flight(ticker, interval, None))
+
+    async def get_many(
+        self, tickers: List[str], interval: int = 60
+    ) -> Dict[str, Union[CandleSeries, Exception]]:
+        """Возвращает серии нескольких тикеров.
+
+        Серии читаются из Redis одной командой, недостающие
+        запрашиваются у MOEX параллельно (не больше concurrency
+        запросов одновременно).
+
+        Args:
+            tickers: Тикеры без повторов.
+            interval: Интервал свечей MOEX (мин).
+
+        Returns:
+            Dict[str, Union[CandleSeries, Exception]]: Серия или ошибка
+            (KeyError - режим не настроен, ValueError - MOEX не
+            ответил) для каждого тикера.
+        """
+        results: Dict[str, Union[CandleSeries, Exception]] = {}
+        keys = {}
+        for ticker in tickers:
+            try:
+                keys[ticker] = self._key(ticker, interval)
+            except KeyError as e:
+                results[ticker] = e
+        if not keys:
+            return results
+
+        cached = await self.redis.mget(list(keys.values()))
+        served = await asyncio.gather(
+            *(self._serve(ticker, interval, self._decode(raw))
+              for ticker, raw in zip(keys, cached)),
+            return_exceptions=True)
+        for ticker, series in zip(keys, served):
+            if isinstance(series, BaseException) and not isinstance(
+                    series, Exception):
+                raise series
+            results[ticker] = series
+        return {ticker: results[ticker] for ticker in tickers}
+
+    async def close(self) -> None:
+        """Отменяет фоновые обновления."""
+        tasks = list(self._background | set(self._inflight.values()))
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
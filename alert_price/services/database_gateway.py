@@ -1,33 +1,163 @@
-"""Модуль для работы с SQLite базой данных."""
+"""
+Модуль для работы с SQLite базой данных.
 
+Основные особенности:
+- Шлюз создается один раз на время жизни приложения
+- Пул соединений: одно соединение для записи и несколько для чтения
+- Журнал WAL: чтение не блокируется во время записи
+- Схема создается и мигрирует один раз при открытии шлюза
+"""
+
+import asyncio
 import logging
+import os
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import AsyncIterator, Iterable, List, Optional
 import aiosqlite
 
 from alert_price.api.schemas import TrackingParameters
+from alert_price.utils.metrics import Histogram, timed
 
 logger = logging.getLogger(__name__)
 
+# Длительность операций шлюза (включая ожидание соединения из пула)
+SQLITE_SECONDS = Histogram("sqlite_operation_seconds",
+                           "Длительность операций SQLite",
+                           ("operation",))
+
+# Владелец списка отслеживания по умолчанию (однопользовательский режим
+# и записи, созданные до появления owner_id)
+DEFAULT_OWNER = "default"
+
+# Цена старой схемы (TEXT), которую можно перенести числом: число или
+# текст из цифр с не более чем одной точкой. CAST отбросил бы хвост
+# строки: "12abc" стало бы 12, а "240,5" - 240.
+_NUMERIC_PRICE = """(typeof({0}) IN ('integer', 'real')
+        OR (trim({0}) GLOB '*[0-9]*'
+            AND trim({0}) NOT GLOB '*[^0-9.]*'
+            AND trim({0}) NOT GLOB '*.*.*'))"""
+_VALID_PRICES = f"""{_NUMERIC_PRICE.format("buy_price")}
+    AND {_NUMERIC_PRICE.format("sell_price")}
+    AND CAST(trim(buy_price) AS REAL) > 0
+    AND CAST(trim(sell_price) AS REAL) > 0"""
+
+# Миграции схемы, номер миграции хранится в PRAGMA user_version.
+# Первая миграция совпадает с прежним CREATE TABLE IF NOT EXISTS,
+# поэтому подходит и для баз, созданных до появления миграций.
+MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS tracking_parameters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker TEXT NOT NULL,
+        buy_price TEXT NOT NULL,
+        sell_price TEXT NOT NULL,
+        UNIQUE(ticker) ON CONFLICT REPLACE
+    );
+    """,
+    # Цены хранятся числами (REAL) с индексами для поиска порогов по
+    # диапазону цен. Строки с нечисловыми или неположительными ценами
+    # не переносятся (индекс оповещений и раньше их пропускал), перед
+    # миграцией они записываются в журнал (SKIPPED_BY_MIGRATION).
+    f"""
+    CREATE TABLE tracking_parameters_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        ticker TEXT NOT NULL,
+        buy_price REAL NOT NULL CHECK (buy_price > 0),
+        sell_price REAL NOT NULL CHECK (sell_price > 0),
+        UNIQUE(ticker) ON CONFLICT REPLACE
+    );
+    INSERT INTO tracking_parameters_new (id, ticker, buy_price, sell_price)
+    SELECT id, ticker, CAST(trim(buy_price) AS REAL),
+        CAST(trim(sell_price) AS REAL)
+    FROM tracking_parameters
+    WHERE {_VALID_PRICES};
+    DROP TABLE tracking_parameters;
+    ALTER TABLE tracking_parameters_new RENAME TO tracking_parameters;
+    CREATE INDEX idx_tracking_parameters_ticker_buy
+        ON tracking_parameters (ticker, buy_price);
+    CREATE INDEX idx_tracking_parameters_ticker_sell
+        ON tracking_parameters (ticker, sell_price);
+    """,
+    # Собственные списки отслеживания у каждого владельца: тикер
+    # уникален в пределах owner_id, уникальный индекс (owner_id, ticker)
+    # используется и для постраничного чтения списка владельца.
+    f"""
+    CREATE TABLE tracking_parameters_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        owner_id TEXT NOT NULL DEFAULT '{DEFAULT_OWNER}',
+        ticker TEXT NOT NULL,
+        buy_price REAL NOT NULL CHECK (buy_price > 0),
+        sell_price REAL NOT NULL CHECK (sell_price > 0),
+        UNIQUE(owner_id, ticker) ON CONFLICT REPLACE
+    );
+    INSERT INTO tracking_parameters_new
+        (id, owner_id, ticker, buy_price, sell_price)
+    SELECT id, '{DEFAULT_OWNER}', ticker, buy_price, sell_price
+    FROM tracking_parameters;
+    DROP TABLE tracking_parameters;
+    ALTER TABLE tracking_parameters_new RENAME TO tracking_parameters;
+    CREATE INDEX idx_tracking_parameters_ticker_buy
+        ON tracking_parameters (ticker, buy_price);
+    CREATE INDEX idx_tracking_parameters_ticker_sell
+        ON tracking_parameters (ticker, sell_price);
+    """,
+]
+
+# Запросы строк, которые миграция с данным номером не переносит
+SKIPPED_BY_MIGRATION = {
+    2: f"""SELECT id, ticker, buy_price, sell_price
+    FROM tracking_parameters
+    WHERE NOT ({_VALID_PRICES})""",
+}
+
 
 class DatabaseGateway:
-    """Класс для работы с SQLite базой данных."""
+    """Класс для работы с SQLite базой данных.
 
-    def __init__(self):
-        """Инициализирует параметры подключения к бд."""
-        self.conn = None
-        self.db_path = self._get_db_path()
+    Особенности работы:
+    - open() открывает соединения, настраивает PRAGMA и применяет
+      миграции, close() закрывает все соединения
+    - Запись выполняется через единственное соединение под блокировкой,
+      поэтому писатели не конкурируют за блокировку файла
+    - Чтение выполняется через пул соединений только для чтения
+    """
+
+    def __init__(self, db_path: Optional[Path] = None,
+                 readers: Optional[int] = None,
+                 cache_size_kib: Optional[int] = None,
+                 mmap_size: Optional[int] = None,
+                 busy_timeout_ms: int = 5000):
+        """Инициализирует параметры подключения к бд.
+
+        Незаданные параметры берутся из переменных окружения.
+
+        Args:
+            db_path: Путь к файлу базы данных.
+            readers: Количество соединений для чтения.
+            cache_size_kib: Размер страничного кеша соединения (КиБ).
+            mmap_size: Размер отображаемой в память части файла (байт).
+            busy_timeout_ms: Ожидание блокировки файла (мс).
+        """
+        self.db_path = db_path or self._get_db_path()
+        self.readers = int(readers or os.environ.get("DB_READERS", 4))
+        self.cache_size_kib = int(
+            cache_size_kib or os.environ.get("DB_CACHE_SIZE_KIB", 8192))
+        self.mmap_size = int(
+            mmap_size or os.environ.get("DB_MMAP_SIZE", 64 * 1024 * 1024))
+        self.busy_timeout_ms = busy_timeout_ms
+
+        self.conn: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
 
     async def __aenter__(self):
-        self.conn = await aiosqlite.connect(self.db_path)
-        await self.conn.execute("PRAGMA foreign_keys = ON")
+        await self.open()
         return self
 
     async def __aexit__(self, *args):
-        try:
-            await self.conn.close()
-        except Exception as e:
-            logger.error("Ошибка при закрытии соединения: %s", e)
-            raise
+        await self.close()
 
     @staticmethod
     def _get_db_path() -> Path:
@@ -58,45 +188,143 @@ class DatabaseGateway:
                     f"DELETE FROM sqlite_sequence WHERE name='{table_name}'"
             )
 
-    async def create_tracking_parameters_table(self) -> None:
-        """Создает пустую таблицу tracking_parameters в базе данных.
+    async def _connect(self, read_only: bool) -> aiosqlite.Connection:
+        """Открывает соединение и настраивает PRAGMA."""
+        conn = await aiosqlite.connect(self.db_path)
+        await conn.execute(f"PRAGMA busy_timeout = {self.busy_timeout_ms}")
+        await conn.execute("PRAGMA foreign_keys = ON")
+        await conn.execute("PRAGMA synchronous = NORMAL")
+        await conn.execute(f"PRAGMA cache_size = -{self.cache_size_kib}")
+        await conn.execute(f"PRAGMA mmap_size = {self.mmap_size}")
+        await conn.execute("PRAGMA temp_store = MEMORY")
+        if read_only:
+            await conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    async def open(self) -> None:
+        """Открывает пул соединений и применяет миграции схемы.
 
         Raises:
             sqlite3.Error: При ошибках работы с БД.
         """
-        table_name = "tracking_parameters"
-
         try:
-            async with self.conn.cursor() as cursor:
-                await cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS {table_name} (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ticker TEXT NOT NULL,
-                    buy_price TEXT NOT NULL,
-                    sell_price TEXT NOT NULL,
-                    UNIQUE(ticker) ON CONFLICT REPLACE
-                )
-                """)
+            self.conn = await self._connect(read_only=False)
+            async with self.conn.execute(
+                "PRAGMA journal_mode = WAL"
+            ) as cursor:
+                journal_mode, = await cursor.fetchone()
+            if journal_mode.lower() != "wal":
+                logger.warning("Режим журнала SQLite: %s вместо WAL",
+                               journal_mode)
+            await self.migrate()
+
+            self._idle_readers = asyncio.Queue()
+            for _ in range(self.readers):
+                conn = await self._connect(read_only=True)
+                self._readers.append(conn)
+                self._idle_readers.put_nowait(conn)
+
+        except Exception:
+            await self.close()
+            raise
+
+        logger.info("База данных %s открыта: 1 писатель, %s читателей",
+                    self.db_path, self.readers)
+
+    async def close(self) -> None:
+        """Закрывает все соединения пула."""
+        connections = self._readers + ([self.conn] if self.conn else [])
+        self._readers = []
+        self._idle_readers = None
+        self.conn = None
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.error("Ошибка при закрытии соединения: %s", e)
+
+    @asynccontextmanager
+    async def _writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Выдает соединение для записи на время транзакции.
+
+        Транзакция фиксируется при выходе из блока и откатывается
+        при исключении.
+        """
+        async with self._write_lock:
+            try:
+                yield self.conn
                 await self.conn.commit()
-                logger.info("Таблица %s создана (или уже существовала)",
-                            table_name)
+            except BaseException:
+                await self.conn.rollback()
+                raise
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Выдает свободное соединение для чтения из пула."""
+        conn = await self._idle_readers.get()
+        try:
+            yield conn
+        finally:
+            self._idle_readers.put_nowait(conn)
 
-        except aiosqlite.Error as e:
-            await self.conn.rollback()
-            logger.error("Ошибка при создании таблицы %s: %s", table_name, e)
-            raise
+    async def migrate(self) -> None:
+        """Применяет миграции схемы, которых еще нет в базе.
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД.
+        """
+        async with self.conn.execute("PRAGMA user_version") as cursor:
+            version, = await cursor.fetchone()
+
+        for number, script in enumerate(MIGRATIONS[version:],
+                                        start=version + 1):
+            if number in SKIPPED_BY_MIGRATION:
+                await self._log_skipped_rows(number)
+            try:
+                await self.conn.executescript(
+                    f"BEGIN;\n{script}\nPRAGMA user_version = {number};\n"
+                    "COMMIT;")
+            except aiosqlite.Error as e:
+                await self.conn.rollback()
+                logger.error("Ошибка миграции схемы %s: %s", number, e)
+                raise
+            logger.info("Применена миграция схемы %s", number)
+
+    async def _log_skipped_rows(self, number: int) -> None:
+        """Записывает в журнал строки, которые миграция не перенесет."""
+        async with self.conn.execute(SKIPPED_BY_MIGRATION[number]) as cursor:
+            async for row_id, ticker, buy_price, sell_price in cursor:
+                logger.warning(
+                    "Миграция схемы %s пропускает запись %s (%s): "
+                    "некорректные цены %r, %r",
+                    number, row_id, ticker, buy_price, sell_price)
+
+    async def create_tracking_parameters_table(self) -> None:
+        """Создает таблицу tracking_parameters, если ее еще нет.
 
-    async def save_share(self, parameters: TrackingParameters) -> Path:
+        Таблица создается миграциями при открытии шлюза, метод
+        оставлен для явного вызова и только применяет миграции.
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД.
+        """
+        async with self._write_lock:
+            await self.migrate()
+
+    @timed(SQLITE_SECONDS, "save_share")
+    async def save_share(self, parameters: TrackingParameters,
+                         owner_id: str = DEFAULT_OWNER) -> Path:
         """Сохраняет выбранный тикер с ценами в базу данных.
 
         Args:
             parameters: Параметры отслеживания цены выбранной акции.
+            owner_id: Владелец списка отслеживания.
 
         Returns:
             Путь к базе данных.
 
         Raises:
-            ValueError: Если таблица не существует.
+            ValueError: Если данные для сохранения отсутствуют.
             sqlite3.Error: При ошибках работы с БД.
         """
         if not parameters:
@@ -105,45 +333,79 @@ class DatabaseGateway:
         table_name = "tracking_parameters"
 
         try:
-            async with self.conn.cursor() as cursor:
-                await self.conn.execute("BEGIN TRANSACTION")
-
-                await cursor.execute(f"""
-                CREATE TABLE IF NOT EXISTS {table_name} (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    ticker TEXT NOT NULL,
-                    buy_price TEXT NOT NULL,
-                    sell_price TEXT NOT NULL,
-                    UNIQUE(ticker) ON CONFLICT REPLACE
-                )
-                """)
-
-                await cursor.execute(
+            async with self._writer() as conn:
+                await conn.execute(
                     f"""INSERT INTO {table_name}
-                    (ticker, buy_price, sell_price)
-                    VALUES (?, ?, ?)""",
+                    (owner_id, ticker, buy_price, sell_price)
+                    VALUES (?, ?, ?, ?)""",
                     (
-                        str(parameters.ticker),
-                        str(parameters.buy_price),
-                        str(parameters.sell_price),
+                        owner_id,
+                        parameters.ticker,
+                        parameters.buy_price,
+                        parameters.sell_price,
                     )
                 )
-                await self.conn.commit()
-                logger.info("Параметры акции %s сохранены в %s",
-                            parameters.ticker, table_name)
+            logger.info("Параметры акции %s сохранены в %s",
+                        parameters.ticker, table_name)
 
         except aiosqlite.Error as e:
-            await self.conn.rollback()
             logger.error("Ошибка сохранения новой записи: %s", e)
             raise
 
-        return self._get_db_path()
+        return self.db_path
+
+    @timed(SQLITE_SECONDS, "save_shares")
+    async def save_shares(
+        self, parameters: Iterable[TrackingParameters],
+        owner_id: str = DEFAULT_OWNER
+    ) -> int:
+        """Сохраняет пакет тикеров с ценами одной транзакцией.
+
+        Существующие тикеры заменяются (как в save_share).
+
+        Args:
+            parameters: Параметры отслеживания акций.
+            owner_id: Владелец списка отслеживания.
+
+        Returns:
+            int: Количество записанных строк.
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД, транзакция
+                откатывается целиком.
+        """
+        table_name = "tracking_parameters"
+        rows = [
+            (owner_id, item.ticker, item.buy_price, item.sell_price)
+            for item in parameters
+        ]
+        if not rows:
+            return 0
+
+        try:
+            async with self._writer() as conn:
+                await conn.executemany(
+                    f"""INSERT INTO {table_name}
+                    (owner_id, ticker, buy_price, sell_price)
+                    VALUES (?, ?, ?, ?)""",
+                    rows
+                )
+        except aiosqlite.Error as e:
+            logger.error("Ошибка пакетного сохранения: %s", e)
+            raise
+
+        logger.info("Пакетно сохранено %s записей в %s",
+                    len(rows), table_name)
+        return len(rows)
 
-    async def delete_share(self, ticker: str) -> bool:
+    @timed(SQLITE_SECONDS, "delete_share")
+    async def delete_share(self, ticker: str,
+                           owner_id: str = DEFAULT_OWNER) -> bool:
         """Удаляет акцию из базы данных по тикеру.
 
         Args:
             ticker: Тикер акции для удаления.
+            owner_id: Владелец списка отслеживания.
 
         Returns:
             bool: True если удаление прошло успешно, False
@@ -155,27 +417,35 @@ class DatabaseGateway:
         table_name = "tracking_parameters"
 
         try:
-            async with self.conn.cursor() as cursor:
-                await cursor.execute(
-                    f"DELETE FROM {table_name} WHERE ticker = ?",
-                    (ticker,)
-                )
-                deleted_count = cursor.rowcount
-                await self.conn.commit()
-
-                if deleted_count > 0:
-                    logger.info("Акция %s удалена из базы данных", ticker)
-                    return True
-                logger.warning("Акция %s не найдена в базе", ticker)
-                return False
+            async with self._writer() as conn:
+                async with conn.execute(
+                    f"DELETE FROM {table_name} "
+                    f"WHERE owner_id = ? AND ticker = ?",
+                    (owner_id, ticker)
+                ) as cursor:
+                    deleted_count = cursor.rowcount
 
         except aiosqlite.Error as e:
-            await self.conn.rollback()
             logger.error("Ошибка удаления акции %s: %s", ticker, e)
             raise
 
-    async def get_all_tracked_stocks(self) -> list:
-        """Получает все отслеживаемые акции из базы данных.
+        if deleted_count > 0:
+            logger.info("Акция %s удалена из базы данных", ticker)
+            return True
+        logger.warning("Акция %s не найдена в базе", ticker)
+        return False
+
+    @timed(SQLITE_SECONDS, "get_all_tracked_stocks")
+    async def get_all_tracked_stocks(
+        self, owner_id: str = DEFAULT_OWNER
+    ) -> list:
+        """Получает все отслеживаемые акции владельца из базы данных.
+
+        Загружает весь список сразу, для API используется
+        get_tracked_stocks_page.
+
+        Args:
+            owner_id: Владелец списка отслеживания.
 
         Returns:
             List[TrackingParameters]: Список объектов TrackingParameters
@@ -185,26 +455,242 @@ class DatabaseGateway:
             sqlite3.Error: При ошибках работы с БД.
         """
         table_name = "tracking_parameters"
-        stocks = []
 
         try:
-            async with self.conn.cursor() as cursor:
-                await cursor.execute(f"SELECT * FROM {table_name}")
-                rows = await cursor.fetchall()
-
-                # структура таблицы: id, ticker, buy_price, sell_price
-                for row in rows:
-                    stock = TrackingParameters(
-                        ticker=row[1],
-                        buy_price=row[2],
-                        sell_price=row[3]
-                    )
-                    stocks.append(stock)
-
-                logger.info("Успешно получены %d акций из базы данных",
-                            len(stocks))
-                return stocks
+            async with self._reader() as conn:
+                async with conn.execute(
+                    f"SELECT ticker, buy_price, sell_price FROM {table_name} "
+                    f"WHERE owner_id = ? ORDER BY ticker",
+                    (owner_id,)
+                ) as cursor:
+                    rows = await cursor.fetchall()
 
         except aiosqlite.Error as e:
             logger.error("Ошибка при получении списка акций: %s", e)
             raise
+
+        stocks = [
+            TrackingParameters(ticker=ticker, buy_price=buy_price,
+                               sell_price=sell_price)
+            for ticker, buy_price, sell_price in rows
+        ]
+        logger.info("Успешно получены %d акций из базы данных", len(stocks))
+        return stocks
+
+    @timed(SQLITE_SECONDS, "get_tracked_stocks_page")
+    async def get_tracked_stocks_page(
+        self, owner_id: str = DEFAULT_OWNER, after: Optional[str] = None,
+        limit: int = 100
+    ) -> List[tuple]:
+        """Получает страницу списка отслеживания владельца.
+
+        Постраничное чтение по ключу (keyset): страница начинается после
+        тикера after и выбирается по уникальному индексу
+        (owner_id, ticker), поэтому стоимость запроса не зависит от
+        номера страницы и размера таблицы.
+
+        Args:
+            owner_id: Владелец списка отслеживания.
+            after: Последний тикер предыдущей страницы.
+            limit: Максимальное количество строк.
+
+        Returns:
+            List[tuple]: Строки (ticker, buy_price, sell_price),
+            отсортированные по тикеру.
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД.
+        """
+        table_name = "tracking_parameters"
+
+        try:
+            async with self._reader() as conn:
+                async with conn.execute(
+                    f"SELECT ticker, buy_price, sell_price FROM {table_name} "
+                    f"WHERE owner_id = ? AND ticker > ? "
+                    f"ORDER BY ticker LIMIT ?",
+                    (owner_id, after or "", limit)
+                ) as cursor:
+                    return list(await cursor.fetchall())
+
+        except aiosqlite.Error as e:
+            logger.error("Ошибка при получении страницы списка акций: %s", e)
+            raise
+
+    @timed(SQLITE_SECONDS, "fetch_tracked_stocks")
+    async def fetch_tracked_stocks(
+        self, owner_id: str = DEFAULT_OWNER, after: Optional[str] = None,
+        limit: int = 100, chunk_size: int = 500
+    ) -> List[List[tuple]]:
+        """Читает страницу списка отслеживания владельца пачками.
+
+        Строки выбираются курсором aiosqlite пачками по chunk_size.
+        Соединение для чтения возвращается в пул сразу после выборки,
+        а не после отправки ответа клиенту: медленные клиенты не
+        занимают пул читателей.
+
+        Args:
+            owner_id: Владелец списка отслеживания.
+            after: Последний тикер предыдущей страницы.
+            limit: Максимальное количество строк.
+            chunk_size: Количество строк в пачке.
+
+        Returns:
+            List[List[tuple]]: Пачки строк (ticker, buy_price,
+            sell_price).
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД.
+        """
+        table_name = "tracking_parameters"
+        query = (f"SELECT ticker, buy_price, sell_price FROM {table_name} "
+                 f"WHERE owner_id = ? AND ticker > ? "
+                 f"ORDER BY ticker LIMIT ?")
+        params = (owner_id, after or "", limit)
+
+        chunks = []
+        try:
+            async with self._reader() as conn:
+                async with conn.execute(query, params) as cursor:
+                    while rows := await cursor.fetchmany(chunk_size):
+                        chunks.append(rows)
+
+        except aiosqlite.Error as e:
+            logger.error("Ошибка при чтении страницы списка акций: %s", e)
+            raise
+
+        return chunks
+
+    @timed(SQLITE_SECONDS, "get_alert_thresholds")
+    async def get_alert_thresholds(self) -> list:
+        """Получает пороги всех отслеживаемых акций для индекса оповещений.
+
+        В отличие от get_all_tracked_stocks не создает модели Pydantic.
+
+        Returns:
+            List[tuple]: Строки (id, ticker, buy_price, sell_price).
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД.
+        """
+        table_name = "tracking_parameters"
+
+        try:
+            async with self._reader() as conn:
+                async with conn.execute(
+                    f"SELECT id, ticker, buy_price, sell_price "
+                    f"FROM {table_name}"
+                ) as cursor:
+                    return list(await cursor.fetchall())
+
+        except aiosqlite.Error as e:
+            logger.error("Ошибка при получении порогов отслеживания: %s", e)
+            raise
+
+    @timed(SQLITE_SECONDS, "get_thresholds_version")
+    async def get_thresholds_version(self) -> tuple:
+        """Возвращает отпечаток таблицы порогов.
+
+        Счетчик AUTOINCREMENT растет при каждой вставке и замене строки,
+        а удаление меняет количество строк, поэтому пара (счетчик,
+        количество строк) меняется при любом изменении. Так изменения,
+        сделанные другим процессом, видны без отдельного канала.
+
+        Returns:
+            tuple: (счетчик AUTOINCREMENT, количество строк).
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД.
+        """
+        table_name = "tracking_parameters"
+
+        try:
+            async with self._reader() as conn:
+                async with conn.execute(
+                    "SELECT (SELECT seq FROM sqlite_sequence WHERE name = ?), "
+                    f"count(*) FROM {table_name}", (table_name,)
+                ) as cursor:
+                    return tuple(await cursor.fetchone())
+
+        except aiosqlite.Error as e:
+            logger.error("Ошибка при получении версии порогов: %s", e)
+            raise
+
+    @timed(SQLITE_SECONDS, "get_crossed_alerts")
+    async def get_crossed_alerts(self, ticker: str, previous_price: float,
+                                 price: float) -> list:
+        """Получает пороги тикера, пересеченные при изменении цены.
+
+        Правила совпадают с AlertEngine.process: при падении цены
+        срабатывают цены покупки в [price, previous_price), при росте -
+        цены продажи в (previous_price, price]. Поиск выполняется по
+        индексам (ticker, buy_price) и (ticker, sell_price).
+
+        Args:
+            ticker: Тикер акции.
+            previous_price: Цена на предыдущем тике.
+            price: Новая цена.
+
+        Returns:
+            List[tuple]: Строки (id, direction, threshold), отсортированные
+            по порогу; direction - "buy" или "sell".
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД.
+        """
+        table_name = "tracking_parameters"
+        if price < previous_price:
+            query = (f"SELECT id, 'buy', buy_price FROM {table_name} "
+                     f"INDEXED BY idx_tracking_parameters_ticker_buy "
+                     f"WHERE ticker = ? AND buy_price >= ? "
+                     f"AND buy_price < ? ORDER BY buy_price")
+            params = (ticker, price, previous_price)
+        elif price > previous_price:
+            query = (f"SELECT id, 'sell', sell_price FROM {table_name} "
+                     f"INDEXED BY idx_tracking_parameters_ticker_sell "
+                     f"WHERE ticker = ? AND sell_price > ? "
+                     f"AND sell_price <= ? ORDER BY sell_price")
+            params = (ticker, previous_price, price)
+        else:
+            return []
+
+        try:
+            async with self._reader() as conn:
+                async with conn.execute(query, params) as cursor:
+                    return list(await cursor.fetchall())
+
+        except aiosqlite.Error as e:
+            logger.error("Ошибка при поиске пересеченных порогов %s: %s",
+                         ticker, e)
+            raise
+
+    async def iter_tracking_parameters(
+        self, owner_id: str = DEFAULT_OWNER, page_size: int = 1000
+    ) -> AsyncIterator[List[tuple]]:
+        """Постранично читает список отслеживания владельца.
+
+        Страницы выбираются через get_tracked_stocks_page, поэтому в
+        памяти одновременно находится только одна страница, а
+        соединение для чтения занято только на время ее выборки.
+
+        Args:
+            owner_id: Владелец списка отслеживания.
+            page_size: Количество строк в странице.
+
+        Yields:
+            List[tuple]: Строки (ticker, buy_price, sell_price).
+
+        Raises:
+            sqlite3.Error: При ошибках работы с БД.
+        """
+        after = None
+
+        while True:
+            rows = await self.get_tracked_stocks_page(owner_id, after,
+                                                      page_size)
+            if not rows:
+                return
+            yield rows
+            if len(rows) < page_size:
+                return
+            after = rows[-1][0]
@@ -2,43 +2,312 @@
 
 import logging
 import asyncio
+import os
+from contextlib import AsyncExitStack, suppress
+from typing import Callable, Dict, Optional
 
+from alert_price.services.alert_engine import AlertEngine
 from alert_price.services.database_gateway import DatabaseGateway
-from alert_price.services.price_cache import PriceCache
+from alert_price.services.notification_dispatcher import (
+    NotificationDispatcher)
+from alert_price.services.ohlc_rollup import OHLCRollup
+from alert_price.services.price_broadcaster import PriceBroadcaster
+from alert_price.services.poll_scheduler import PollScheduler
+from alert_price.services.price_cache import PriceCache, PriceSnapshot
 from alert_price.services.prices_request import PriceRequest
+from alert_price.services.tick_store import TickStore
+from alert_price.utils.metrics import Histogram, timed
 
 logger = logging.getLogger(__name__)
 
+# Длительность цикла опроса и его этапов: fetch - запрос MOEX,
+# parse - разбор котировок, cache_write - запись в кеш цен
+POLL_CYCLE_SECONDS = Histogram("moex_poll_cycle_seconds",
+                               "Длительность цикла опроса MOEX")
+POLL_STAGE_SECONDS = Histogram("moex_poll_stage_seconds",
+                               "Длительность этапов цикла опроса MOEX",
+                               ("stage",))
+
 # Обработчик принудительной остановки приложения остановки приложения.
 stop_event = asyncio.Event()
 
+# Интервал опроса MOEX в основную сессию (сек)
+POLL_INTERVAL = 30
 
-async def handles_event_loop(price_cache: PriceCache):
-    """Вызывает событийный цикл."""
+# Относительное расстояние до порога, при котором включается ускоренный
+# интервал опроса (MOEX_CADENCE_FAST)
+NEAR_THRESHOLD_RATIO = float(os.environ.get("MOEX_NEAR_THRESHOLD", 0.005))
 
-    try:
-        # Создаем таблицу при старте приложения
-        async with DatabaseGateway() as db:
-            await db.create_tracking_parameters_table()
-            logger.info("Проверка и создание таблицы tracking_parameters"
-                        "завершено")
+# Интервал проверки доступности MOEX запросом SBER (сек)
+HEALTH_CHECK_INTERVAL = float(os.environ.get("MOEX_HEALTH_INTERVAL", 300))
 
-        while not stop_event.is_set():
-            async with PriceRequest() as pr:
-                await pr.request_securities()
-                prices = await pr.generates_quotes_dictionary()
-
-                if prices:
-                    success = await price_cache.save_prices(prices)
-                    if success:
-                        logger.info("Цены в кэше Redis обновлены.")
-                    else:
-                        logger.warning("Не удалось сохранить цены в кеш.")
+
+async def refresh_alert_engine(alert_engine: AlertEngine,
+                               database: DatabaseGateway) -> None:
+    """Перестраивает индекс порогов, если список отслеживания изменился.
+
+    Изменение определяется и по отметке mark_stale, и по отпечатку
+    таблицы: записи могли прийти через другой воркер.
+    """
+    version = await database.get_thresholds_version()
+    if not alert_engine.is_stale and version == alert_engine.source_version:
+        return
+    alert_engine.load(await database.get_alert_thresholds(), version)
+
+
+def begin_leader_term(price_cache: PriceCache,
+                      alert_engine: AlertEngine) -> None:
+    """Сбрасывает состояние поллера перед новым сроком ведущего.
+
+    Пока процесс не был ведущим, кеш мог изменить другой процесс, а
+    последние цены индекса порогов устарели: первый цикл нового срока
+    только запоминает цены и не порождает пересечений.
+    """
+    price_cache.forget_snapshot()
+    alert_engine.reset()
+
+
+def publish_snapshot(price_cache: PriceCache,
+                     broadcaster: PriceBroadcaster,
+                     snapshot: Optional[PriceSnapshot] = None) -> None:
+    """Публикует подписчикам потока снимок цен.
+
+    Args:
+        price_cache: Кеш цен.
+        broadcaster: Рассыльщик потока цен.
+        snapshot: Снимок для публикации, по умолчанию только что
+            записанный этим процессом.
+    """
+    snapshot = snapshot or price_cache.snapshot
+    if snapshot is None:
+        return
+    broadcaster.publish({
+        "prices": snapshot.prices,
+        "version": snapshot.version,
+        "last_updated": (snapshot.updated_at.isoformat()
+                         if snapshot.updated_at else None)
+    })
+
+
+async def relay_snapshots(price_cache: PriceCache,
+                          broadcaster: PriceBroadcaster,
+                          is_leader: Callable[[], bool],
+                          reconnect_delay: float = 1.0) -> None:
+    """Публикует подписчикам снимки, записанные ведущим процессом.
+
+    Процесс, который сам не опрашивает MOEX, получает версию нового
+    снимка из канала обновлений цен и читает снимок из Redis один раз
+    для всех своих подписчиков потока.
+
+    Args:
+        price_cache: Кеш цен.
+        broadcaster: Рассыльщик потока цен этого процесса.
+        is_leader: Является ли процесс ведущим (тогда снимок
+            публикует его цикл опроса).
+        reconnect_delay: Пауза перед переподпиской после ошибки (сек).
+    """
+    channel = price_cache.updates_channel
+    while not stop_event.is_set():
+        try:
+            async with price_cache.redis.pubsub() as pubsub:
+                await pubsub.subscribe(channel)
+                while not stop_event.is_set():
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and not is_leader():
+                        publish_snapshot(price_cache, broadcaster,
+                                         await price_cache.get_snapshot())
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Ошибка ретрансляции снимков цен: %s", e)
+            await asyncio.sleep(reconnect_delay)
+
+
+@timed(POLL_CYCLE_SECONDS)
+async def poll_once(
+    pr: PriceRequest,
+    price_cache: PriceCache,
+    database: DatabaseGateway,
+    alert_engine: Optional[AlertEngine] = None,
+    broadcaster: Optional[PriceBroadcaster] = None,
+    tick_store: Optional[TickStore] = None,
+    rollup: Optional[OHLCRollup] = None,
+    notifier: Optional[NotificationDispatcher] = None
+) -> Optional[Dict[str, float]]:
+    """Выполняет один цикл опроса MOEX и сохранения цен.
+
+    Args:
+        pr: Клиент MOEX с открытой сессией.
+        price_cache: Кеш цен, в который сохраняются котировки.
+        database: Шлюз базы данных приложения.
+        alert_engine: Индекс порогов, проверяемый после сохранения цен.
+        broadcaster: Рассыльщик снимка цен.
+        tick_store: Хранилище тиков, получающее изменившиеся цены.
+        rollup: Свертка изменившихся цен в свечи OHLC.
+        notifier: Диспетчер оповещений о пересечении порогов (только
+            ставит их в очереди, не дожидаясь доставки).
+
+    Returns:
+        Optional[Dict[str, float]]: Сохраненные цены или None, если
+        сохранить их не удалось.
+    """
+    with POLL_STAGE_SECONDS.labels("fetch").time():
+        await pr.request_securities()
+    with POLL_STAGE_SECONDS.labels("parse").time():
+        prices = await pr.generates_quotes_dictionary()
+
+    if not prices:
+        logger.error("MOEX вернул пустой список цен.")
+        return None
+
+    with POLL_STAGE_SECONDS.labels("cache_write").time():
+        success = await price_cache.save_prices(prices)
+    if not success:
+        logger.warning("Не удалось сохранить цены в кеш.")
+        return None
+
+    logger.info("Цены в кэше Redis обновлены.")
+    if tick_store is not None:
+        try:
+            await tick_store.append(price_cache.last_changes, prices.keys())
+        except Exception as e:
+            # Тики - вспомогательные данные, их потеря не прерывает цикл
+            logger.error("Ошибка записи тиков: %s", e)
+    if rollup is not None:
+        rollup.update(price_cache.last_changes)
+        try:
+            await rollup.flush()
+        except Exception as e:
+            # Несохраненные свечи отправятся при следующем flush()
+            logger.error("Ошибка записи свечей OHLC: %s", e)
+    if broadcaster is not None:
+        publish_snapshot(price_cache, broadcaster)
+    if alert_engine is not None:
+        await refresh_alert_engine(alert_engine, database)
+        events = alert_engine.process(prices)
+        for event in events:
+            logger.info("Пересечение порога %s: %s %s -> %s (порог %s)",
+                        event.direction, event.ticker, event.previous_price,
+                        event.price, event.threshold)
+        if notifier is not None:
+            notifier.dispatch(events, prices)
+    return prices
+
+
+def is_near_threshold(alert_engine: Optional[AlertEngine],
+                      prices: Optional[Dict[str, float]]) -> bool:
+    """Есть ли цена ближе NEAR_THRESHOLD_RATIO к порогу оповещения."""
+    if alert_engine is None or not prices:
+        return False
+    gap = alert_engine.nearest_gap(prices)
+    return gap is not None and gap <= NEAR_THRESHOLD_RATIO
+
+
+async def _sleep(delay: float) -> None:
+    """Ждет delay секунд или остановки приложения."""
+    with suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(stop_event.wait(), timeout=delay)
+
+
+async def handles_event_loop(
+    price_cache: PriceCache,
+    database: DatabaseGateway,
+    alert_engine: Optional[AlertEngine] = None,
+    broadcaster: Optional[PriceBroadcaster] = None,
+    price_request: Optional[PriceRequest] = None,
+    scheduler: Optional[PollScheduler] = None,
+    tick_store: Optional[TickStore] = None,
+    rollup: Optional[OHLCRollup] = None,
+    notifier: Optional[NotificationDispatcher] = None
+):
+    """Вызывает событийный цикл.
+
+    Паузы между опросами задает планировщик: интервал зависит от фазы
+    торгов и отсчитывается от начала цикла, после ошибок MOEX пауза
+    растет экспоненциально. Ошибка одного цикла не останавливает опрос.
+    Время следующего опроса записывается в метаданные кеша цен, по
+    нему маршрут /api/prices задает max-age.
+
+    Args:
+        price_cache: Кеш цен, в который сохраняются котировки.
+        database: Шлюз базы данных приложения (схема уже создана
+            при его открытии).
+        alert_engine: Индекс порогов, проверяемый после каждого
+            успешного сохранения цен.
+        broadcaster: Рассыльщик, получающий снимок цен один раз
+            за цикл опроса.
+        price_request: Клиент MOEX с сессией приложения. Если не
+            передан, цикл создает свой клиент на все время работы.
+        scheduler: Планировщик опросов, по умолчанию настраивается
+            переменными окружения MOEX_CADENCE_*.
+        tick_store: Хранилище тиков, в которое добавляются изменения
+            цен каждого цикла.
+        rollup: Свертка цен в свечи OHLC, текущие свечи загружаются
+            из Redis перед первым циклом.
+        notifier: Диспетчер оповещений о пересечении порогов.
+    """
+    scheduler = scheduler or PollScheduler.from_env(POLL_INTERVAL)
+
+    try:
+        async with AsyncExitStack() as stack:
+            if price_request is None:
+                price_request = await stack.enter_async_context(
+                    PriceRequest())
+            if rollup is not None:
+                try:
+                    await rollup.load()
+                except Exception as e:
+                    logger.error("Не удалось загрузить свечи OHLC: %s", e)
+            while not stop_event.is_set():
+                scheduler.start_cycle()
+                try:
+                    prices = await poll_once(price_request, price_cache,
+                                             database, alert_engine,
+                                             broadcaster, tick_store,
+                                             rollup, notifier)
+                except Exception as e:
+                    scheduler.record_failure()
+                    logger.error("Ошибка цикла опроса MOEX (%s подряд): %s",
+                                 scheduler.failures, e)
                 else:
-                    logger.error("MOEX вернул пустой список цен.")
-            await asyncio.sleep(30)
+                    scheduler.record_success(
+                        is_near_threshold(alert_engine, prices))
+                delay = scheduler.next_delay()
+                try:
+                    await price_cache.set_next_poll(delay)
+                except Exception as e:
+                    # Без времени опроса max-age ответов считается от
+                    # POLL_INTERVAL
+                    logger.error("Ошибка записи времени опроса: %s", e)
+                await _sleep(delay)
     except asyncio.CancelledError:
         logger.info("Параллельная задача была остановлена.")
     except Exception as e:
         logger.error("Ошибка в основном цикле: %s", e)
         raise
+
+
+async def handles_health_check(price_request: PriceRequest,
+                               interval: float = None) -> None:
+    """Периодически проверяет доступность MOEX (котировка SBER).
+
+    Проверка идет отдельно от цикла опроса цен и с более редким
+    интервалом, результат хранится в price_request.healthy.
+
+    Args:
+        price_request: Клиент MOEX с сессией приложения.
+        interval: Интервал проверки (сек), по умолчанию
+            MOEX_HEALTH_INTERVAL.
+    """
+    interval = interval or HEALTH_CHECK_INTERVAL
+    try:
+        while not stop_event.is_set():
+            was_healthy = price_request.healthy
+            healthy = await price_request.check_health()
+            if healthy != was_healthy:
+                log = logger.info if healthy else logger.warning
+                log("Доступность MOEX: %s", "есть" if healthy else "нет")
+            await asyncio.sleep(interval)
+    except asyncio.CancelledError:
+        logger.info("Проверка доступности MOEX остановлена.")
@@ -0,0 +1,204 @@
+"""
+Модуль выбора ведущего процесса через аренду (lease) в Redis.
+
+Основные особенности:
+- Аренда - ключ Redis со сроком жизни, его владелец опрашивает MOEX
+- Ведущий продлевает аренду каждые renew_interval секунд, остальные
+  процессы пытаются ее захватить (SET NX PX)
+- Продление и освобождение выполняются скриптами Lua только владельцем
+- Если ведущий завершился, аренда истекает и ее захватывает другой
+  процесс не позже чем через ttl + renew_interval секунд
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import suppress
+from typing import Callable, Coroutine, List, Optional
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Продлевает аренду, только если она принадлежит вызывающему
+_RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Удаляет аренду, только если она принадлежит вызывающему
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderLease:
+    """Аренда роли ведущего процесса в Redis.
+
+    Особенности работы:
+    - Значение ключа - "<идентификатор>|<время захвата>", по нему
+      видны текущий ведущий и возраст аренды
+    - При ошибках Redis ведущий сохраняет роль, пока не истек срок
+      последней подтвержденной аренды
+    """
+
+    def __init__(self, redis_client: Redis, key: str = "moex:poller_leader",
+                 ttl: float = None, renew_interval: float = None,
+                 identity: str = None):
+        """Инициализация аренды.
+
+        Незаданные параметры берутся из переменных окружения.
+
+        Args:
+            redis_client: Асинхронный клиент Redis.
+            key: Ключ аренды.
+            ttl: Срок аренды (сек).
+            renew_interval: Интервал продления или попыток захвата (сек).
+            identity: Идентификатор процесса (по умолчанию
+                хост:pid:случайный суффикс).
+        """
+        self.redis = redis_client
+        self.key = key
+        self.ttl = float(ttl or os.environ.get("POLLER_LEASE_TTL", 15))
+        self.renew_interval = float(
+            renew_interval or os.environ.get("POLLER_LEASE_RENEW",
+                                             self.ttl / 3))
+        self.identity = identity or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}")
+
+        self._value: Optional[str] = None
+        self._expires_at = 0.0
+        self._renew = self.redis.register_script(_RENEW_SCRIPT)
+        self._release = self.redis.register_script(_RELEASE_SCRIPT)
+
+    @property
+    def is_leader(self) -> bool:
+        """Владеет ли процесс арендой."""
+        return self._value is not None
+
+    @property
+    def _ttl_ms(self) -> int:
+        return int(self.ttl * 1000)
+
+    async def try_acquire(self) -> bool:
+        """Пытается захватить свободную аренду.
+
+        Returns:
+            bool: True, если аренда захвачена.
+        """
+        value = f"{self.identity}|{time.time():.3f}"
+        started = time.monotonic()
+        if await self.redis.set(self.key, value, nx=True, px=self._ttl_ms):
+            self._value = value
+            self._expires_at = started + self.ttl
+            return True
+        return False
+
+    async def renew(self) -> bool:
+        """Продлевает аренду.
+
+        Returns:
+            bool: False, если аренда уже принадлежит другому процессу.
+        """
+        started = time.monotonic()
+        if await self._renew(keys=[self.key],
+                             args=[self._value, self._ttl_ms]):
+            self._expires_at = started + self.ttl
+            return True
+        return False
+
+    async def release(self) -> None:
+        """Освобождает аренду, если она принадлежит процессу."""
+        if self._value is None:
+            return
+        value, self._value = self._value, None
+        try:
+            await self._release(keys=[self.key], args=[value])
+        except Exception as e:
+            logger.error("Ошибка освобождения аренды ведущего: %s", e)
+
+    async def status(self) -> dict:
+        """Возвращает текущего ведущего и возраст его аренды.
+
+        Returns:
+            dict: leader, lease_age (сек), expires_in (сек), this_worker
+            и is_leader.
+        """
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.get(self.key)
+            pipe.pttl(self.key)
+            value, pttl = await pipe.execute()
+
+        leader = lease_age = expires_in = None
+        if value is not None:
+            leader, _, since = value.decode().rpartition("|")
+            lease_age = round(time.time() - float(since), 3)
+            expires_in = pttl / 1000 if pttl >= 0 else None
+        return {
+            "leader": leader,
+            "lease_age": lease_age,
+            "expires_in": expires_in,
+            "this_worker": self.identity,
+            "is_leader": self.is_leader
+        }
+
+    async def _step(self) -> None:
+        """Продлевает аренду ведущего или пытается ее захватить."""
+        try:
+            if self.is_leader:
+                if not await self.renew():
+                    logger.warning("Аренда ведущего перехвачена: %s",
+                                   self.identity)
+                    self._value = None
+            else:
+                await self.try_acquire()
+        except Exception as e:
+            logger.error("Ошибка аренды ведущего: %s", e)
+            if self.is_leader and time.monotonic() >= self._expires_at:
+                logger.warning("Срок аренды ведущего истек: %s",
+                               self.identity)
+                self._value = None
+
+    async def run(self, stop_event: asyncio.Event,
+                  leader_tasks: Callable[[], List[Coroutine]]) -> None:
+        """Удерживает аренду и запускает задачи ведущего.
+
+        Args:
+            stop_event: Событие остановки приложения.
+            leader_tasks: Фабрика сопрограмм, выполняемых только пока
+                процесс остается ведущим.
+        """
+        tasks: List[asyncio.Task] = []
+        try:
+            while not stop_event.is_set():
+                was_leader = self.is_leader
+                await self._step()
+                if self.is_leader and not was_leader:
+                    logger.info("Процесс %s стал ведущим", self.identity)
+                    tasks = [asyncio.create_task(coro)
+                             for coro in leader_tasks()]
+                elif was_leader and not self.is_leader:
+                    await _cancel(tasks)
+                    tasks = []
+
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(stop_event.wait(),
+                                           timeout=self.renew_interval)
+        finally:
+            await _cancel(tasks)
+            await self.release()
+
+
+async def _cancel(tasks: List[asyncio.Task]) -> None:
+    """Отменяет задачи и дожидается их завершения."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
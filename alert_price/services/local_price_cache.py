@@ -0,0 +1,157 @@
+"""
+Модуль локального (L1) кеша снимка цен в памяти процесса.
+
+Основные особенности:
+- Хранит декодированный снимок цен для одного воркера uvicorn
+- Срок жизни снимка ограничен интервалом опроса MOEX
+- Сбрасывается сразу по сообщению Redis pub/sub, которое
+  PriceCache.save_prices публикует после каждой записи
+- Считает попадания и промахи для контроля эффективности
+"""
+
+import asyncio
+import logging
+import time
+from typing import Optional, Tuple
+from datetime import datetime
+
+from alert_price.services.price_cache import PriceCache, PriceSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class LocalPriceCache:
+    """L1-кеш снимка цен перед PriceCache.
+
+    Особенности работы:
+    - Одновременные промахи объединяются в одно чтение из Redis
+    - Снимок, прочитанный до сброса, не сохраняется после сброса
+    """
+
+    def __init__(self, price_cache: PriceCache, ttl: float):
+        """Инициализация L1-кеша.
+
+        Args:
+            price_cache: Кеш цен в Redis (L2).
+            ttl: Время жизни снимка в памяти (сек).
+        """
+        self.price_cache = price_cache
+        self.ttl = ttl
+        self._snapshot: Optional[PriceSnapshot] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _fresh(self) -> Optional[PriceSnapshot]:
+        """Возвращает снимок, если срок его жизни не истек."""
+        if self._snapshot is not None and time.monotonic() < self._expires_at:
+            return self._snapshot
+        return None
+
+    def get_fresh(self) -> Optional[PriceSnapshot]:
+        """Возвращает снимок из памяти без обращения к Redis.
+
+        Returns:
+            Optional[PriceSnapshot]: Снимок или None, если он устарел
+            или сброшен (промах при этом не учитывается).
+        """
+        snapshot = self._fresh()
+        if snapshot is not None:
+            self.hits += 1
+        return snapshot
+
+    async def get_snapshot(self) -> PriceSnapshot:
+        """Возвращает снимок цен из памяти или из Redis при промахе.
+
+        Returns:
+            PriceSnapshot: Снимок цен и метаданных.
+
+        Raises:
+            HTTPException: Если в кеше Redis нет данных (код 503)
+        """
+        snapshot = self._fresh()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        async with self._lock:
+            snapshot = self._fresh()
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+
+            self.misses += 1
+            generation = self._generation
+            snapshot = await self.price_cache.get_snapshot()
+            if generation == self._generation:
+                self._snapshot = snapshot
+                self._expires_at = time.monotonic() + self.ttl
+            return snapshot
+
+    async def get_prices(self):
+        """Возвращает словарь {тикер: цена} текущего снимка."""
+        return (await self.get_snapshot()).prices
+
+    async def get_meta(
+        self
+    ) -> Tuple[int, Optional[datetime], Optional[datetime]]:
+        """Возвращает версию, время обновления и время следующего опроса.
+
+        При промахе читаются только метаданные из Redis (без HGETALL
+        цен), снимок в памяти не заполняется.
+        """
+        snapshot = self._fresh()
+        if snapshot is not None:
+            self.hits += 1
+            return (snapshot.version, snapshot.updated_at,
+                    snapshot.next_poll_at)
+        return await self.price_cache.get_meta()
+
+    def invalidate(self) -> None:
+        """Сбрасывает снимок в памяти."""
+        self._generation += 1
+        self._snapshot = None
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Счетчики попаданий и промахов L1-кеша."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+            "ttl": self.ttl
+        }
+
+    async def listen_invalidations(self, stop_event: asyncio.Event,
+                                   reconnect_delay: float = 1.0) -> None:
+        """Сбрасывает снимок по сообщениям канала обновлений цен.
+
+        Args:
+            stop_event: Событие остановки приложения.
+            reconnect_delay: Пауза перед переподпиской после ошибки (сек).
+        """
+        channel = self.price_cache.updates_channel
+        while not stop_event.is_set():
+            try:
+                async with self.price_cache.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(channel)
+                    # Сообщения могли быть пропущены до подписки
+                    self.invalidate()
+                    logger.info("L1-кеш цен подписан на канал %s", channel)
+                    while not stop_event.is_set():
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True, timeout=1.0)
+                        if message is not None:
+                            self.invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Ошибка подписки L1-кеша цен: %s", e)
+                self.invalidate()
+                await asyncio.sleep(reconnect_delay)
@@ -0,0 +1,359 @@
+"""
+Модуль доставки оповещений о пересечении ценовых порогов.
+
+Основные особенности:
+- Поллер только передает события пересечения в dispatch(): вызов не
+  ждет получателей и не выполняет ввода-вывода
+- У каждого получателя (webhook, журнал, заглушка в тестах) своя
+  ограниченная очередь и пул воркеров, медленный получатель не
+  задерживает остальных; при переполнении очереди новые оповещения
+  отбрасываются и учитываются в счетчике dropped
+- Повторное оповещение о том же пороге подавляется: порог снова
+  "взводится" только после того, как цена отошла от него на долю
+  hysteresis, и не раньше, чем через cooldown секунд
+- Воркер отправляет получателю пачку до batch_size оповещений,
+  ожидая наполнения пачки не дольше batch_wait
+- Неудачная отправка повторяется с экспоненциальной задержкой
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Protocol, Tuple
+
+import aiohttp
+
+from alert_price.services.alert_engine import AlertEngine, CrossingEvent
+from alert_price.utils.fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+
+def event_payload(event: CrossingEvent) -> dict:
+    """Оповещение в виде словаря для получателя."""
+    return {
+        "alert_id": event.alert_id,
+        "ticker": event.ticker,
+        "direction": event.direction,
+        "threshold": event.threshold,
+        "price": event.price,
+        "previous_price": event.previous_price,
+        "time": event.time.isoformat(),
+    }
+
+
+class NotificationSink(Protocol):
+    """Получатель оповещений."""
+
+    name: str
+
+    async def send(self, events: List[CrossingEvent]) -> None:
+        """Доставляет пачку оповещений.
+
+        Raises:
+            Exception: Если доставка не удалась (отправка повторяется).
+        """
+
+
+class LogSink:
+    """Получатель, записывающий оповещения в журнал приложения."""
+
+    name = "log"
+
+    async def send(self, events: List[CrossingEvent]) -> None:
+        for event in events:
+            logger.info("Оповещение %s: %s %s -> %s (порог %s)",
+                        event.direction, event.ticker, event.previous_price,
+                        event.price, event.threshold)
+
+
+class WebhookSink:
+    """Получатель, отправляющий пачку оповещений POST-запросом.
+
+    Тело запроса: {"events": [...]} (см. event_payload).
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, url: str):
+        """Инициализация получателя.
+
+        Args:
+            session: Сессия HTTP для запросов к получателям.
+            url: Адрес webhook.
+        """
+        self.session = session
+        self.url = url
+        self.name = f"webhook:{url}"
+
+    async def send(self, events: List[CrossingEvent]) -> None:
+        body = dumps({"events": [event_payload(event) for event in events]})
+        async with self.session.post(
+                self.url, data=body,
+                headers={"Content-Type": "application/json"}) as response:
+            response.raise_for_status()
+
+
+def create_webhook_session(timeout: float = None) -> aiohttp.ClientSession:
+    """Создает сессию HTTP для webhook-получателей.
+
+    Args:
+        timeout: Общий таймаут запроса (сек, NOTIFY_TIMEOUT).
+    """
+    timeout = float(timeout or os.environ.get("NOTIFY_TIMEOUT", 5))
+    return aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=timeout))
+
+
+def sinks_from_env(session: aiohttp.ClientSession) -> List[NotificationSink]:
+    """Получатели из переменной окружения NOTIFY_WEBHOOKS.
+
+    NOTIFY_WEBHOOKS - адреса webhook через запятую. Если адресов нет,
+    оповещения только записываются в журнал.
+    """
+    urls = [url.strip()
+            for url in os.environ.get("NOTIFY_WEBHOOKS", "").split(",")
+            if url.strip()]
+    if not urls:
+        return [LogSink()]
+    return [WebhookSink(session, url) for url in urls]
+
+
+@dataclass(slots=True)
+class _Fired:
+    """Последнее оповещение о пороге."""
+    ticker: str
+    direction: str
+    threshold: float
+    time: float
+    armed: bool = False
+
+
+@dataclass
+class SinkStats:
+    """Счетчики доставки одному получателю."""
+    enqueued: int = 0
+    dropped: int = 0
+    sent: int = 0
+    failed: int = 0
+    retries: int = 0
+    batches: int = 0
+    last_latency: Optional[float] = None
+
+
+class NotificationDispatcher:
+    """Очереди и воркеры доставки оповещений.
+
+    Особенности работы:
+    - dispatch() вызывается поллером после каждого цикла опроса
+    - Воркеры работают с start() до close()
+    """
+
+    def __init__(self, sinks: Iterable[NotificationSink],
+                 queue_size: int = None, workers: int = None,
+                 cooldown: float = None, hysteresis: float = None,
+                 batch_size: int = None, batch_wait: float = None,
+                 retries: int = None, retry_delay: float = None):
+        """Инициализация диспетчера.
+
+        Незаданные параметры берутся из переменных окружения.
+
+        Args:
+            sinks: Получатели оповещений.
+            queue_size: Размер очереди получателя (NOTIFY_QUEUE_SIZE).
+            workers: Число воркеров на получателя (NOTIFY_WORKERS).
+            cooldown: Минимальный интервал (сек) между оповещениями
+                об одном пороге (NOTIFY_COOLDOWN).
+            hysteresis: Доля цены, на которую цена должна отойти от
+                порога, чтобы он сработал снова (NOTIFY_HYSTERESIS).
+            batch_size: Максимум оповещений в одной отправке
+                (NOTIFY_BATCH_SIZE).
+            batch_wait: Время (сек) ожидания наполнения пачки
+                (NOTIFY_BATCH_WAIT).
+            retries: Число повторов неудачной отправки (NOTIFY_RETRIES).
+            retry_delay: Задержка (сек) перед первым повтором, далее
+                удваивается (NOTIFY_RETRY_DELAY).
+        """
+        self.sinks = {sink.name: sink for sink in sinks}
+        self.queue_size = int(
+            queue_size or os.environ.get("NOTIFY_QUEUE_SIZE", 1000))
+        self.workers = int(workers or os.environ.get("NOTIFY_WORKERS", 2))
+        self.cooldown = float(
+            cooldown if cooldown is not None
+            else os.environ.get("NOTIFY_COOLDOWN", 300))
+        self.hysteresis = float(
+            hysteresis if hysteresis is not None
+            else os.environ.get("NOTIFY_HYSTERESIS", 0.002))
+        self.batch_size = int(
+            batch_size or os.environ.get("NOTIFY_BATCH_SIZE", 50))
+        self.batch_wait = float(
+            batch_wait if batch_wait is not None
+            else os.environ.get("NOTIFY_BATCH_WAIT", 1))
+        self.retries = int(
+            retries if retries is not None
+            else os.environ.get("NOTIFY_RETRIES", 3))
+        self.retry_delay = float(
+            retry_delay if retry_delay is not None
+            else os.environ.get("NOTIFY_RETRY_DELAY", 1))
+
+        self._queues: Dict[str, asyncio.Queue] = {
+            name: asyncio.Queue(self.queue_size) for name in self.sinks}
+        self.stats: Dict[str, SinkStats] = {
+            name: SinkStats() for name in self.sinks}
+        self._fired: Dict[Tuple[int, str], _Fired] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.suppressed = 0
+
+    def _rearm(self, prices: Dict[str, float], now: float) -> None:
+        """Взводит пороги, от которых цена отошла дальше hysteresis."""
+        for key, fired in list(self._fired.items()):
+            if not fired.armed:
+                price = prices.get(fired.ticker)
+                if price is None:
+                    continue
+                band = fired.threshold * self.hysteresis
+                if fired.direction == AlertEngine.BUY:
+                    fired.armed = price > fired.threshold + band
+                else:
+                    fired.armed = price < fired.threshold - band
+            if fired.armed and now - fired.time >= self.cooldown:
+                # Порог взведен и интервал истек - запись больше не нужна
+                del self._fired[key]
+
+    def _allow(self, event: CrossingEvent, now: float) -> bool:
+        """Разрешено ли оповещение (порог взведен, интервал истек)."""
+        key = (event.alert_id, event.direction)
+        if key in self._fired:
+            self.suppressed += 1
+            return False
+        self._fired[key] = _Fired(event.ticker, event.direction,
+                                  event.threshold, now)
+        return True
+
+    def dispatch(self, events: List[CrossingEvent],
+                 prices: Optional[Dict[str, float]] = None) -> None:
+        """Ставит оповещения в очереди получателей без ожидания.
+
+        Args:
+            events: События пересечения порогов цикла опроса.
+            prices: Цены цикла опроса - по ним взводятся сработавшие
+                пороги.
+        """
+        now = time.monotonic()
+        if self._fired:
+            self._rearm(prices or {}, now)
+        for event in events:
+            if not self._allow(event, now):
+                continue
+            for name, queue in self._queues.items():
+                stats = self.stats[name]
+                try:
+                    queue.put_nowait((event, now))
+                except asyncio.QueueFull:
+                    stats.dropped += 1
+                    logger.warning("Очередь оповещений %s переполнена, "
+                                   "оповещение %s отброшено", name,
+                                   event.alert_id)
+                else:
+                    stats.enqueued += 1
+
+    async def _next_batch(
+        self, queue: asyncio.Queue
+    ) -> List[Tuple[CrossingEvent, float]]:
+        """Ждет оповещение и добирает пачку за batch_wait."""
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_wait
+        while len(batch) < self.batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _deliver(self, sink: NotificationSink,
+                       events: List[CrossingEvent]) -> bool:
+        """Отправляет пачку с повторами. Возвращает успех отправки."""
+        stats = self.stats[sink.name]
+        for attempt in range(self.retries + 1):
+            try:
+                await sink.send(events)
+                return True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if attempt == self.retries:
+                    logger.error("Не удалось доставить %s оповещений "
+                                 "получателю %s: %s", len(events),
+                                 sink.name, e)
+                    return False
+                stats.retries += 1
+                delay = self.retry_delay * 2 ** attempt
+                logger.warning("Ошибка доставки получателю %s: %s, "
+                               "повтор через %s сек", sink.name, e, delay)
+                await asyncio.sleep(delay)
+        return False
+
+    async def _worker(self, name: str) -> None:
+        """Доставляет оповещения из очереди получателя."""
+        sink = self.sinks[name]
+        queue = self._queues[name]
+        stats = self.stats[name]
+        while True:
+            batch = await self._next_batch(queue)
+            try:
+                events = [event for event, _ in batch]
+                stats.batches += 1
+                if await self._deliver(sink, events):
+                    stats.sent += len(events)
+                    stats.last_latency = time.monotonic() - batch[0][1]
+                else:
+                    stats.failed += len(events)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def start(self) -> None:
+        """Запускает воркеры всех получателей."""
+        if self._tasks:
+            return
+        for name in self.sinks:
+            for _ in range(self.workers):
+                self._tasks.append(asyncio.create_task(self._worker(name)))
+
+    async def join(self) -> None:
+        """Ждет доставки всех оповещений из очередей."""
+        await asyncio.gather(*(queue.join()
+                               for queue in self._queues.values()))
+
+    async def close(self, timeout: float = 5) -> None:
+        """Останавливает воркеры, дав им timeout сек на доставку."""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Не доставлено оповещений: %s", sum(
+                    queue.qsize() for queue in self._queues.values()))
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def status(self) -> dict:
+        """Очереди и счетчики доставки для мониторинга."""
+        return {
+            "suppressed": self.suppressed,
+            "tracked_thresholds": len(self._fired),
+            "sinks": {
+                name: {"queued": self._queues[name].qsize(),
+                       "capacity": self.queue_size,
+                       **vars(stats)}
+                for name, stats in self.stats.items()
+            },
+        }
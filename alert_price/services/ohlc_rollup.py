@@ -0,0 +1,215 @@
+"""
+Модуль свертки цен в свечи OHLC разных интервалов.
+
+Основные особенности:
+- Свечи 1m, 5m, 1h и 1d обновляются по мере поступления цен от
+  поллера: на каждое изменение цены приходится O(1) работы на интервал
+- Текущие (незакрытые) свечи хранятся в памяти ведущего и одним HSET
+  на интервал сохраняются в Redis после каждого цикла, закрытые свечи
+  добавляются в ограниченный список тикера
+- Свечи читает любой воркер: закрытые из списка, текущую из хеша
+- Дневные свечи начинаются в полночь по московскому времени
+- Свечи строятся только по изменениям цены: интервал, в котором цена
+  не менялась, свечи не получает
+"""
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Длительность интервалов свечей (сек)
+INTERVALS: Dict[str, int] = {"1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
+
+# Смещение московского времени от UTC (сек): границы дневных свечей
+MOSCOW_OFFSET = 3 * 3600
+
+
+@dataclass(slots=True)
+class Bar:
+    """Свеча OHLC.
+
+    Атрибуты:
+        start: Начало интервала (unix, сек).
+        open, high, low, close: Цены открытия, максимум, минимум и
+            цена закрытия.
+    """
+    start: int
+    open: float
+    high: float
+    low: float
+    close: float
+
+    def update(self, price: float) -> None:
+        """Учитывает новую цену внутри интервала свечи."""
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+
+    def pack(self) -> str:
+        """Компактная запись свечи для Redis."""
+        return (f"{self.start},{self.open!r},{self.high!r},{self.low!r},"
+                f"{self.close!r}")
+
+    @classmethod
+    def unpack(cls, raw) -> "Bar":
+        """Восстанавливает свечу из записи pack()."""
+        if isinstance(raw, bytes):
+            raw = raw.decode()
+        start, *prices = raw.split(",")
+        return cls(int(start), *map(float, prices))
+
+    def as_list(self) -> list:
+        """Свеча в виде [start, open, high, low, close] для ответа API."""
+        return [self.start, self.open, self.high, self.low, self.close]
+
+
+def bucket_start(timestamp: float, width: int) -> int:
+    """Начало интервала width, в который попадает timestamp."""
+    shifted = int(timestamp) + MOSCOW_OFFSET
+    return shifted - shifted % width - MOSCOW_OFFSET
+
+
+class OHLCRollup:
+    """Свертка изменений цен в свечи OHLC с хранением в Redis.
+
+    Особенности работы:
+    - update() меняет только память процесса, flush() отправляет
+      изменения одним конвейером
+    - load() восстанавливает текущие свечи из Redis, когда процесс
+      становится ведущим
+    """
+
+    def __init__(self, redis_client: Redis,
+                 intervals: Optional[Dict[str, int]] = None,
+                 history: int = None, key_prefix: str = "moex:bars"):
+        """Инициализация свертки.
+
+        Args:
+            redis_client: Асинхронный клиент Redis.
+            intervals: Интервалы {имя: длительность в сек}, по
+                умолчанию INTERVALS.
+            history: Сколько закрытых свечей хранить на тикер и интервал
+                (OHLC_HISTORY).
+            key_prefix: Префикс ключей Redis.
+        """
+        self.redis = redis_client
+        self.intervals = intervals or INTERVALS
+        self.history = int(history or os.environ.get("OHLC_HISTORY", 1440))
+        self.key_prefix = key_prefix
+
+        # {интервал: {тикер: текущая свеча}}
+        self._current: Dict[str, Dict[str, Bar]] = {
+            name: {} for name in self.intervals}
+        # Изменения с последнего flush()
+        self._dirty: Dict[str, Dict[str, Bar]] = {
+            name: {} for name in self.intervals}
+        self._closed: List[Tuple[str, str, Bar]] = []
+
+    def _current_key(self, interval: str) -> str:
+        return f"{self.key_prefix}:{interval}:current"
+
+    def _closed_key(self, interval: str, ticker: str) -> str:
+        return f"{self.key_prefix}:{interval}:{ticker}"
+
+    def update(self, prices: Dict[str, float],
+               timestamp: Optional[float] = None) -> None:
+        """Учитывает цены цикла опроса во всех интервалах.
+
+        Args:
+            prices: Изменившиеся цены {тикер: цена}.
+            timestamp: Время цен (unix, сек), по умолчанию сейчас.
+        """
+        timestamp = timestamp or time.time()
+        for name, width in self.intervals.items():
+            start = bucket_start(timestamp, width)
+            current = self._current[name]
+            dirty = self._dirty[name]
+            for ticker, price in prices.items():
+                bar = current.get(ticker)
+                if bar is None or bar.start != start:
+                    if bar is not None:
+                        self._closed.append((name, ticker, bar))
+                    bar = current[ticker] = Bar(start, price, price,
+                                                price, price)
+                else:
+                    bar.update(price)
+                dirty[ticker] = bar
+
+    async def flush(self) -> None:
+        """Сохраняет в Redis измененные текущие и закрытые свечи."""
+        if not self._closed and not any(self._dirty.values()):
+            return
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for name, dirty in self._dirty.items():
+                if dirty:
+                    pipe.hset(self._current_key(name), mapping={
+                        ticker: bar.pack() for ticker, bar in dirty.items()})
+            for name, ticker, bar in self._closed:
+                key = self._closed_key(name, ticker)
+                pipe.rpush(key, bar.pack())
+                pipe.ltrim(key, -self.history, -1)
+            await pipe.execute()
+
+        for dirty in self._dirty.values():
+            dirty.clear()
+        self._closed.clear()
+
+    async def load(self) -> None:
+        """Загружает текущие свечи из Redis (смена ведущего)."""
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for name in self.intervals:
+                pipe.hgetall(self._current_key(name))
+            results = await pipe.execute()
+
+        for name, raw in zip(self.intervals, results):
+            self._current[name] = {
+                ticker.decode(): Bar.unpack(packed)
+                for ticker, packed in raw.items()}
+            self._dirty[name].clear()
+        self._closed.clear()
+
+    async def get_bars(self, ticker: str, interval: str,
+                       since: Optional[float] = None,
+                       limit: Optional[int] = None) -> List[Bar]:
+        """Возвращает свечи тикера по возрастанию времени.
+
+        Args:
+            ticker: Тикер.
+            interval: Имя интервала (1m, 5m, 1h, 1d).
+            since: Только свечи, начавшиеся не раньше (unix, сек).
+            limit: Максимум последних свечей.
+
+        Returns:
+            List[Bar]: Закрытые свечи и текущая свеча.
+
+        Raises:
+            KeyError: Если интервал не поддерживается.
+        """
+        if interval not in self.intervals:
+            raise KeyError(interval)
+        # Без since достаточно последних limit закрытых свечей
+        first = -limit if limit and since is None else 0
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.lrange(self._closed_key(interval, ticker), first, -1)
+            pipe.hget(self._current_key(interval), ticker)
+            closed, current = await pipe.execute()
+
+        bars = [Bar.unpack(raw) for raw in closed]
+        if current is not None:
+            current = Bar.unpack(current)
+            if not bars or bars[-1].start < current.start:
+                bars.append(current)
+        if since is not None:
+            bars = [bar for bar in bars if bar.start >= since]
+        if limit is not None:
+            bars = bars[-limit:]
+        return bars
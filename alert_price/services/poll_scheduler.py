@@ -0,0 +1,228 @@
+"""
+Модуль планирования опросов MOEX с учетом торгового расписания.
+
+Основные особенности:
+- Фаза торгов (утренняя сессия и аукцион открытия, основная и вечерняя
+  сессии, закрытый рынок) определяется по московскому времени
+- Для каждой фазы задан свой интервал опроса, сон не выходит за
+  ближайшую смену фазы
+- Тики с фиксированной частотой: интервал отсчитывается от начала
+  предыдущего цикла, время запроса не накапливает сдвиг
+- При ошибках MOEX интервал растет экспоненциально со случайным
+  разбросом (jitter)
+- Если цена отслеживаемого тикера близка к порогу, во время торгов
+  используется ускоренный интервал
+"""
+
+import logging
+import os
+import random
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Московское время (без перехода на летнее время)
+MOSCOW_TZ = timezone(timedelta(hours=3), "MSK")
+
+
+class TradingCalendar:
+    """Расписание торгов фондового рынка MOEX.
+
+    Особенности работы:
+    - Суббота, воскресенье и даты из holidays считаются выходными
+    - Время вне сессий относится к фазе CLOSED
+    """
+
+    PRE_OPEN = "pre_open"
+    MAIN = "main"
+    EVENING = "evening"
+    CLOSED = "closed"
+
+    # (фаза, начало, конец) по московскому времени
+    SESSIONS: Tuple[Tuple[str, dt_time, dt_time], ...] = (
+        (PRE_OPEN, dt_time(6, 50), dt_time(10, 0)),
+        (MAIN, dt_time(10, 0), dt_time(18, 50)),
+        (EVENING, dt_time(19, 0), dt_time(23, 50)),
+    )
+
+    def __init__(self, holidays: Iterable[date] = (),
+                 sessions: Optional[Tuple[Tuple[str, dt_time, dt_time],
+                                          ...]] = None):
+        """Инициализация расписания.
+
+        Args:
+            holidays: Нерабочие даты биржи.
+            sessions: Сессии (фаза, начало, конец), по умолчанию SESSIONS.
+        """
+        self.holidays: FrozenSet[date] = frozenset(holidays)
+        self.sessions = sessions or self.SESSIONS
+
+    @classmethod
+    def from_env(cls) -> "TradingCalendar":
+        """Создает расписание с выходными из MOEX_HOLIDAYS (YYYY-MM-DD,...)."""
+        raw = os.environ.get("MOEX_HOLIDAYS", "")
+        return cls(date.fromisoformat(day.strip())
+                   for day in raw.split(",") if day.strip())
+
+    def is_trading_day(self, day: date) -> bool:
+        """Проходят ли торги в указанную дату."""
+        return day.weekday() < 5 and day not in self.holidays
+
+    def phase(self, now: Optional[datetime] = None) -> str:
+        """Возвращает фазу торгов в момент now (по умолчанию сейчас)."""
+        now = (now or datetime.now(MOSCOW_TZ)).astimezone(MOSCOW_TZ)
+        if not self.is_trading_day(now.date()):
+            return self.CLOSED
+        current = now.timetz().replace(tzinfo=None)
+        for phase, start, end in self.sessions:
+            if start <= current < end:
+                return phase
+        return self.CLOSED
+
+    def seconds_until_change(self, now: Optional[datetime] = None) -> float:
+        """Время (сек) до ближайшей возможной смены фазы.
+
+        Учитываются границы сессий сегодня и завтра и полночь, поэтому
+        результат не больше суток.
+        """
+        now = (now or datetime.now(MOSCOW_TZ)).astimezone(MOSCOW_TZ)
+        today = now.date()
+        boundaries = [datetime.combine(today + timedelta(days=1),
+                                       dt_time(0), MOSCOW_TZ)]
+        for day in (today, today + timedelta(days=1)):
+            for _, start, end in self.sessions:
+                boundaries.append(datetime.combine(day, start, MOSCOW_TZ))
+                boundaries.append(datetime.combine(day, end, MOSCOW_TZ))
+        return min((boundary - now).total_seconds()
+                   for boundary in boundaries if boundary > now)
+
+
+class PollScheduler:
+    """Планировщик интервалов между опросами MOEX.
+
+    Особенности работы:
+    - start_cycle() отмечает начало цикла, record_success() и
+      record_failure() - его результат, next_delay() возвращает паузу
+      до следующего цикла
+    - После ошибки пауза равна base * 2^(n-1), но не больше
+      backoff_max, умноженной на случайный коэффициент из [0.5, 1]
+    """
+
+    DEFAULT_CADENCES = {
+        TradingCalendar.PRE_OPEN: 30.0,
+        TradingCalendar.MAIN: 30.0,
+        TradingCalendar.EVENING: 60.0,
+        TradingCalendar.CLOSED: 900.0,
+    }
+
+    def __init__(self, calendar: Optional[TradingCalendar] = None,
+                 cadences: Optional[Dict[str, float]] = None,
+                 fast_cadence: float = 0.0,
+                 backoff_base: float = 5.0,
+                 backoff_max: float = 300.0,
+                 clock=time.monotonic,
+                 wall_clock=None,
+                 rng: Optional[random.Random] = None):
+        """Инициализация планировщика.
+
+        Args:
+            calendar: Расписание торгов.
+            cadences: Интервалы опроса (сек) по фазам торгов.
+            fast_cadence: Интервал (сек) при цене рядом с порогом во
+                время торгов, 0 - не ускорять.
+            backoff_base: Пауза (сек) после первой ошибки подряд.
+            backoff_max: Максимальная пауза (сек) при ошибках.
+            clock: Монотонные часы (для тестов).
+            wall_clock: Функция текущего времени datetime (для тестов).
+            rng: Генератор случайных чисел для разброса пауз.
+        """
+        self.calendar = calendar or TradingCalendar()
+        self.cadences = {**self.DEFAULT_CADENCES, **(cadences or {})}
+        self.fast_cadence = fast_cadence
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._clock = clock
+        self._wall_clock = wall_clock or (lambda: datetime.now(MOSCOW_TZ))
+        self._rng = rng or random.Random()
+
+        self.failures = 0
+        self.near_threshold = False
+        self.phase = self.calendar.phase(self._wall_clock())
+        self.interval = self.cadences[self.phase]
+        self._cycle_started: Optional[float] = None
+
+    @classmethod
+    def from_env(cls, main_cadence: float) -> "PollScheduler":
+        """Создает планировщик с параметрами из переменных окружения.
+
+        Args:
+            main_cadence: Интервал основной сессии по умолчанию.
+        """
+        env = os.environ.get
+        return cls(
+            calendar=TradingCalendar.from_env(),
+            cadences={
+                TradingCalendar.PRE_OPEN: float(
+                    env("MOEX_CADENCE_PRE_OPEN", main_cadence)),
+                TradingCalendar.MAIN: float(
+                    env("MOEX_CADENCE_MAIN", main_cadence)),
+                TradingCalendar.EVENING: float(
+                    env("MOEX_CADENCE_EVENING", 2 * main_cadence)),
+                TradingCalendar.CLOSED: float(
+                    env("MOEX_CADENCE_CLOSED", 900)),
+            },
+            fast_cadence=float(env("MOEX_CADENCE_FAST", 0)),
+            backoff_base=float(env("MOEX_BACKOFF_BASE", 5)),
+            backoff_max=float(env("MOEX_BACKOFF_MAX", 300))
+        )
+
+    def start_cycle(self) -> None:
+        """Отмечает начало цикла опроса."""
+        self._cycle_started = self._clock()
+
+    def record_success(self, near_threshold: bool = False) -> None:
+        """Отмечает успешный цикл.
+
+        Args:
+            near_threshold: Есть ли цена рядом с порогом оповещения.
+        """
+        if self.failures:
+            logger.info("MOEX снова отвечает после %s ошибок подряд",
+                        self.failures)
+        self.failures = 0
+        self.near_threshold = near_threshold
+
+    def record_failure(self) -> None:
+        """Отмечает цикл, завершившийся ошибкой."""
+        self.failures += 1
+
+    def _backoff(self) -> float:
+        """Пауза после ошибки с экспоненциальным ростом и разбросом."""
+        delay = min(self.backoff_base * 2 ** (self.failures - 1),
+                    self.backoff_max)
+        return delay * self._rng.uniform(0.5, 1.0)
+
+    def next_delay(self) -> float:
+        """Возвращает паузу (сек) до следующего цикла опроса."""
+        now = self._clock()
+        wall_now = self._wall_clock()
+        phase = self.calendar.phase(wall_now)
+        if phase != self.phase:
+            logger.info("Фаза торгов MOEX: %s", phase)
+            self.phase = phase
+
+        if self.failures:
+            return self._backoff()
+
+        interval = self.cadences[phase]
+        if (self.fast_cadence and self.near_threshold
+                and phase != TradingCalendar.CLOSED):
+            interval = min(interval, self.fast_cadence)
+        self.interval = interval
+
+        started = (self._cycle_started if self._cycle_started is not None
+                   else now)
+        delay = max(started + interval - now, 0.0)
+        return min(delay, self.calendar.seconds_until_change(wall_now))
@@ -0,0 +1,118 @@
+"""
+Модуль рассылки снимков цен подписчикам (Server-Sent Events).
+
+Основные особенности:
+- Снимок сериализуется один раз за цикл опроса и раздается всем подписчикам
+- У каждого подписчика очередь из одного кадра: медленный клиент
+  пропускает устаревшие снимки и получает только последний
+- При отсутствии новых данных отправляются кадры heartbeat
+"""
+
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+class PriceBroadcaster:
+    """Рассыльщик снимков цен в формате text/event-stream.
+
+    Особенности работы:
+    - publish не блокируется и не ждет подписчиков
+    - Новый подписчик сразу получает последний опубликованный снимок
+    """
+
+    EVENT_NAME = "prices"
+    HEARTBEAT_FRAME = b": heartbeat\n\n"
+
+    def __init__(self, heartbeat_interval: float = 15.0,
+                 retry_ms: int = 5000):
+        """Инициализация рассыльщика.
+
+        Args:
+            heartbeat_interval: Интервал (сек) кадров heartbeat при
+                отсутствии новых снимков.
+            retry_ms: Задержка переподключения клиента EventSource (мс).
+        """
+        self.heartbeat_interval = heartbeat_interval
+        self.retry_ms = retry_ms
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._last_frame: Optional[bytes] = None
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def subscribers_count(self) -> int:
+        """Количество подключенных подписчиков."""
+        return len(self._subscribers)
+
+    @property
+    def has_snapshot(self) -> bool:
+        """Публиковался ли хотя бы один снимок."""
+        return self._last_frame is not None
+
+    def encode(self, payload: dict) -> bytes:
+        """Сериализует снимок в кадр SSE.
+
+        Args:
+            payload: Данные снимка цен.
+
+        Returns:
+            bytes: Кадр event-stream.
+        """
+        data = json.dumps(payload, ensure_ascii=False,
+                          separators=(",", ":"))
+        return f"event: {self.EVENT_NAME}\ndata: {data}\n\n".encode()
+
+    def publish(self, payload: dict) -> None:
+        """Публикует новый снимок всем подписчикам.
+
+        Args:
+            payload: Данные снимка цен.
+        """
+        frame = self.encode(payload)
+        self._last_frame = frame
+        self.published += 1
+
+        for queue in self._subscribers:
+            if queue.full():
+                # Подписчик не успел забрать предыдущий снимок
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(frame)
+
+    async def subscribe(
+        self, initial: Optional[dict] = None
+    ) -> AsyncIterator[bytes]:
+        """Возвращает поток кадров для одного подписчика.
+
+        Args:
+            initial: Снимок для первого кадра, если рассыльщик еще
+                ничего не публиковал.
+
+        Yields:
+            bytes: Кадры event-stream (данные или heartbeat).
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        if self._last_frame is not None:
+            queue.put_nowait(self._last_frame)
+        elif initial is not None:
+            queue.put_nowait(self.encode(initial))
+
+        self._subscribers.add(queue)
+        logger.debug("Новый подписчик потока цен, всего: %s",
+                     len(self._subscribers))
+        try:
+            yield f"retry: {self.retry_ms}\n\n".encode()
+            while True:
+                try:
+                    yield await asyncio.wait_for(
+                        queue.get(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield self.HEARTBEAT_FRAME
+        finally:
+            self._subscribers.discard(queue)
+            logger.debug("Подписчик потока цен отключен, всего: %s",
+                         len(self._subscribers))
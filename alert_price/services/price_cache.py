@@ -5,16 +5,44 @@
 - Сохраняет старые значения ключей, если они не были обновлены
 - Не удаляет данные автоматически по таймауту
 - Гарантирует доступность последних полученных цен
+- Записывает только изменившиеся цены и ведет версию снимка
+  с ограниченным журналом изменений для инкрементального чтения
 """
 
-from typing import Dict, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
+import json
 import logging
+import time
 from redis.asyncio import Redis
 from fastapi import HTTPException
 
+from alert_price.utils.metrics import Histogram, timed
+
 logger = logging.getLogger(__name__)
 
+REDIS_SECONDS = Histogram("redis_operation_seconds",
+                          "Длительность операций кеша цен в Redis",
+                          ("operation",))
+
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    """Снимок кеша цен.
+
+    Атрибуты:
+        version: Версия снимка (растет при каждой записи изменений).
+        prices: Словарь {тикер: цена}.
+        updated_at: Время последнего обновления кеша поллером.
+        next_poll_at: Время следующего опроса MOEX, назначенное
+            поллером (None, если неизвестно).
+    """
+    version: int
+    prices: Dict[str, float]
+    updated_at: Optional[datetime]
+    next_poll_at: Optional[datetime] = None
+
 
 class PriceCache:
     """Кеш биржевых цен с персистентным хранением данных.
@@ -23,23 +51,101 @@ class PriceCache:
     - При обновлении изменяются только переданные значения
     - Непереданные ключи сохраняют свои значения
     - Данные не имеют срока годности (хранятся до явного удаления)
+    - Новый словарь цен сравнивается с предыдущим снимком, в Redis
+      пишутся только изменившиеся тикеры
+    - Каждая запись увеличивает версию и добавляет изменения в журнал
+      из changelog_size последних версий
+    - Тикеры, отсутствующие в новом словаре, не удаляются (режим
+      торгов мог не ответить в цикле), удаление - remove_prices()
+    - После записи версия публикуется в канал updates_channel
     """
 
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Redis, changelog_size: int = 120):
         """Инициализация кеша.
 
         Args:
             redis_client: Асинхронный клиент Redis для хранения данных
+            changelog_size: Количество последних версий в журнале изменений
         """
         self.redis = redis_client
         self.cache_key = "moex:latest_prices"  # Ключ для хранения цен
+        # Хеш с полями version, updated_at и next_poll_at
+        self.meta_key = "moex:prices_meta"
+        # Список изменений, новые версии в начале
+        self.changelog_key = "moex:prices_changelog"
+        self.changelog_size = changelog_size
+        # Канал pub/sub, в который публикуется версия после каждой записи
+        self.updates_channel = "moex:prices_updates"
+
+        # Последний записанный снимок (только в процессе поллера)
+        self._snapshot: Optional[Dict[str, float]] = None
+        self._version = 0
+        self._updated_at: Optional[datetime] = None
+        self.last_changes: Dict[str, float] = {}
+
+    @staticmethod
+    def _decode_prices(raw: dict) -> Dict[str, float]:
+        """Декодирует ответ HGETALL/HMGET в словарь {тикер: цена}."""
+        return {
+            ticker.decode(): float(price.decode())
+            for ticker, price in raw.items()
+        }
+
+    # Поля хеша метаданных в порядке _decode_meta
+    META_FIELDS = ("version", "updated_at", "next_poll_at")
+
+    @staticmethod
+    def _decode_meta(version, updated_at, next_poll_at=None
+                     ) -> Tuple[int, Optional[datetime], Optional[datetime]]:
+        """Декодирует поля хеша метаданных."""
+        return (
+            int(version) if version is not None else 0,
+            (datetime.fromtimestamp(float(updated_at))
+             if updated_at is not None else None),
+            (datetime.fromtimestamp(float(next_poll_at))
+             if next_poll_at is not None else None)
+        )
+
+    async def _load_snapshot(self) -> None:
+        """Загружает из Redis снимок, с которым сравниваются новые цены."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hgetall(self.cache_key)
+            pipe.hmget(self.meta_key, "version", "updated_at")
+            raw, meta = await pipe.execute()
+
+        self._snapshot = self._decode_prices(raw)
+        self._version, self._updated_at, _ = self._decode_meta(*meta)
+
+    @property
+    def snapshot(self) -> Optional[PriceSnapshot]:
+        """Последний записанный этим процессом снимок (без обращения к Redis).
 
+        Returns:
+            Optional[PriceSnapshot]: Снимок или None, если запись
+            еще не выполнялась.
+        """
+        if self._snapshot is None:
+            return None
+        return PriceSnapshot(version=self._version,
+                             prices=dict(self._snapshot),
+                             updated_at=self._updated_at)
+
+    def forget_snapshot(self) -> None:
+        """Сбрасывает записанный снимок, следующая запись перечитает его.
+
+        Вызывается, когда процесс снова становится ведущим: пока он
+        не опрашивал MOEX, кеш мог изменить другой процесс.
+        """
+        self._snapshot = None
+
+    @timed(REDIS_SECONDS, "save_prices")
     async def save_prices(self, prices: Dict[str, float]) -> bool:
         """
         Безопасное сохранение цен с использованием Redis Pipeline.
 
-        Сохраняет только переданные значения, остальные данные без изменений.
-        Использует атомарную операцию через контекстный менеджер.
+        Сохраняет только изменившиеся значения, остальные данные без
+        изменений. Запись цен, версии и журнала выполняется одной
+        транзакцией MULTI/EXEC.
 
         Args:
             prices: Словарь {тикер: цена} для обновления
@@ -56,59 +162,307 @@ class PriceCache:
             return True
 
         try:
-            async with self.redis.pipeline() as pipe:
-                # Атомарная операция с частичным обновлением:
-                await pipe.hset(self.cache_key, mapping=prices)
-                await pipe.execute()  # Фиксация изменений
+            if self._snapshot is None:
+                await self._load_snapshot()
 
-            logger.debug("Обновлено %s тикеров", len(prices))
+            changes = {
+                ticker: price for ticker, price in prices.items()
+                if self._snapshot.get(ticker) != price
+            }
+            now = time.time()
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hset(self.meta_key, "updated_at", now)
+                if changes:
+                    pipe.hset(self.cache_key, mapping=changes)
+                    pipe.hincrby(self.meta_key, "version", 1)
+                    pipe.lpush(self.changelog_key, json.dumps(changes))
+                    pipe.ltrim(self.changelog_key, 0,
+                               self.changelog_size - 1)
+                results = await pipe.execute()  # Фиксация изменений
+
+            self._updated_at = datetime.fromtimestamp(now)
+            self.last_changes = changes
+            if changes:
+                version = results[2]
+                if version != self._version + 1:
+                    # Кеш изменен извне - перечитаем снимок при следующей
+                    # записи
+                    logger.warning("Версия кеша цен %s вместо ожидаемой %s",
+                                   version, self._version + 1)
+                    self._snapshot = None
+                else:
+                    self._snapshot.update(changes)
+                self._version = version
+
+            await self.redis.publish(self.updates_channel, self._version)
+            logger.debug("Изменилось %s из %s тикеров, версия %s",
+                         len(changes), len(prices), self._version)
             return True
 
         except Exception as e:
             logger.error("Ошибка сохранения в Redis: %s", str(e))
+            self._snapshot = None
             return False
 
+    @timed(REDIS_SECONDS, "remove_prices")
+    async def remove_prices(self, tickers: Iterable[str]) -> bool:
+        """Удаляет тикеры из кеша (например, исключенные из торгов).
+
+        Удаление увеличивает версию и попадает в журнал изменений со
+        значением None: клиент, читающий ?since=, получает null и
+        удаляет тикер у себя.
+
+        Args:
+            tickers: Удаляемые тикеры.
+
+        Returns:
+            bool: True если удаление успешно, False при ошибке
+        """
+        try:
+            if self._snapshot is None:
+                await self._load_snapshot()
+
+            removed = [ticker for ticker in dict.fromkeys(tickers)
+                       if ticker in self._snapshot]
+            if not removed:
+                return True
+
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hdel(self.cache_key, *removed)
+                pipe.hincrby(self.meta_key, "version", 1)
+                pipe.lpush(self.changelog_key,
+                           json.dumps(dict.fromkeys(removed)))
+                pipe.ltrim(self.changelog_key, 0, self.changelog_size - 1)
+                results = await pipe.execute()
+
+            version = results[1]
+            if version != self._version + 1:
+                logger.warning("Версия кеша цен %s вместо ожидаемой %s",
+                               version, self._version + 1)
+                self._snapshot = None
+            else:
+                for ticker in removed:
+                    del self._snapshot[ticker]
+            self._version = version
+
+            await self.redis.publish(self.updates_channel, self._version)
+            logger.info("Из кеша цен удалены тикеры: %s", ", ".join(removed))
+            return True
+
+        except Exception as e:
+            logger.error("Ошибка удаления цен из Redis: %s", str(e))
+            self._snapshot = None
+            return False
+
+    @timed(REDIS_SECONDS, "get_prices")
     async def get_prices(self) -> Dict[str, float]:
         """Получает все текущие цены из кеша.
 
         Returns:
             Dict[str, float]: Словарь всех доступных цен {тикер: цена}
 
+        Raises:
+            HTTPException: Если в кеше нет данных (код 503)
+        """
+        return (await self.get_snapshot()).prices
+
+    @timed(REDIS_SECONDS, "get_snapshot")
+    async def get_snapshot(self) -> PriceSnapshot:
+        """Получает все текущие цены вместе с версией снимка.
+
+        Returns:
+            PriceSnapshot: Согласованный снимок цен и метаданных.
+
         Raises:
             HTTPException: Если в кеше нет данных (код 503)
         """
         try:
-            prices = await self.redis.hgetall(self.cache_key)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hgetall(self.cache_key)
+                pipe.hmget(self.meta_key, *self.META_FIELDS)
+                prices, meta = await pipe.execute()
+
             if not prices:
                 raise HTTPException(
                     status_code=503,
                     detail="Цены временно недоступны"
                 )
 
-            return {
-                ticker.decode(): float(price.decode())
-                for ticker, price in prices.items()
-            }
+            version, updated_at, next_poll_at = self._decode_meta(*meta)
+            return PriceSnapshot(version=version,
+                                 prices=self._decode_prices(prices),
+                                 updated_at=updated_at,
+                                 next_poll_at=next_poll_at)
 
         except Exception as e:
             logger.error("Ошибка при получении цены.")
             raise HTTPException(status_code=503,
                   detail="Ошибка доступа к данным.") from e
 
+    @timed(REDIS_SECONDS, "get_prices_for")
+    async def get_prices_for(
+        self, tickers: List[str], batch_size: int = 500
+    ) -> Tuple[PriceSnapshot, List[str]]:
+        """Получает цены только указанных тикеров (HMGET).
+
+        Большие списки разбиваются на пакеты по batch_size полей, все
+        пакеты и метаданные читаются одной транзакцией.
+
+        Args:
+            tickers: Список тикеров.
+            batch_size: Максимальное число полей в одной команде HMGET.
+
+        Returns:
+            Tuple[PriceSnapshot, List[str]]: Снимок с найденными ценами и
+            список тикеров, которых нет в кеше.
+
+        Raises:
+            HTTPException: Если кеш недоступен (код 503)
+        """
+        try:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.hmget(self.meta_key, *self.META_FIELDS)
+                for start in range(0, len(tickers), batch_size):
+                    pipe.hmget(self.cache_key,
+                               tickers[start:start + batch_size])
+                meta, *batches = await pipe.execute()
+
+        except Exception as e:
+            logger.error("Ошибка при получении цен по списку тикеров.")
+            raise HTTPException(status_code=503,
+                  detail="Ошибка доступа к данным.") from e
+
+        prices = {}
+        missing = []
+        values = (value for batch in batches for value in batch)
+        for ticker, value in zip(tickers, values):
+            if value is None:
+                missing.append(ticker)
+            else:
+                prices[ticker] = float(value)
+
+        version, updated_at, next_poll_at = self._decode_meta(*meta)
+        return PriceSnapshot(version, prices, updated_at,
+                             next_poll_at), missing
+
+    @timed(REDIS_SECONDS, "get_changes_since")
+    async def get_changes_since(
+        self, since: int
+    ) -> Tuple[PriceSnapshot, bool]:
+        """Возвращает цены, изменившиеся после указанной версии.
+
+        Если версия старше журнала изменений (или больше текущей),
+        возвращается полный снимок. Удаленный тикер (remove_prices)
+        возвращается в изменениях со значением None.
+
+        Args:
+            since: Версия снимка, которая уже есть у клиента.
+
+        Returns:
+            Tuple[PriceSnapshot, bool]: Снимок с изменившимися ценами и
+            признак того, что это полный снимок.
+
+        Raises:
+            HTTPException: Если кеш недоступен (код 503)
+        """
+        try:
+            version, updated_at, next_poll_at = await self.get_meta()
+
+            # Между чтением версии и журнала поллер может записать новую
+            # версию - тогда повторяем чтение с учетом новой версии
+            for _ in range(3):
+                behind = version - since
+                if behind < 0 or behind > self.changelog_size:
+                    return await self.get_snapshot(), True
+                if behind == 0:
+                    return PriceSnapshot(version, {}, updated_at,
+                                         next_poll_at), False
+
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.hmget(self.meta_key, *self.META_FIELDS)
+                    pipe.lrange(self.changelog_key, 0, behind - 1)
+                    meta, entries = await pipe.execute()
+
+                current, updated_at, next_poll_at = self._decode_meta(*meta)
+                if current == version:
+                    if len(entries) < behind:
+                        # Журнал короче ожидаемого (очищен или усечен)
+                        return await self.get_snapshot(), True
+                    break
+                version = current
+            else:
+                return await self.get_snapshot(), True
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error("Ошибка при получении изменений цен.")
+            raise HTTPException(status_code=503,
+                  detail="Ошибка доступа к данным.") from e
+
+        changes = {}
+        for entry in reversed(entries):
+            changes.update(json.loads(entry))
+        return PriceSnapshot(version, changes, updated_at,
+                             next_poll_at), False
+
+    @timed(REDIS_SECONDS, "get_meta")
+    async def get_meta(
+        self
+    ) -> Tuple[int, Optional[datetime], Optional[datetime]]:
+        """Возвращает метаданные снимка без чтения цен.
+
+        Returns:
+            Tuple[int, Optional[datetime], Optional[datetime]]: Версия,
+            время обновления и время следующего опроса MOEX.
+
+        Raises:
+            HTTPException: Если кеш недоступен (код 503)
+        """
+        try:
+            return self._decode_meta(
+                *await self.redis.hmget(self.meta_key, *self.META_FIELDS))
+        except Exception as e:
+            logger.error("Ошибка при получении версии кеша цен.")
+            raise HTTPException(status_code=503,
+                  detail="Ошибка доступа к данным.") from e
+
+    @timed(REDIS_SECONDS, "set_next_poll")
+    async def set_next_poll(self, delay: float) -> None:
+        """Записывает время следующего опроса MOEX в метаданные.
+
+        Читатели ограничивают им срок кеширования ответа с ценами
+        (max-age): до этого времени снимок не изменится.
+
+        Args:
+            delay: Пауза (сек) до следующего опроса.
+        """
+        await self.redis.hset(self.meta_key, "next_poll_at",
+                              time.time() + delay)
+
+    @timed(REDIS_SECONDS, "get_last_update_time")
     async def get_last_update_time(self) -> Optional[datetime]:
-        """Возвращает время последнего обновления любого тикера.
+        """Возвращает время последнего обновления кеша поллером.
 
         Note:
-            Возвращает текущее время, так как данные
-            всегда считаются актуальными.
+            Для кеша, записанного до появления метаданных, возвращает
+            текущее время, если цены есть.
 
         Returns:
-            Optional[datetime]: Всегда возвращает текущее время
+            Optional[datetime]: Время обновления или None, если кеш пуст
         """
+        updated_at = await self.redis.hget(self.meta_key, "updated_at")
+        if updated_at is not None:
+            return datetime.fromtimestamp(float(updated_at))
         exists = await self.redis.exists(self.cache_key)
         return datetime.now() if exists else None
 
+    @timed(REDIS_SECONDS, "clear_cache")
     async def clear_cache(self) -> None:
         """Полностью очищает кеш цен."""
-        await self.redis.delete(self.cache_key)
+        await self.redis.delete(self.cache_key, self.meta_key,
+                                self.changelog_key)
+        self._snapshot = None
+        self._version = 0
         logger.info("Кеш цен полностью очищен")
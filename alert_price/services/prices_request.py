@@ -1,13 +1,173 @@
 """Модуль содержит класс, для запроса котировок акции MOEX."""
 
+import asyncio
 import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
 import aiohttp
 
+from alert_price.services.iss_parser import parse_quotes
+from alert_price.utils.fast_json import loads
+from alert_price.utils.metrics import Counter
+
 logger = logging.getLogger(__name__)
 
+MOEX_RESPONSES = Counter(
+    "moex_responses", "Ответы MOEX ISS по режимам торгов и кодам HTTP "
+    "(error - ошибка соединения, timeout - таймаут)", ("board", "status"))
+MOEX_RESPONSE_BYTES = Counter(
+    "moex_response_bytes", "Объем ответов MOEX ISS (байт)", ("board",))
+MOEX_SKIPPED_QUOTES = Counter(
+    "moex_skipped_quotes", "Строки marketdata, пропущенные при разборе",
+    ("board",))
+
+# Режим торгов, котировки которого хранятся под тикером без префикса
+PRIMARY_BOARD = "TQBR"
+
+
+@dataclass(frozen=True)
+class MarketSource:
+    """Режим торгов MOEX, котировки которого запрашиваются за цикл.
+
+    Атрибуты:
+        engine: Торговая система (stock, currency, futures).
+        market: Рынок (shares, bonds, selt, forts).
+        board: Режим торгов (TQBR, TQTF, TQCB, TQOB, CETS, RFUD).
+        timeout: Таймаут запроса этого режима (сек), None - общий
+            таймаут сессии.
+    """
+    engine: str
+    market: str
+    board: str
+    timeout: Optional[float] = None
+
+    @property
+    def url(self) -> str:
+        """Адрес запроса цен всех бумаг режима."""
+        return (f"http://iss.moex.com/iss/engines/{self.engine}/markets/"
+                f"{self.market}/boards/{self.board}/securities.json"
+                "?iss.meta=off&iss.only=marketdata"
+                "&marketdata.columns=SECID,LAST")
+
+    @property
+    def prefix(self) -> str:
+        """Префикс ключей кеша: бумаги разных режимов не пересекаются.
+
+        Для PRIMARY_BOARD префикса нет, чтобы ранее сохраненные
+        тикеры акций остались прежними.
+        """
+        return "" if self.board == PRIMARY_BOARD else f"{self.board}:"
+
+
+DEFAULT_SOURCES = (MarketSource("stock", "shares", PRIMARY_BOARD),)
+
+
+def parse_sources(spec: str,
+                  timeout: Optional[float] = None) -> Tuple[MarketSource, ...]:
+    """Разбирает список режимов торгов из строки конфигурации.
+
+    Args:
+        spec: Режимы через запятую в виде engine/market/board[@таймаут],
+            например "stock/shares/TQBR,stock/bonds/TQOB@5".
+        timeout: Таймаут режимов, для которых он не указан (сек).
+
+    Returns:
+        Tuple[MarketSource, ...]: Режимы торгов.
+
+    Raises:
+        ValueError: Если элемент списка записан неверно.
+    """
+    sources = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        path, _, item_timeout = item.partition("@")
+        parts = path.split("/")
+        if len(parts) != 3 or not all(parts):
+            raise ValueError(f"Неверный режим торгов MOEX: {item}")
+        sources.append(MarketSource(
+            *parts, float(item_timeout) if item_timeout else timeout))
+    if not sources:
+        raise ValueError("Не задано ни одного режима торгов MOEX")
+    return tuple(sources)
+
+
+def sources_from_env() -> Tuple[MarketSource, ...]:
+    """Режимы торгов из MOEX_BOARDS и MOEX_BOARD_TIMEOUT.
+
+    По умолчанию запрашиваются только акции режима TQBR.
+    """
+    spec = os.environ.get("MOEX_BOARDS")
+    if not spec:
+        return DEFAULT_SOURCES
+    timeout = os.environ.get("MOEX_BOARD_TIMEOUT")
+    return parse_sources(spec, float(timeout) if timeout else None)
+
+
+def create_moex_session(
+    total_timeout: float = None,
+    connect_timeout: float = None,
+    limit: int = None,
+    keepalive_timeout: float = None,
+    dns_cache_ttl: int = None
+) -> aiohttp.ClientSession:
+    """
+    Создает сессию HTTP для MOEX ISS на время жизни приложения.
+
+    Соединения с iss.moex.com переиспользуются между циклами опроса
+    (keep-alive), а результат DNS-запроса кешируется. Незаданные
+    параметры берутся из переменных окружения.
+
+    Args:
+        total_timeout: Общий таймаут запроса (сек).
+        connect_timeout: Таймаут установки соединения (сек).
+        limit: Максимальное число одновременных соединений.
+        keepalive_timeout: Время жизни простаивающего соединения (сек).
+        dns_cache_ttl: Время кеширования DNS (сек).
+
+    Returns:
+        aiohttp.ClientSession: Сессия с настроенным пулом соединений.
+    """
+    total_timeout = float(
+        total_timeout or os.environ.get("MOEX_TOTAL_TIMEOUT", 10))
+    connect_timeout = float(
+        connect_timeout or os.environ.get("MOEX_CONNECT_TIMEOUT", 3))
+    limit = int(limit or os.environ.get("MOEX_MAX_CONNECTIONS", 10))
+    keepalive_timeout = float(
+        keepalive_timeout or os.environ.get("MOEX_KEEPALIVE_TIMEOUT", 75))
+    dns_cache_ttl = int(
+        dns_cache_ttl or os.environ.get("MOEX_DNS_CACHE_TTL", 300))
+
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=dns_cache_ttl,
+        use_dns_cache=True
+    )
+    timeout = aiohttp.ClientTimeout(total=total_timeout,
+                                    connect=connect_timeout,
+                                    sock_connect=connect_timeout)
+    logger.info("Создана сессия MOEX: до %s соединений, таймаут %s сек",
+                limit, total_timeout)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                 raise_for_status=False)
+
 
 class PriceRequest:
-    """Класс запрашивает котировки акций MOEX."""
+    """Класс запрашивает котировки акций MOEX.
+
+    Особенности работы:
+    - Режимы торгов запрашиваются параллельно, число одновременных
+      запросов ограничено семафором
+    - У каждого режима свой таймаут, ошибка одного режима не отменяет
+      цены остальных
+    - Цены режима, кроме PRIMARY_BOARD, сохраняются под ключами
+      "<режим>:<тикер>"
+    """
 
     # Адрес запроса по акции SBER (для тестирования работы MOEX)
     SHARE_SBER_URL = ("http://iss.moex.com/iss/engines/stock/markets/shares/"
@@ -15,20 +175,45 @@ class PriceRequest:
                       "only=marketdata&marketdata.columns=SECID,LAST")
 
     # Адрес запроса к MOEX по всем акциям
-    SHARE_URL = ("http://iss.moex.com/iss/engines/stock/markets/shares/boards/"
-                 "TQBR/securities.json?iss.meta=off&iss.only=marketdata"
-                 "&marketdata.columns=SECID,LAST")
+    SHARE_URL = DEFAULT_SOURCES[0].url
+
+    def __init__(self, session: Optional[aiohttp.ClientSession] = None,
+                 sources: Optional[Iterable[MarketSource]] = None,
+                 concurrency: int = None):
+        """Инициализация клиента.
+
+        Args:
+            session: Общая сессия приложения (см. create_moex_session).
+                Если не передана, клиент создает свою сессию в
+                __aenter__ и закрывает ее в __aexit__.
+            sources: Режимы торгов, по умолчанию из MOEX_BOARDS.
+            concurrency: Максимум одновременных запросов режимов,
+                по умолчанию MOEX_BOARD_CONCURRENCY.
+        """
+        self.session = session
+        self._owns_session = session is None
+        self.sources = tuple(sources or sources_from_env())
+        concurrency = int(
+            concurrency or os.environ.get("MOEX_BOARD_CONCURRENCY", 4))
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+        # Ответы последнего цикла и ошибки режимов, не ответивших в нем
+        self.contents: Dict[MarketSource, dict] = {}
+        self.source_errors: Dict[str, str] = {}
 
-    def __init__(self):
-        self.session = None
-        self.content = {}
+        # Результат последней проверки доступности MOEX
+        self.healthy: Optional[bool] = None
+        self.last_health_check: Optional[float] = None
+        self.last_health_error: Optional[str] = None
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        if self._owns_session:
+            self.session = create_moex_session()
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        await self.session.close()
+        if self._owns_session:
+            await self.session.close()
 
     async def request_share_sber(self):
         """
@@ -37,10 +222,10 @@ class PriceRequest:
         """
         # Проверка подключения и запроса к API
         try:
-            async with self.session.get(self.SHARE_SBER_URL, timeout=5) as res:
+            async with self.session.get(self.SHARE_SBER_URL) as res:
                 res.raise_for_status()  # Проверка HTTP-ошибок (404, 500...)
                 content = await res.json(content_type=None)
-        except aiohttp.ClientError as e:
+        except (aiohttp.ClientError, TimeoutError) as e:
             logger.error("Ошибка подключения к MOEX: %s", e)
             raise ValueError("request_share_sber. Не удалось получить "
                              "данные с MOEX.") from e
@@ -69,27 +254,100 @@ class PriceRequest:
         logger.info("Котировка SBER успешно получена: %s", sber_price)
         return sber_price
 
-    async def request_securities(self):
-        """ Формирует запрос к MOEX на получение котировок по всем акциям."""
-        # Проверка доступности MOEX
-        await self.request_share_sber()
+    async def check_health(self) -> bool:
+        """
+        Проверяет доступность MOEX запросом котировки SBER.
 
-        # Проверка подключения и запроса к API
+        Вызывается отдельной задачей с собственным интервалом и не
+        задерживает запросы котировок.
+
+        Returns:
+            bool: True, если MOEX вернул корректную котировку.
+        """
         try:
-            async with self.session.get(self.SHARE_URL, timeout=5) as response:
-                response.raise_for_status()
-                content = await response.json(content_type=None)
-        except aiohttp.ClientError as e:
-            logger.error("Ошибка подключения к MOEX: %s", e)
-            raise ValueError("Не удалось получить данные с MOEX.") from e
+            await self.request_share_sber()
+        except ValueError as e:
+            self.healthy = False
+            self.last_health_error = str(e)
+        else:
+            self.healthy = True
+            self.last_health_error = None
+        self.last_health_check = time.time()
+        return self.healthy
+
+    async def _request_source(self, source: MarketSource) -> dict:
+        """Запрашивает котировки одного режима торгов.
+
+        Raises:
+            ValueError: Если режим не ответил за свой таймаут или
+                вернул ошибку.
+        """
+        timeout = (aiohttp.ClientTimeout(total=source.timeout)
+                   if source.timeout else None)
+        status = "error"
+        async with self._semaphore:
+            try:
+                async with self.session.get(source.url,
+                                            timeout=timeout) as response:
+                    status = str(response.status)
+                    response.raise_for_status()
+                    body = await response.read()
+            except (aiohttp.ClientError, TimeoutError) as e:
+                if isinstance(e, TimeoutError) and status == "error":
+                    status = "timeout"
+                logger.error("Ошибка подключения к MOEX (%s): %s",
+                             source.board, e)
+                raise ValueError(f"Не удалось получить данные режима "
+                                 f"{source.board} с MOEX.") from e
+            finally:
+                MOEX_RESPONSES.labels(source.board, status).inc()
+        MOEX_RESPONSE_BYTES.labels(source.board).inc(len(body))
+        try:
+            return loads(body)
+        except ValueError as e:
+            logger.error("Неверный JSON от MOEX (%s): %s", source.board, e)
+            raise ValueError(f"Некорректные данные режима {source.board} "
+                             f"от MOEX.") from e
+
+    async def request_securities(self):
+        """ Формирует запрос к MOEX на получение котировок по всем акциям.
 
-        logger.info("Котировки всех акций MOEX успешно получены.")
-        self.content = content
+        Режимы торгов запрашиваются параллельно. Режим, не ответивший
+        в этом цикле, пропускается: его цены остаются в кеше с
+        предыдущего цикла.
+
+        Raises:
+            ValueError: Если не ответил ни один режим торгов.
+        """
+        results = await asyncio.gather(
+            *(self._request_source(source) for source in self.sources),
+            return_exceptions=True)
+
+        self.contents = {}
+        self.source_errors = {}
+        for source, result in zip(self.sources, results):
+            if isinstance(result, ValueError):
+                self.source_errors[source.board] = str(result)
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                self.contents[source] = result
+
+        if not self.contents:
+            raise ValueError("Не удалось получить данные с MOEX.")
+        if self.source_errors:
+            logger.warning("Режимы MOEX без ответа: %s",
+                           ", ".join(self.source_errors))
+        logger.info("Котировки MOEX успешно получены: %s",
+                    ", ".join(source.board for source in self.contents))
 
     async def generates_quotes_dictionary(self) -> dict[str, float]:
         """
         Формирует словарь котировок из предварительно валидированных данных.
 
+        Блок marketdata каждого режима разбирается по столбцам (см.
+        iss_parser.parse_quotes).
+
         Returns:
             Словарь {тикер: цена} с валидными котировками
 
@@ -98,34 +356,20 @@ class PriceRequest:
         """
         quotes_dict = {}
         error_count = 0
-        market_data = self.content["marketdata"]["data"]
-
-        for share in market_data:
-            # Проверка структуры записи
-            if len(share) < 2:
-                error_count += 1
-                continue
-
-            ticker, price = share[0], share[1]
-
-            # Проверка тикера
-            if not isinstance(ticker, str) or not ticker.strip():
-                error_count += 1
-                continue
-
-            # Обработка цены
+        for source, content in self.contents.items():
             try:
-                float_price = float(price)
-            except (TypeError, ValueError):
-                error_count += 1
+                quotes, errors = parse_quotes(content["marketdata"],
+                                              source.prefix)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error("Неверный формат ответа MOEX (%s): %s",
+                             source.board, e)
+                self.source_errors[source.board] = (
+                    "Некорректные данные от MOEX.")
                 continue
-
-            # Проверка валидности цены
-            if float_price <= 0:
-                error_count += 1
-                continue
-
-            quotes_dict[ticker] = float_price
+            quotes_dict.update(quotes)
+            if errors:
+                MOEX_SKIPPED_QUOTES.labels(source.board).inc(errors)
+                error_count += errors
 
         # Логирование результатов
         if error_count:
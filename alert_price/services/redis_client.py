@@ -1,51 +1,116 @@
-"""Содержит функцию инициализации Redis."""
+"""Содержит функции инициализации Redis и пула соединений."""
 
 import logging
 import os
-from redis.asyncio import Redis
+from redis.asyncio import ConnectionPool, Redis
 
 logger = logging.getLogger(__name__)
 
 
-async def init_redis(
+def create_connection_pool(
     host: str = None,
     port: int = None,
     db: int = None,
-    password: str = None
-) -> Redis:
+    password: str = None,
+    max_connections: int = None,
+    health_check_interval: int = None,
+    socket_timeout: float = None,
+    socket_connect_timeout: float = None
+) -> ConnectionPool:
     """
-    Инициализирует и возвращает асинхронный клиент Redis.
+    Создает пул соединений Redis на время жизни приложения.
+
+    Незаданные параметры берутся из переменных окружения.
 
     Args:
         host: Хост Redis сервера.
         port: Порт Redis сервера.
         db: Номер базы данных.
         password: Пароль (если требуется).
+        max_connections: Максимальное число соединений в пуле.
+        health_check_interval: Интервал (сек) проверки простаивающих
+            соединений перед выдачей из пула.
+        socket_timeout: Таймаут операций с сокетом (сек).
+        socket_connect_timeout: Таймаут установки соединения (сек).
 
     Returns:
-        Redis: Асинхронный клиент Redis
-
-    Raises:
-        RuntimeError: Если подключение не удалось.
+        ConnectionPool: Пул соединений Redis.
     """
     host = host or os.environ.get("REDIS_HOST", "localhost")
     port = int(port or os.environ.get("REDIS_PORT", 6379))
     db = int(db or os.environ.get("REDIS_DB", 0))
     password = password or os.environ.get("REDIS_PASSWORD", None)
+    max_connections = int(
+        max_connections or os.environ.get("REDIS_MAX_CONNECTIONS", 50))
+    health_check_interval = int(
+        health_check_interval
+        or os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", 30))
+    socket_timeout = float(
+        socket_timeout or os.environ.get("REDIS_SOCKET_TIMEOUT", 5))
+    socket_connect_timeout = float(
+        socket_connect_timeout
+        or os.environ.get("REDIS_SOCKET_CONNECT_TIMEOUT", 5))
+
+    pool = ConnectionPool(
+        host=host,
+        port=port,
+        db=db,
+        password=password,
+        max_connections=max_connections,
+        health_check_interval=health_check_interval,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=socket_connect_timeout,
+        socket_keepalive=True,
+        retry_on_timeout=True,
+        decode_responses=False
+    )
+    logger.info("Создан пул соединений Redis: %s:%s db=%s, max=%s",
+                host, port, db, max_connections)
+    return pool
+
+
+async def init_redis(pool: ConnectionPool = None, **pool_kwargs) -> Redis:
+    """
+    Инициализирует и возвращает асинхронный клиент Redis.
+
+    Args:
+        pool: Пул соединений, к которому привязывается клиент. Если не
+            передан, создается новый пул из pool_kwargs.
+        **pool_kwargs: Параметры для create_connection_pool.
+
+    Returns:
+        Redis: Асинхронный клиент Redis
+
+    Raises:
+        RuntimeError: Если подключение не удалось.
+    """
+    owns_pool = pool is None
+    if owns_pool:
+        pool = create_connection_pool(**pool_kwargs)
 
     try:
-        redis = Redis(
-            host=host,
-            port=port,
-            db=db,
-            password=password,
-            decode_responses=False
-        )
+        # Клиент, создавший пул сам, закрывает его при aclose()
+        redis = (Redis.from_pool(pool) if owns_pool
+                 else Redis(connection_pool=pool))
         # Проверяем подключение
         await redis.ping()
-        logger.info("Успешное подключение к Redis: %s:%s db=%s",
-                    host, port, db)
+        logger.info("Успешное подключение к Redis")
         return redis
     except Exception as e:
         logger.error("Ошибка подключения к Redis: %s", e)
         raise RuntimeError("Не удалось подключиться к Redis") from e
+
+
+async def close_redis(redis: Redis, pool: ConnectionPool) -> None:
+    """
+    Закрывает клиент Redis и отключает все соединения пула.
+
+    Args:
+        redis: Асинхронный клиент Redis.
+        pool: Пул соединений, к которому привязан клиент.
+    """
+    try:
+        await redis.aclose()
+    finally:
+        await pool.disconnect()
+        logger.info("Пул соединений Redis закрыт")
@@ -0,0 +1,122 @@
+"""
+Модуль хранения тиков (истории изменений цен) в Redis Streams.
+
+Основные особенности:
+- Для каждого тикера ведется свой поток moex:ticks:<тикер>, запись -
+  одно изменение цены, идентификатор записи содержит время (мс)
+- Поллер добавляет только изменившиеся за цикл цены, все записи цикла
+  отправляются одним конвейером (pipeline)
+- Длина потока ограничена maxlen (точное усечение MAXLEN), поэтому
+  объем памяти не превышает tickers * maxlen записей (около
+  25 байт на запись: 3000 тикеров по 1000 тиков - примерно 75 МиБ,
+  см. benchmarks/bench_tick_store.py)
+- Записи старше retention удаляются периодическим точным XTRIM MINID
+- Срок жизни ключа продлевается только при добавлении тика, поэтому
+  поток тикера, который перестал меняться, удаляется через retention
+- Потоки хранятся в Redis, поэтому тики отдает любой воркер, а не
+  только ведущий
+"""
+
+import logging
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class TickStore:
+    """Хранилище тиков в Redis Streams.
+
+    Особенности работы:
+    - append() добавляет тики цикла опроса, каждые trim_every вызовов
+      удаляет записи старше retention
+    - read() читает последние тики нескольких тикеров одним конвейером
+    """
+
+    def __init__(self, redis_client: Redis, maxlen: int = None,
+                 retention: float = None, trim_every: int = 20,
+                 key_prefix: str = "moex:ticks"):
+        """Инициализация хранилища.
+
+        Незаданные параметры берутся из переменных окружения.
+
+        Args:
+            redis_client: Асинхронный клиент Redis.
+            maxlen: Максимальное число тиков одного тикера (TICK_MAXLEN).
+            retention: Время хранения тиков (сек, TICK_RETENTION).
+            trim_every: Через сколько записей удалять устаревшие тики.
+            key_prefix: Префикс ключей потоков.
+        """
+        self.redis = redis_client
+        self.maxlen = int(maxlen or os.environ.get("TICK_MAXLEN", 1000))
+        self.retention = float(
+            retention or os.environ.get("TICK_RETENTION", 6 * 3600))
+        self.trim_every = trim_every
+        self.key_prefix = key_prefix
+        self._appends = 0
+
+    def _key(self, ticker: str) -> str:
+        return f"{self.key_prefix}:{ticker}"
+
+    def _min_id(self, now: Optional[float] = None) -> int:
+        """Наименьшее время (мс) тиков, которые еще хранятся."""
+        return int(((now or time.time()) - self.retention) * 1000)
+
+    async def append(self, prices: Dict[str, float],
+                     tickers: Iterable[str] = ()) -> None:
+        """Добавляет тики цикла опроса.
+
+        Args:
+            prices: Изменившиеся цены {тикер: цена}.
+            tickers: Все известные тикеры - их потоки усекаются по
+                retention при периодической очистке.
+        """
+        self._appends += 1
+        trim = self._appends % self.trim_every == 0
+        if not prices and not trim:
+            return
+
+        ttl = int(self.retention) + 1
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for ticker, price in prices.items():
+                key = self._key(ticker)
+                pipe.xadd(key, {"p": repr(price)}, maxlen=self.maxlen,
+                          approximate=False)
+                pipe.expire(key, ttl)
+            if trim:
+                min_id = self._min_id()
+                for ticker in set(tickers) | prices.keys():
+                    pipe.xtrim(self._key(ticker), minid=min_id,
+                               approximate=False)
+            await pipe.execute()
+
+    async def read(self, tickers: List[str], limit: int = 100,
+                   since: Optional[float] = None
+                   ) -> Dict[str, List[Tuple[int, float]]]:
+        """Возвращает последние тики тикеров.
+
+        Args:
+            tickers: Список тикеров.
+            limit: Максимум тиков одного тикера.
+            since: Только тики не раньше этого времени (unix, сек).
+
+        Returns:
+            Dict[str, List[Tuple[int, float]]]: Пары (время в мс, цена)
+            по возрастанию времени для каждого тикера.
+        """
+        min_id = max(self._min_id(),
+                     int(since * 1000) if since is not None else 0)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for ticker in tickers:
+                pipe.xrevrange(self._key(ticker), max="+", min=min_id,
+                               count=limit)
+            results = await pipe.execute()
+
+        return {
+            ticker: [(int(entry_id.split(b"-", 1)[0]), float(fields[b"p"]))
+                     for entry_id, fields in reversed(entries)]
+            for ticker, entries in zip(tickers, results)
+        }
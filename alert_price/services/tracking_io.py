@@ -0,0 +1,142 @@
+"""
+Модуль разбора и сериализации списка отслеживания для пакетной загрузки.
+
+Основные особенности:
+- Поддерживаются форматы CSV (с заголовком) и NDJSON
+- Каждая строка проверяется отдельно, ошибки возвращаются с номером
+  строки и не прерывают разбор остальных строк
+- Выгрузка сериализует строки страницами, не собирая весь файл в памяти
+"""
+
+import csv
+import io
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+
+from alert_price.api.schemas import TrackingParameters
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+FIELDS = ("ticker", "buy_price", "sell_price")
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+@dataclass
+class ImportResult:
+    """Результат разбора загруженного файла.
+
+    Атрибуты:
+        parameters: Строки, прошедшие проверку.
+        errors: Ошибки вида {"line": номер, "error": описание}
+            (не более max_errors).
+        rejected: Общее количество отклоненных строк.
+    """
+    parameters: List[TrackingParameters] = field(default_factory=list)
+    errors: List[dict] = field(default_factory=list)
+    rejected: int = 0
+
+
+def _validate(record: dict) -> TrackingParameters:
+    """Проверяет одну запись и приводит ее к TrackingParameters.
+
+    Raises:
+        ValueError: Если запись не проходит проверку схемы
+            (пустой тикер, нечисловая или неположительная цена).
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Ожидается объект с полями "
+                         + ", ".join(FIELDS))
+    try:
+        return TrackingParameters(
+            **{name: record.get(name) for name in FIELDS})
+    except ValidationError as e:
+        raise ValueError("; ".join(
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+            for error in e.errors())) from None
+
+
+def _records(text: str, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Возвращает пары (номер строки, запись) из текста файла."""
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, ValueError(f"Некорректный JSON: {e.msg}")
+
+
+def parse_tracking_parameters(text: str, fmt: str,
+                              max_errors: int = 100) -> ImportResult:
+    """Разбирает файл списка отслеживания.
+
+    Args:
+        text: Содержимое файла.
+        fmt: Формат файла ("csv" или "ndjson").
+        max_errors: Максимальное количество ошибок в ответе.
+
+    Returns:
+        ImportResult: Проверенные строки и ошибки разбора.
+
+    Raises:
+        ValueError: Если формат не поддерживается или в CSV нет
+            обязательных колонок.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Неподдерживаемый формат: {fmt}")
+    if fmt == "csv":
+        header = next(csv.reader(io.StringIO(text)), [])
+        absent = [name for name in FIELDS if name not in header]
+        if absent:
+            raise ValueError("В CSV нет колонок: " + ", ".join(absent))
+
+    result = ImportResult()
+    for line_number, record in _records(text, fmt):
+        try:
+            if isinstance(record, ValueError):
+                raise record
+            result.parameters.append(_validate(record))
+        except ValueError as e:
+            result.rejected += 1
+            if len(result.errors) < max_errors:
+                result.errors.append({"line": line_number, "error": str(e)})
+
+    if result.rejected:
+        logger.warning("Отклонено строк при загрузке: %s", result.rejected)
+    return result
+
+
+def encode_tracking_rows(rows: Iterable[tuple], fmt: str,
+                         header: bool = False) -> bytes:
+    """Сериализует страницу строк (ticker, buy_price, sell_price).
+
+    Args:
+        rows: Строки таблицы tracking_parameters.
+        fmt: Формат выгрузки ("csv" или "ndjson").
+        header: Добавить строку заголовка CSV.
+
+    Returns:
+        bytes: Фрагмент файла выгрузки.
+    """
+    if fmt == "ndjson":
+        return "".join(
+            json.dumps(dict(zip(FIELDS, row)), ensure_ascii=False) + "\n"
+            for row in rows).encode()
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(FIELDS)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
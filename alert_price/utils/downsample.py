@@ -0,0 +1,63 @@
+"""
+Модуль прореживания временных рядов для графиков.
+
+Основные особенности:
+- Алгоритм Largest-Triangle-Three-Buckets (LTTB): из каждой корзины
+  выбирается точка, образующая наибольший треугольник с выбранной
+  точкой предыдущей корзины и средней точкой следующей
+- Первая и последняя точки сохраняются, форма графика (пики и
+  провалы) сохраняется лучше, чем при выборе каждой n-й точки
+- Один проход по данным, O(n)
+"""
+
+from typing import List, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+def lttb(points: Sequence[Point], threshold: int) -> List[Point]:
+    """Прореживает ряд до threshold точек методом LTTB.
+
+    Args:
+        points: Точки (x, y) по возрастанию x.
+        threshold: Число точек результата (не меньше 3, иначе ряд
+            возвращается без изменений).
+
+    Returns:
+        List[Point]: Выбранные точки по возрастанию x.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+
+    sampled = [points[0]]
+    # Внутренние точки делятся на threshold - 2 корзины
+    bucket_size = (count - 2) / (threshold - 2)
+    selected = 0
+
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+
+        # Средняя точка следующей корзины (для последней - последняя точка)
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        next_points = points[next_start:next_end]
+        avg_x = sum(x for x, _ in next_points) / len(next_points)
+        avg_y = sum(y for _, y in next_points) / len(next_points)
+
+        ax, ay = points[selected]
+        best_area = -1.0
+        best = start
+        for index in range(start, end):
+            x, y = points[index]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best_area = area
+                best = index
+
+        sampled.append(points[best])
+        selected = best
+
+    sampled.append(points[-1])
+    return sampled
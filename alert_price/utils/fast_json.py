@@ -0,0 +1,97 @@
+"""
+Модуль быстрой сериализации JSON для ответов API.
+
+Основные особенности:
+- Использует orjson, если он установлен, иначе стандартный json
+  (и для сериализации ответов, и для разбора ответов MOEX)
+- FastJSONResponse сериализует ответ без повторной валидации FastAPI
+- encode_json_array собирает массив JSON из пачек строк базы без
+  моделей и общего списка объектов
+"""
+
+import json
+from typing import Iterable, Sequence
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson необязателен
+    orjson = None
+
+
+def loads(data: bytes):
+    """Разбирает JSON из байтов ответа.
+
+    Args:
+        data: Тело ответа в UTF-8.
+
+    Returns:
+        Разобранный объект JSON.
+
+    Raises:
+        ValueError: Если тело не является корректным JSON.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(content) -> bytes:
+    """Сериализует объект в компактный JSON (UTF-8).
+
+    Args:
+        content: Словарь, список или скаляр JSON.
+
+    Returns:
+        bytes: Закодированный JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False,
+                      separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    """Ответ JSON, сериализуемый функцией dumps.
+
+    Содержимое передается как есть: возвращаемое значение маршрута не
+    проходит jsonable_encoder и валидацию response_model.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        """Сериализует содержимое ответа."""
+        return dumps(content)
+
+
+def encode_rows(rows: Iterable[Sequence], fields: Sequence[str]) -> bytes:
+    """Сериализует строки таблицы как элементы массива JSON без скобок.
+
+    Args:
+        rows: Строки со значениями в порядке fields.
+        fields: Имена полей объектов JSON.
+
+    Returns:
+        bytes: Объекты JSON через запятую.
+    """
+    return dumps([dict(zip(fields, row)) for row in rows])[1:-1]
+
+
+def encode_json_array(pages: Iterable[Sequence[Sequence]],
+                      fields: Sequence[str]) -> bytes:
+    """Сериализует пачки строк в один массив JSON объектов.
+
+    Каждая пачка кодируется отдельно, поэтому временный список
+    словарей не больше одной пачки.
+
+    Args:
+        pages: Пачки строк со значениями в порядке fields.
+        fields: Имена полей объектов JSON.
+
+    Returns:
+        bytes: Массив JSON.
+    """
+    return b"[" + b",".join(encode_rows(rows, fields)
+                            for rows in pages if rows) + b"]"
@@ -1,23 +1,203 @@
-"""Модуль логирования."""
+"""
+Модуль логирования.
 
+Основные особенности:
+- Корневой логгер получает только QueueHandler: запись в очередь не
+  выполняет ввода-вывода, файл и консоль пишет QueueListener в
+  отдельном потоке, поэтому журнал не блокирует цикл событий asyncio
+- Файл журнала ротируется по размеру (LOG_ROTATE=size) или по
+  времени (LOG_ROTATE=time)
+- Формат записи - текст или JSON по строке на запись (LOG_JSON=1)
+- Уровни отдельных модулей задаются без изменения кода, например
+  LOG_LEVELS="alert_price.services.event_loop_handler=WARNING"
+- Логгеры uvicorn, настроенные его CLI, тоже пишут через очередь
+"""
+
+import atexit
+import copy
+import json
 import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import (
+    QueueHandler, QueueListener, RotatingFileHandler,
+    TimedRotatingFileHandler)
 from pathlib import Path
+from typing import Dict, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Поля LogRecord, которые не выводятся как дополнительные (extra)
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message"}
+
+# Логгеры, которым uvicorn назначает собственные обработчики
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Форматирует запись в строку JSON.
+
+    Поля: time (UTC, ISO 8601), level, logger, message, exc_info (если
+    есть) и поля, переданные через extra.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc).isoformat(
+                    timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """QueueHandler, сохраняющий трассировку исключения отдельно.
+
+    Стандартный prepare() вписывает трассировку в текст сообщения,
+    тогда в JSON она не попадала бы в поле exc_info.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(
+                    record.exc_info)
+            # Объект трассировки не должен жить в очереди
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec: str) -> Dict[str, int]:
+    """Разбирает уровни модулей вида "модуль=УРОВЕНЬ,...".
+
+    Raises:
+        ValueError: Если уровень не существует.
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, _, level = item.partition("=")
+        if not name.strip():
+            continue
+        value = logging.getLevelName(level.strip().upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Неизвестный уровень логирования: {item}")
+        levels[name.strip()] = value
+    return levels
 
 
-def setup_logging():
-    """Настройка глобального логирования."""
-    log_dir = Path.cwd() / "logs"
+def _file_handler(log_file: Path) -> logging.Handler:
+    """Обработчик файла с ротацией по LOG_ROTATE."""
+    backup_count = int(os.environ.get("LOG_BACKUP_COUNT", 5))
+    if os.environ.get("LOG_ROTATE", "size").lower() == "time":
+        return TimedRotatingFileHandler(
+            log_file, when=os.environ.get("LOG_ROTATE_WHEN", "midnight"),
+            backupCount=backup_count, encoding="utf-8")
+    return RotatingFileHandler(
+        log_file,
+        maxBytes=int(os.environ.get("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+        backupCount=backup_count, encoding="utf-8")
+
+
+def setup_logging(level: str = None, json_format: bool = None,
+                  log_dir: Optional[Path] = None) -> QueueListener:
+    """Настройка глобального логирования.
+
+    Незаданные параметры берутся из переменных окружения: LOG_LEVEL,
+    LOG_JSON, LOG_DIR, а также LOG_LEVELS (уровни модулей),
+    LOG_ROTATE, LOG_MAX_BYTES, LOG_ROTATE_WHEN и LOG_BACKUP_COUNT
+    (ротация файла). Повторный вызов заменяет прежнюю настройку.
+    Обработчики логгеров uvicorn снимаются, их записи передаются
+    корневому логгеру.
+
+    Args:
+        level: Уровень корневого логгера.
+        json_format: Писать записи в формате JSON.
+        log_dir: Каталог файла app.log.
+
+    Returns:
+        QueueListener: Запущенный поток записи журнала.
+    """
+    global _listener
+
+    level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
+    if json_format is None:
+        json_format = os.environ.get("LOG_JSON", "0").lower() in (
+            "1", "true", "yes", "on")
+    log_dir = Path(log_dir or os.environ.get("LOG_DIR")
+                   or Path.cwd() / "logs")
     log_dir.mkdir(parents=True, exist_ok=True)
 
-    log_file = log_dir / "app.log"
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler(str(log_file), encoding='utf-8')
-        ])
+    formatter = JsonFormatter() if json_format else logging.Formatter(
+        TEXT_FORMAT)
+    handlers = [logging.StreamHandler(), _file_handler(log_dir / "app.log")]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    stop_logging()
+    # Очередь без ограничения: запись в нее никогда не ждет потока
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level)
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        for handler in uvicorn_logger.handlers[:]:
+            uvicorn_logger.removeHandler(handler)
+        uvicorn_logger.propagate = True
 
     # Отключаем логирование для pygls.protocol.json_rpc
-    pygls_logger = logging.getLogger("pygls.protocol.json_rpc")
-    pygls_logger.setLevel(logging.ERROR)
+    logging.getLogger("pygls.protocol.json_rpc").setLevel(logging.ERROR)
+    for name, module_level in parse_levels(
+            os.environ.get("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(module_level)
+
+    _listener = QueueListener(log_queue, *handlers,
+                              respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def ensure_logging() -> None:
+    """Настраивает логирование, если setup_logging еще не вызывалась.
+
+    Под CLI uvicorn модуль запуска приложения не выполняется, поэтому
+    настройка делается при старте приложения.
+    """
+    if _listener is None:
+        setup_logging()
+
+
+def stop_logging() -> None:
+    """Дописывает записи из очереди и останавливает поток журнала."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+atexit.register(stop_logging)
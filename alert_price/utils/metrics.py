@@ -0,0 +1,259 @@
+"""
+Модуль метрик приложения в текстовом формате Prometheus.
+
+Основные особенности:
+- Счетчики, измерители и гистограммы с метками, реестр отдается
+  маршрутом /metrics (формат text/plain; version=0.0.4)
+- Запись метрики - поиск в словаре и сложение (гистограмма - еще
+  bisect по границам корзин), без блокировок и ввода-вывода: события
+  цикла asyncio выполняются в одном потоке
+- Метрики хранятся в памяти процесса: при нескольких воркерах
+  Prometheus опрашивает каждый процесс (метка instance)
+"""
+
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Границы корзин гистограмм длительности (сек)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return (value.replace("\\", "\\\\").replace("\n", "\\n")
+            .replace('"', '\\"'))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"'
+             for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Общая часть метрик: имя, описание и значения по меткам."""
+
+    kind = ""
+    # Суффикс имени в выдаче (у счетчиков - _total)
+    suffix = ""
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = (),
+                 registry: "Registry" = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    @property
+    def exposed_name(self) -> str:
+        """Имя метрики в строках HELP, TYPE и значениях."""
+        return self.name + self.suffix
+
+    @abstractmethod
+    def _new_child(self):
+        """Значение метрики для нового набора меток."""
+
+    def labels(self, *values: str):
+        """Значение метрики для набора меток (создается при первом
+        обращении)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: ожидаются метки "
+                                 f"{self.labelnames}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Строки значений метрики для всех наборов меток."""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.exposed_name} {self.documentation}",
+                 f"# TYPE {self.exposed_name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик."""
+
+    kind = "counter"
+    suffix = "_total"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        """Увеличивает счетчик без меток."""
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.exposed_name}"
+                f"{_format_labels(self.labelnames, values)} "
+                f"{_format_value(child.value)}"
+                for values, child in self._children.items()]
+
+
+class Gauge(_Metric):
+    """Измеритель текущего значения."""
+
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        """Устанавливает значение без меток."""
+        self.labels().set(value)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, values)} "
+                f"{_format_value(child.value)}"
+                for values, child in self._children.items()]
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # Последняя корзина - значения больше всех границ (+Inf)
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def time(self) -> "_Timer":
+        """Контекстный менеджер, измеряющий длительность блока."""
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram: _HistogramValue):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Histogram(_Metric):
+    """Гистограмма наблюдаемых значений (обычно длительностей)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 registry: "Registry" = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Учитывает значение без меток."""
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),),
+                                    child.counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.labelnames, values, le)} "
+                    f"{cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} "
+                         f"{_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def timed(histogram: Histogram, *labels: str) -> Callable:
+    """Декоратор сопрограммы, записывающий ее длительность в histogram.
+
+    Длительность записывается и при исключении.
+    """
+    child = histogram.labels(*labels)
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class Registry:
+    """Набор метрик, отдаваемых одним ответом /metrics."""
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Добавляет функцию, обновляющую измерители перед выдачей
+        (например, глубину очередей)."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        for collector in self._collectors:
+            collector()
+        return "\n".join(metric.render()
+                         for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
@@ -0,0 +1,110 @@
+"""
+Бенчмарк разбора ответа MOEX ISS на синтетических данных.
+
+Сравнивает прежний путь (json стандартной библиотеки и построчная
+проверка в generates_quotes_dictionary) с разбором по столбцам
+(fast_json.loads и iss_parser.parse_quotes с NumPy и без него).
+Примерно каждая двадцатая строка содержит некорректную цену.
+
+Запуск:
+    python -m benchmarks.bench_iss_parse [--rows 1000 10000 100000]
+"""
+
+import argparse
+import gc
+import json
+import random
+import time
+
+from alert_price.services import iss_parser
+from alert_price.services.iss_parser import parse_quotes
+from alert_price.utils.fast_json import loads
+
+
+def make_payload(rows: int, seed: int = 0) -> bytes:
+    """Тело ответа ISS с rows строками блока marketdata."""
+    rng = random.Random(seed)
+    invalid = [None, 0, -1.5]
+    data = [
+        [f"T{i:06}", rng.choice(invalid) if i % 20 == 0
+         else round(rng.uniform(1, 5000), 2)]
+        for i in range(rows)
+    ]
+    return json.dumps({"marketdata": {"columns": ["SECID", "LAST"],
+                                      "data": data}}).encode()
+
+
+def legacy_parse(body: bytes) -> dict:
+    """Прежний путь: json.loads и построчная проверка."""
+    quotes = {}
+    for share in json.loads(body)["marketdata"]["data"]:
+        if len(share) < 2:
+            continue
+        ticker, price = share[0], share[1]
+        if not isinstance(ticker, str) or not ticker.strip():
+            continue
+        try:
+            float_price = float(price)
+        except (TypeError, ValueError):
+            continue
+        if float_price <= 0:
+            continue
+        quotes[ticker] = float_price
+    return quotes
+
+
+def columnar_parse(body: bytes, use_numpy: bool) -> dict:
+    """Разбор по столбцам, как в PriceRequest."""
+    return parse_quotes(loads(body)["marketdata"], use_numpy=use_numpy)[0]
+
+
+def measure(func, repeat: int) -> dict:
+    """Медиана времени вызова func.
+
+    Перед каждым вызовом собирается мусор предыдущего, чтобы сборщик
+    не срабатывал на объектах другого пути разбора.
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {"median_ms": round(timings[len(timings) // 2] * 1000, 3),
+            "items": len(result)}
+
+
+def run(rows: int, repeat: int) -> dict:
+    """Измеряет все пути разбора на одном теле ответа."""
+    body = make_payload(rows)
+    result = {
+        "rows": rows,
+        "bytes": len(body),
+        "decode_json": measure(lambda: json.loads(body)["marketdata"]
+                               ["data"], repeat),
+        "decode_fast": measure(lambda: loads(body)["marketdata"]["data"],
+                               repeat),
+        "legacy": measure(lambda: legacy_parse(body), repeat),
+        "columnar": measure(lambda: columnar_parse(body, False), repeat),
+    }
+    if iss_parser.np is not None:
+        result["columnar_numpy"] = measure(
+            lambda: columnar_parse(body, True), repeat)
+    return result
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+",
+                        default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        print(json.dumps(run(rows, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Офлайн-бенчмарк цикла опроса, кеша цен и API.
+
+Все зависимости локальные: MOEX ISS заменен заглушкой (stub_moex,
+размер ответа и задержка задаются ключами), база SQLite создается во
+временном каталоге, Redis берется из переменных REDIS_* (как в
+приложении) или, с ключом --fake, используется fakeredis. Ключи кеша
+цен получают префикс bench: и удаляются после прогона.
+
+Измеряется:
+- poll_cycle: poll_once от запроса заглушки до записи в кеш и проверки
+  порогов, с разбивкой по этапам fetch/parse/cache_write
+- price_cache: пропускная способность save_prices и get_prices
+- api: запросов в секунду и p50/p99 /api/prices и /api/tracked-stocks
+  при --clients одновременных клиентах
+- alert_crud: создание и удаление записей через /api/stock-alerts
+
+Сервер API работает в отдельном потоке процесса бенчмарка (uvicorn,
+свой цикл событий), клиенты - в основном потоке. Они делят GIL,
+поэтому абсолютные значения ниже, чем у отдельного процесса, но
+сопоставимы между прогонами.
+
+Результат - один объект JSON в stdout (и в файл --output):
+    python -m benchmarks.bench_suite --fake --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import socket
+import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import aiohttp
+import uvicorn
+from fastapi import FastAPI
+
+from alert_price.api.middleware import RequestMetricsMiddleware
+from alert_price.api.routers import router
+from alert_price.api.schemas import TrackingParameters
+from alert_price.services.alert_engine import AlertEngine
+from alert_price.services.database_gateway import DatabaseGateway
+from alert_price.services.event_loop_handler import (
+    POLL_INTERVAL, POLL_STAGE_SECONDS, poll_once)
+from alert_price.services.local_price_cache import LocalPriceCache
+from alert_price.services.price_cache import PriceCache
+from alert_price.services.prices_request import (
+    PRIMARY_BOARD, PriceRequest, create_moex_session)
+from alert_price.services.redis_client import create_connection_pool
+from benchmarks.stub_moex import StubMoex
+
+STAGES = ("fetch", "parse", "cache_write")
+
+
+def summarize(timings: List[float], wall: float = None) -> dict:
+    """p50/p99 (мс) и число операций в секунду."""
+    timings = sorted(timings)
+    count = len(timings)
+    result = {
+        "count": count,
+        "p50_ms": round(timings[int(0.5 * (count - 1))] * 1000, 3),
+        "p99_ms": round(timings[int(0.99 * (count - 1))] * 1000, 3),
+    }
+    result["ops_per_sec"] = round(count / (wall or sum(timings)), 1)
+    return result
+
+
+def redis_factory(fake: bool) -> Callable:
+    """Фабрика клиентов Redis (новый клиент на каждый цикл событий).
+
+    Клиенты fakeredis делят одно хранилище FakeServer.
+    """
+    if fake:
+        from fakeredis import FakeServer
+        from fakeredis.aioredis import FakeRedis
+        server = FakeServer()
+        return lambda: FakeRedis(server=server)
+    from redis.asyncio import Redis
+    return lambda: Redis(connection_pool=create_connection_pool())
+
+
+def bench_price_cache(redis) -> PriceCache:
+    """Кеш цен с ключами bench:, не пересекающимися с приложением."""
+    cache = PriceCache(redis)
+    for name in ("cache_key", "meta_key", "changelog_key",
+                 "updates_channel"):
+        setattr(cache, name, getattr(cache, name).replace(
+            "moex:", "bench:", 1))
+    return cache
+
+
+def stage_totals() -> Dict[str, tuple]:
+    """Суммарное время и число измерений этапов цикла опроса."""
+    totals = {}
+    for stage in STAGES:
+        child = POLL_STAGE_SECONDS.labels(stage)
+        totals[stage] = (child.sum, sum(child.counts))
+    return totals
+
+
+async def run_poll_cycle(redis, database: DatabaseGateway, stub: StubMoex,
+                         boards: List[str], cycles: int) -> dict:
+    """Измеряет цикл опроса: заглушка MOEX -> кеш цен -> пороги."""
+    cache = bench_price_cache(redis)
+    engine = AlertEngine()
+    session = create_moex_session()
+    try:
+        request = PriceRequest(session, stub.sources(boards))
+        # Первый цикл записывает все цены и строит индекс порогов
+        prices = await poll_once(request, cache, database, engine)
+        requests, sent = stub.requests, stub.bytes_sent
+        before = stage_totals()
+
+        timings = []
+        for _ in range(cycles):
+            started = time.perf_counter()
+            await poll_once(request, cache, database, engine)
+            timings.append(time.perf_counter() - started)
+
+        after = stage_totals()
+        stages = {
+            stage: round((after[stage][0] - before[stage][0])
+                         / (after[stage][1] - before[stage][1]) * 1000, 3)
+            for stage in STAGES}
+        return {
+            **summarize(timings),
+            "quotes": len(prices),
+            "thresholds": len(engine),
+            "changed_per_cycle": len(cache.last_changes),
+            "stage_mean_ms": stages,
+            "response_bytes": (stub.bytes_sent - sent)
+            // max(stub.requests - requests, 1),
+        }
+    finally:
+        await session.close()
+
+
+async def run_price_cache(redis, tickers: int, operations: int,
+                          changed: float) -> dict:
+    """Измеряет save_prices (с долей changed изменений) и get_prices."""
+    writer = bench_price_cache(redis)
+    # Читатель без снимка в памяти - как воркер, не опрашивающий MOEX
+    reader = bench_price_cache(redis)
+    prices = {f"T{i:06}": 100.0 + i % 1000 for i in range(tickers)}
+    await writer.save_prices(prices)
+
+    step = max(int(1 / changed), 1) if changed else tickers + 1
+    writes = []
+    for operation in range(operations):
+        prices = {ticker: (price + 0.01 if index % step == operation % step
+                           else price)
+                  for index, (ticker, price) in enumerate(prices.items())}
+        started = time.perf_counter()
+        await writer.save_prices(prices)
+        writes.append(time.perf_counter() - started)
+
+    reads = []
+    for _ in range(operations):
+        started = time.perf_counter()
+        await reader.get_prices()
+        reads.append(time.perf_counter() - started)
+    return {"tickers": tickers, "changed": changed,
+            "save_prices": summarize(writes),
+            "get_prices": summarize(reads)}
+
+
+def build_api(make_redis: Callable, db_path: Path, l1_cache: bool,
+              tickers: int) -> FastAPI:
+    """Приложение с маршрутами alert_price без фоновых задач.
+
+    Кеш цен заполняется tickers ценами при запуске.
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        redis = make_redis()
+        database = DatabaseGateway(db_path)
+        await database.open()
+        price_cache = bench_price_cache(redis)
+        await price_cache.save_prices(
+            {f"T{i:06}": 100.0 + i % 1000 for i in range(tickers)})
+        price_cache.forget_snapshot()
+        app.state.database = database
+        app.state.price_cache = price_cache
+        app.state.local_price_cache = None
+        app.state.price_reader = price_cache
+        if l1_cache:
+            local_cache = LocalPriceCache(price_cache, ttl=POLL_INTERVAL)
+            app.state.local_price_cache = local_cache
+            app.state.price_reader = local_cache
+        app.state.alert_engine = AlertEngine()
+        try:
+            yield
+        finally:
+            await database.close()
+            await redis.aclose()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(router)
+    app.add_middleware(RequestMetricsMiddleware)
+    return app
+
+
+class ApiServer:
+    """Сервер uvicorn в отдельном потоке на свободном порту."""
+
+    def __init__(self, app: FastAPI):
+        self.sock = socket.socket()
+        # Без TCP_NODELAY ответы по keep-alive ждут отложенного ACK
+        # клиента (~40 мс), и измерялась бы задержка TCP, а не API
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.base_url = "http://127.0.0.1:%d" % self.sock.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, log_config=None, log_level="warning", access_log=False))
+        self.thread = threading.Thread(
+            target=self.server.run, kwargs={"sockets": [self.sock]},
+            daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("Сервер API не запустился")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join()
+        self.sock.close()
+
+
+async def load(session: aiohttp.ClientSession, clients: int, total: int,
+               request: Callable) -> dict:
+    """Выполняет total запросов clients одновременными клиентами.
+
+    Args:
+        request: Функция (session, номер) -> контекст запроса.
+    """
+    timings = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for number in counter:
+            started = time.perf_counter()
+            async with request(session, number) as response:
+                await response.read()
+                if response.status >= 400:
+                    errors += 1
+            timings.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return {**summarize(timings, time.perf_counter() - started),
+            "errors": errors}
+
+
+async def run_api(base_url: str, clients: int, requests: int,
+                  crud: int) -> dict:
+    """Нагружает маршруты чтения и записи сервера API."""
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(base_url, connector=connector) as session:
+        # Прогрев: соединения и L1-кеш
+        await load(session, clients, clients,
+                   lambda s, _: s.get("/api/prices"))
+        api = {
+            "prices": await load(session, clients, requests,
+                                 lambda s, _: s.get("/api/prices")),
+            "tracked_stocks": await load(
+                session, clients, requests,
+                lambda s, _: s.get("/api/tracked-stocks?limit=100")),
+        }
+        crud_results = {
+            "create": await load(session, clients, crud, lambda s, i: s.post(
+                "/api/stock-alerts", data={"ticker": f"CRUD{i:06}",
+                                           "buy_price": "100",
+                                           "sell_price": "200"})),
+            "delete": await load(session, clients, crud, lambda s, i: s.delete(
+                f"/api/stock-alerts/CRUD{i:06}")),
+        }
+    return {"api": api, "alert_crud": crud_results}
+
+
+async def cleanup(make_redis: Callable) -> None:
+    """Удаляет ключи кеша цен бенчмарка."""
+    redis = make_redis()
+    try:
+        cache = bench_price_cache(redis)
+        await redis.delete(cache.cache_key, cache.meta_key,
+                           cache.changelog_key)
+    finally:
+        await redis.aclose()
+
+
+async def run_local(args, make_redis: Callable, db_path: Path) -> dict:
+    """Части бенчмарка, работающие в основном цикле событий."""
+    stub = StubMoex(args.rows, args.latency_ms / 1000, args.changed)
+    await stub.start()
+    redis = make_redis()
+    try:
+        async with DatabaseGateway(db_path) as database:
+            await database.save_shares(
+                TrackingParameters(ticker=f"T{i:06}", buy_price=100,
+                                   sell_price=4000)
+                for i in range(args.tracked))
+            boards = [PRIMARY_BOARD] + [f"B{i:03}"
+                                        for i in range(args.boards - 1)]
+            return {
+                "poll_cycle": await run_poll_cycle(redis, database, stub,
+                                                   boards, args.cycles),
+                "price_cache": await run_price_cache(
+                    redis, args.rows * args.boards, args.operations,
+                    args.changed),
+            }
+    finally:
+        await redis.aclose()
+        await stub.close()
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=3000,
+                        help="строк в ответе заглушки на режим")
+    parser.add_argument("--boards", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=20,
+                        help="задержка ответа заглушки MOEX")
+    parser.add_argument("--changed", type=float, default=0.1,
+                        help="доля цен, меняющихся за цикл")
+    parser.add_argument("--cycles", type=int, default=30)
+    parser.add_argument("--operations", type=int, default=200,
+                        help="операций save_prices и get_prices")
+    parser.add_argument("--tracked", type=int, default=1000,
+                        help="записей отслеживания в базе")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--crud", type=int, default=500,
+                        help="созданий и удалений записей")
+    parser.add_argument("--no-l1", action="store_true",
+                        help="читать снимок цен без L1-кеша")
+    parser.add_argument("--fake", action="store_true",
+                        help="использовать fakeredis вместо Redis")
+    parser.add_argument("--output", type=Path,
+                        help="файл для результата JSON")
+    args = parser.parse_args()
+
+    # Предупреждения о пропущенных строках заглушки выводились бы
+    # каждый цикл
+    logging.basicConfig(level=logging.ERROR)
+    make_redis = redis_factory(args.fake)
+    result = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "backend": "fakeredis" if args.fake else "redis",
+            "params": {key: str(value) if isinstance(value, Path) else value
+                       for key, value in vars(args).items()},
+        }
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "bench.db"
+        try:
+            result.update(asyncio.run(run_local(args, make_redis, db_path)))
+            app = build_api(make_redis, db_path, not args.no_l1,
+                            args.rows * args.boards)
+            with ApiServer(app) as server:
+                result.update(asyncio.run(run_api(
+                    server.base_url, args.clients, args.requests,
+                    args.crud)))
+        finally:
+            asyncio.run(cleanup(make_redis))
+
+    output = json.dumps(result, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Бенчмарк записи и чтения хранилища тиков TickStore.
+
+Имитирует циклы опроса: в каждом цикле меняется доля changed из
+tickers тикеров, изменения добавляются одним вызовом append. Затем
+измеряется чтение последних тиков одного и нескольких тикеров.
+
+Redis берется из переменных REDIS_* (как в приложении), ключи
+создаются с префиксом bench:ticks и удаляются после прогона. С ключом
+--fake используется fakeredis (проверка сценария, а не скорости).
+
+Запуск:
+    python -m benchmarks.bench_tick_store [--tickers 3000] [--cycles 60]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from alert_price.services.redis_client import create_connection_pool
+from alert_price.services.tick_store import TickStore
+
+
+def percentile(values, share: float) -> float:
+    """Значение перцентиля share (0..1) в мс."""
+    values = sorted(values)
+    return round(values[int(share * (len(values) - 1))] * 1000, 3)
+
+
+async def create_client(fake: bool):
+    """Клиент Redis приложения или fakeredis."""
+    if fake:
+        from fakeredis.aioredis import FakeRedis
+        return FakeRedis()
+    from redis.asyncio import Redis
+    return Redis(connection_pool=create_connection_pool())
+
+
+async def run(tickers: int, cycles: int, changed: float, maxlen: int,
+              fake: bool) -> dict:
+    """Заполняет хранилище и измеряет запись и чтение."""
+    redis = await create_client(fake)
+    store = TickStore(redis, maxlen=maxlen, key_prefix="bench:ticks")
+    rng = random.Random(0)
+    names = [f"T{i:05}" for i in range(tickers)]
+    prices = {name: rng.uniform(10, 5000) for name in names}
+
+    try:
+        writes = []
+        ticks = 0
+        for _ in range(cycles):
+            changes = {name: round(prices[name] * rng.uniform(0.99, 1.01), 2)
+                       for name in rng.sample(names, int(tickers * changed))}
+            prices.update(changes)
+            started = time.perf_counter()
+            await store.append(changes, names)
+            writes.append(time.perf_counter() - started)
+            ticks += len(changes)
+
+        reads = {}
+        for count in (1, 50, 500):
+            timings = []
+            for _ in range(20):
+                sample = rng.sample(names, count)
+                started = time.perf_counter()
+                await store.read(sample, limit=100)
+                timings.append(time.perf_counter() - started)
+            reads[f"{count}_tickers"] = {
+                "p50_ms": percentile(timings, 0.5),
+                "p95_ms": percentile(timings, 0.95)}
+
+        memory = None
+        if not fake:
+            sample = rng.sample(names, min(100, tickers))
+            sizes = [await redis.memory_usage(store._key(name))
+                     for name in sample]
+            memory = round(sum(sizes) / len(sizes) * tickers / 2 ** 20, 2)
+
+        return {
+            "tickers": tickers,
+            "cycles": cycles,
+            "ticks_per_cycle": int(tickers * changed),
+            "append_p50_ms": percentile(writes, 0.5),
+            "append_p95_ms": percentile(writes, 0.95),
+            "ticks_per_sec": round(ticks / sum(writes)),
+            "read": reads,
+            "memory_mib": memory,
+            "backend": "fakeredis" if fake else "redis"
+        }
+    finally:
+        keys = [store._key(name) for name in names]
+        for start in range(0, len(keys), 1000):
+            await redis.delete(*keys[start:start + 1000])
+        await redis.aclose()
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tickers", type=int, default=3000)
+    parser.add_argument("--cycles", type=int, default=60)
+    parser.add_argument("--changed", type=float, default=0.5,
+                        help="доля тикеров, меняющихся за цикл")
+    parser.add_argument("--maxlen", type=int, default=1000)
+    parser.add_argument("--fake", action="store_true",
+                        help="использовать fakeredis вместо Redis")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run(args.tickers, args.cycles,
+                                     args.changed, args.maxlen,
+                                     args.fake))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Бенчмарк сериализации списка отслеживания для /api/tracked-stocks.
+
+Сравнивает прежний путь (модели TrackingParameters -> словари ->
+jsonable_encoder -> JSONResponse) с быстрым путем (пачки строк
+aiosqlite -> encode_json_array) на временной базе SQLite.
+
+Запуск:
+    python -m benchmarks.bench_tracked_stocks [--rows 10000 100000]
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from alert_price.api.schemas import TrackingParameters
+from alert_price.services.database_gateway import DatabaseGateway
+from alert_price.services.tracking_io import FIELDS
+from alert_price.utils.fast_json import encode_json_array
+
+
+async def legacy_path(database: DatabaseGateway) -> int:
+    """Прежний путь: модели Pydantic и повторная сериализация FastAPI."""
+    stocks = await database.get_all_tracked_stocks()
+    content = [{
+        "ticker": stock.ticker,
+        "buy_price": stock.buy_price,
+        "sell_price": stock.sell_price
+    } for stock in stocks]
+    return len(JSONResponse(jsonable_encoder(content)).body)
+
+
+async def fast_path(database: DatabaseGateway, limit: int) -> int:
+    """Быстрый путь маршрута /api/tracked-stocks."""
+    chunks = await database.fetch_tracked_stocks(limit=limit)
+    return len(encode_json_array(chunks, FIELDS))
+
+
+async def measure(coro_factory, repeat: int) -> dict:
+    """Возвращает медиану времени и пиковую память Python-аллокаций.
+
+    Время измеряется без tracemalloc, память - отдельным прогоном.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = await coro_factory()
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+
+    tracemalloc.start()
+    await coro_factory()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "median_ms": round(timings[len(timings) // 2] * 1000, 2),
+        "peak_kib": round(peak / 1024, 1),
+        "bytes": size
+    }
+
+
+async def run(rows: int, repeat: int) -> dict:
+    """Заполняет временную базу и измеряет оба пути."""
+    with tempfile.TemporaryDirectory() as tmp:
+        async with DatabaseGateway(Path(tmp) / "bench.db",
+                                   readers=2) as database:
+            await database.save_shares(
+                TrackingParameters(ticker=f"T{i:06}", buy_price=100 + i % 50,
+                                   sell_price=200 + i % 50)
+                for i in range(rows))
+            return {
+                "rows": rows,
+                "legacy": await measure(lambda: legacy_path(database),
+                                        repeat),
+                "fast": await measure(
+                    lambda: fast_path(database, rows), repeat)
+            }
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+",
+                        default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        print(json.dumps(asyncio.run(run(rows, args.repeat))))
+
+
+if __name__ == "__main__":
+    main()
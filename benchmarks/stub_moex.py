@@ -0,0 +1,112 @@
+"""
+Заглушка MOEX ISS для офлайн-бенчмарков.
+
+Локальный сервер aiohttp отвечает на запросы securities.json любого
+режима торгов блоком marketdata из rows строк с задержкой latency.
+Ответы заранее закодированы в нескольких вариантах, в каждом
+следующем меняется доля changed цен: цикл опроса записывает в кеш
+изменения, а сервер не тратит время на кодирование JSON. Около 1%
+строк содержит некорректную цену (пропускается при разборе).
+"""
+
+import asyncio
+import json
+import random
+import socket
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+from aiohttp import web
+
+from alert_price.services.prices_request import MarketSource
+
+
+@dataclass(frozen=True)
+class StubSource(MarketSource):
+    """Режим торгов, запрашиваемый у заглушки вместо iss.moex.com."""
+    base_url: str = ""
+
+    @property
+    def url(self) -> str:
+        return super().url.replace("http://iss.moex.com", self.base_url, 1)
+
+
+class StubMoex:
+    """Сервер-заглушка MOEX ISS."""
+
+    def __init__(self, rows: int, latency: float = 0.0,
+                 changed: float = 0.1, variants: int = 4, seed: int = 0):
+        """Инициализация заглушки.
+
+        Args:
+            rows: Строк marketdata в ответе одного режима.
+            latency: Задержка ответа (сек).
+            changed: Доля цен, меняющихся между вариантами ответа.
+            variants: Число заранее закодированных вариантов ответа.
+            seed: Начальное значение генератора цен.
+        """
+        self.rows = rows
+        self.latency = latency
+        self.changed = changed
+        self.variants = variants
+        self.seed = seed
+        self.base_url = ""
+        self.requests = 0
+        self.bytes_sent = 0
+        self._payloads: Dict[str, List[bytes]] = {}
+        self._runner = None
+
+    def _encode_variants(self, board: str) -> List[bytes]:
+        rng = random.Random(f"{self.seed}:{board}")
+        prices = [round(rng.uniform(10, 5000), 2) for _ in range(self.rows)]
+        payloads = []
+        for _ in range(self.variants):
+            data = [[f"T{i:06}", None if i % 100 == 99 else price]
+                    for i, price in enumerate(prices)]
+            payloads.append(json.dumps({"marketdata": {
+                "columns": ["SECID", "LAST"], "data": data}}).encode())
+            for i in rng.sample(range(self.rows),
+                                int(self.rows * self.changed)):
+                prices[i] = round(prices[i] * rng.uniform(0.99, 1.01), 2)
+        return payloads
+
+    async def _securities(self, request: web.Request) -> web.Response:
+        board = request.match_info["board"]
+        payloads = self._payloads.get(board)
+        if payloads is None:
+            payloads = self._payloads[board] = self._encode_variants(board)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        body = payloads[self.requests % self.variants]
+        self.requests += 1
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type="application/json")
+
+    async def start(self) -> str:
+        """Запускает сервер на свободном порту 127.0.0.1.
+
+        Returns:
+            str: Базовый адрес сервера.
+        """
+        app = web.Application()
+        app.router.add_get(
+            "/iss/engines/{engine}/markets/{market}/boards/{board}/"
+            "securities.json", self._securities)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        await web.SockSite(self._runner, sock).start()
+        self.base_url = "http://127.0.0.1:%d" % sock.getsockname()[1]
+        return self.base_url
+
+    async def close(self) -> None:
+        """Останавливает сервер."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def sources(self, boards: Iterable[str]) -> Tuple[StubSource, ...]:
+        """Режимы торгов акций, запрашиваемые у заглушки."""
+        return tuple(StubSource("stock", "shares", board,
+                                base_url=self.base_url)
+                     for board in boards)
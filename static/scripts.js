@@ -181,6 +181,10 @@ document.addEventListener('DOMContentLoaded', () => {
     const addForm = document.getElementById('entering-data-form');
     const tableBody = document.getElementById('stock-table-body');
     let currentPrices = {};
+    // Число точек мини-графика (сервер прореживает ряд методом LTTB)
+    const SPARKLINE_POINTS = 40;
+    // Тикеров в одном запросе истории (не больше HISTORY_BATCH_MAX сервера)
+    const HISTORY_BATCH = 100;
 
     // Загрузка данных при старте
     loadData();
@@ -192,10 +196,25 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     // Функция загрузки данных
+    // Загрузка списка отслеживания постранично (курсор в X-Next-Cursor)
+    async function fetchTrackedStocks() {
+        const stocks = [];
+        let url = '/api/tracked-stocks?limit=1000';
+        while (url) {
+            const res = await fetch(url);
+            stocks.push(...await res.json());
+            const cursor = res.headers.get('X-Next-Cursor');
+            url = cursor
+                ? `/api/tracked-stocks?limit=1000&after=${encodeURIComponent(cursor)}`
+                : null;
+        }
+        return stocks;
+    }
+
     async function loadData() {
         try {
             const [stocks, prices] = await Promise.all([
-                fetch('/api/tracked-stocks').then(res => res.json()),
+                fetchTrackedStocks(),
                 fetch('/api/prices').then(res => res.json())
             ]);
             
@@ -208,38 +227,68 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Функция обновления цен
+    let priceUpdatesStarted = false;
+
     function startPriceUpdates() {
+        // Поток открывается один раз, loadData вызывается повторно
+        if (priceUpdatesStarted) return;
+        priceUpdatesStarted = true;
+
+        if (!window.EventSource) {
+            startPricePolling();
+            return;
+        }
+
+        // Сервер присылает снимок цен после каждого опроса биржи
+        const source = new EventSource('/api/prices/stream');
+        source.addEventListener('prices', (event) => {
+            try {
+                const { prices } = JSON.parse(event.data);
+                applyPrices(prices);
+            } catch (error) {
+                console.error('Ошибка обновления цен:', error);
+            }
+        });
+    }
+
+    // Резервный опрос для браузеров без EventSource
+    function startPricePolling() {
         setInterval(async () => {
             try {
                 const response = await fetch('/api/prices');
                 const { prices } = await response.json();
-                currentPrices = prices || {};
-            
-                document.querySelectorAll('.price-cell').forEach(cell => {
-                    const ticker = cell.dataset.ticker;
-                    const price = currentPrices[ticker];
-                    cell.textContent = price ?? 'N/A';
-                
-                    const row = cell.closest('tr');
-                    updateRowStyle(row, ticker);
-                
-                    // Обновляем процент расхождения
-                    const buyPrice = parseFloat(row.children[1].textContent);
-                    const sellPrice = parseFloat(row.children[2].textContent);
-                    const currentPrice = price ? parseFloat(price) : null;
-                    const diffCell = row.querySelector('.difference-cell');
-                    const diff = calculateDifference(buyPrice, sellPrice, currentPrice);
-                
-                    // Обновляем классы и значение
-                    diffCell.className = `difference-cell ${diff.type}-difference`;
-                    diffCell.textContent = diff.value ? `${diff.value}%` : '';
-                });
+                applyPrices(prices);
             } catch (error) {
                 console.error('Ошибка обновления цен:', error);
             }
         }, 9000);
     }
 
+    // Применение нового снимка цен к таблице
+    function applyPrices(prices) {
+        currentPrices = prices || {};
+
+        document.querySelectorAll('.price-cell').forEach(cell => {
+            const ticker = cell.dataset.ticker;
+            const price = currentPrices[ticker];
+            cell.textContent = price ?? 'N/A';
+
+            const row = cell.closest('tr');
+            updateRowStyle(row, ticker);
+
+            // Обновляем процент расхождения
+            const buyPrice = parseFloat(row.children[1].textContent);
+            const sellPrice = parseFloat(row.children[2].textContent);
+            const currentPrice = price ? parseFloat(price) : null;
+            const diffCell = row.querySelector('.difference-cell');
+            const diff = calculateDifference(buyPrice, sellPrice, currentPrice);
+
+            // Обновляем классы и значение
+            diffCell.className = `difference-cell ${diff.type}-difference`;
+            diffCell.textContent = diff.value ? `${diff.value}%` : '';
+        });
+    }
+
     // Обработка добавления акции
     async function handleAddStock() {
         const formData = new FormData(addForm);
@@ -290,17 +339,27 @@ document.addEventListener('DOMContentLoaded', () => {
         return svg.outerHTML;
     }
 
-    // Функция для загрузки исторических данных
-    async function loadStockHistory(ticker) {
-        try {
-            const response = await fetch(`/api/stock-history/${ticker}`);
-            if (!response.ok) throw new Error('Ошибка загрузки данных');
-            const data = await response.json();
-            return data.prices;
-        } catch (error) {
-            console.error('Ошибка загрузки исторических данных:', error);
-            return null;
+    // Загрузка исторических данных пакетами тикеров
+    // (один запрос на HISTORY_BATCH тикеров вместо запроса на строку)
+    async function loadStocksHistory(tickers) {
+        const history = {};
+        for (let i = 0; i < tickers.length; i += HISTORY_BATCH) {
+            const batch = tickers.slice(i, i + HISTORY_BATCH);
+            try {
+                // Для мини-графика достаточно фиксированного числа точек
+                const params = new URLSearchParams({
+                    tickers: batch.join(','),
+                    points: SPARKLINE_POINTS
+                });
+                const response = await fetch(`/api/stock-history?${params}`);
+                if (!response.ok) throw new Error('Ошибка загрузки данных');
+                const data = await response.json();
+                Object.assign(history, data.prices);
+            } catch (error) {
+                console.error('Ошибка загрузки исторических данных:', error);
+            }
         }
+        return history;
     }
 
     // Модифицируем функцию renderStockTable
@@ -308,9 +367,9 @@ document.addEventListener('DOMContentLoaded', () => {
         tableBody.innerHTML = stocks.map(stock => {
             const currentPrice = currentPrices[stock.ticker];
             const diff = calculateDifference(
-                parseFloat(stock.buy_price),
-                parseFloat(stock.sell_price),
-                currentPrice ? parseFloat(currentPrice) : null
+                stock.buy_price,
+                stock.sell_price,
+                currentPrice ?? null
             );
 
             return `
@@ -344,15 +403,14 @@ document.addEventListener('DOMContentLoaded', () => {
             `;
         }).join('');
 
-        // Загружаем графики для каждой акции
-        stocks.forEach(async stock => {
-            const prices = await loadStockHistory(stock.ticker);
-            if (prices) {
-                const chartContainer = document.getElementById(`chart-${stock.ticker}`);
+        // Загружаем графики всех акций пакетными запросами
+        loadStocksHistory(stocks.map(stock => stock.ticker)).then(history => {
+            Object.entries(history).forEach(([ticker, prices]) => {
+                const chartContainer = document.getElementById(`chart-${ticker}`);
                 if (chartContainer) {
                     chartContainer.innerHTML = createStockChart(prices);
                 }
-            }
+            });
         });
 
         // Добавляем обработчики для кнопок удаления
@@ -403,8 +461,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const price = prices[stock.ticker];
         if (!price) return '';
         
-        const buyPrice = parseFloat(stock.buy_price);
-        const sellPrice = parseFloat(stock.sell_price);
+        const buyPrice = stock.buy_price;
+        const sellPrice = stock.sell_price;
         
         if (price <= buyPrice) return 'Покупка';
         if (price >= sellPrice) return 'Продажа';
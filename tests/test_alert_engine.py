@@ -0,0 +1,87 @@
+"""Модуль тестирует класс AlertEngine."""
+
+import pytest
+
+from alert_price.services.alert_engine import AlertEngine
+from alert_price.services.event_loop_handler import begin_leader_term
+from alert_price.services.price_cache import PriceCache
+
+
+@pytest.fixture
+def alert_engine():
+    """Фикстура с индексом порогов для SBER и GAZP.
+
+    Returns:
+        AlertEngine: Индекс с загруженными порогами
+    """
+    engine = AlertEngine()
+    engine.load([
+        (1, "SBER", "240", "260"),
+        (2, "SBER", "245.5", "270"),
+        (3, "GAZP", 150, 200),
+    ])
+    return engine
+
+
+class TestAlertEngine:
+    """Набор тестов для класса AlertEngine."""
+
+    def test_first_price_is_not_a_crossing(self, alert_engine):
+        """Первая цена тикера только запоминается."""
+        assert alert_engine.process({"SBER": 230.0}) == []
+
+    def test_price_drop_crosses_buy_thresholds(self, alert_engine):
+        """Падение цены срабатывает на пороги покупки в [новая, старая)."""
+        alert_engine.process({"SBER": 250.0})
+        events = alert_engine.process({"SBER": 240.0})
+
+        assert [(e.alert_id, e.direction, e.threshold) for e in events] == [
+            (1, "buy", 240.0),
+            (2, "buy", 245.5),
+        ]
+        assert events[0].previous_price == 250.0
+        assert events[0].price == 240.0
+
+    def test_price_rise_crosses_sell_thresholds(self, alert_engine):
+        """Рост цены срабатывает на пороги продажи в (старая, новая]."""
+        alert_engine.process({"SBER": 260.0, "GAZP": 160.0})
+        events = alert_engine.process({"SBER": 275.0, "GAZP": 170.0})
+
+        assert [(e.alert_id, e.direction) for e in events] == [(2, "sell")]
+
+    def test_staying_beyond_threshold_does_not_repeat(self, alert_engine):
+        """Повторное событие возникает только при новом пересечении."""
+        alert_engine.process({"GAZP": 160.0})
+        assert len(alert_engine.process({"GAZP": 140.0})) == 1
+        assert alert_engine.process({"GAZP": 130.0}) == []
+        assert alert_engine.process({"GAZP": 155.0}) == []
+        assert len(alert_engine.process({"GAZP": 150.0})) == 1
+
+    def test_load_marks_index_fresh(self):
+        """Индекс устаревает после mark_stale и обновляется при load."""
+        engine = AlertEngine()
+        assert engine.is_stale
+
+        engine.load([(1, "SBER", "bad", "260")])
+        assert not engine.is_stale
+        assert len(engine) == 0
+
+        engine.mark_stale()
+        assert engine.is_stale
+
+    def test_nearest_gap(self, alert_engine):
+        """Расстояние до ближайшего порога считается от текущей цены."""
+        assert alert_engine.nearest_gap({"SBER": 250.0}) == pytest.approx(
+            4.5 / 250)
+        assert alert_engine.nearest_gap({"LKOH": 7000.0}) is None
+
+    def test_new_leader_term_ignores_previous_prices(self, alert_engine):
+        """После повторного избрания ведущим старые цены не сравниваются."""
+        alert_engine.process({"SBER": 250.0})
+        # Процесс потерял аренду, цена за это время ушла ниже порогов
+        # и вернулась; новый срок начинается со сброса
+        begin_leader_term(PriceCache(redis_client=None), alert_engine)
+
+        assert alert_engine.is_stale
+        assert alert_engine.process({"SBER": 239.0}) == []
+        assert len(alert_engine.process({"SBER": 261.0})) == 1
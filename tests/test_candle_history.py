@@ -0,0 +1,123 @@
+"""Модуль тестирует кеш истории свечей CandleHistory."""
+
+import asyncio
+import re
+
+import pytest
+import pytest_asyncio
+
+from alert_price.services.candle_history import CandleHistory
+from alert_price.services.prices_request import create_moex_session
+
+CANDLES_URL = re.compile(r"^http://iss\.moex\.com/iss/engines/stock/"
+                         r"markets/shares/boards/TQBR/securities/SBER/"
+                         r"candles\.json.*$")
+GAZP_CANDLES_URL = re.compile(r"^http://iss\.moex\.com/iss/engines/stock/"
+                              r"markets/shares/boards/TQBR/securities/GAZP/"
+                              r"candles\.json.*$")
+
+
+class MemoryRedis:
+    """Хранилище в памяти с командами GET, MGET и SET, нужными кешу."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+
+def candles(*rows):
+    """Ответ MOEX со свечами (begin, close)."""
+    return {"candles": {"columns": ["begin", "close"], "data": list(rows)}}
+
+
+@pytest_asyncio.fixture
+async def history():
+    """Кеш свечей с общей сессией MOEX и хранилищем в памяти."""
+    session = create_moex_session()
+    try:
+        yield CandleHistory(MemoryRedis(), session, days=36500,
+                            fresh_ttl=60)
+    finally:
+        await session.close()
+
+
+class TestCandleHistory:
+    """Набор тестов для класса CandleHistory."""
+
+    async def test_concurrent_requests_share_one_fetch(
+        self, history, mock_aioresponse
+    ):
+        """Одновременные запросы серии ждут один запрос к MOEX."""
+        mock_aioresponse.get(CANDLES_URL, payload=candles(
+            ["2024-05-10 10:00:00", 250.0]))
+
+        first, second = await asyncio.gather(history.get("SBER"),
+                                             history.get("SBER"))
+
+        assert first.closes == second.closes == [250.0]
+        assert first.cache_status == "miss"
+        assert history.upstream_requests == 1
+        assert history.coalesced_requests == 1
+
+    async def test_fresh_series_is_served_from_cache(
+        self, history, mock_aioresponse
+    ):
+        """Серия моложе fresh_ttl не запрашивается повторно."""
+        mock_aioresponse.get(CANDLES_URL, payload=candles(
+            ["2024-05-10 10:00:00", 250.0]))
+
+        await history.get("SBER")
+        series = await history.get("SBER")
+
+        assert series.cache_status == "hit"
+        assert history.upstream_requests == 1
+
+    async def test_stale_series_is_refreshed_incrementally(
+        self, history, mock_aioresponse
+    ):
+        """Устаревшая серия отдается сразу и дополняется в фоне."""
+        mock_aioresponse.get(CANDLES_URL, payload=candles(
+            ["2024-05-10 10:00:00", 250.0], ["2024-05-10 11:00:00", 251.0]))
+        mock_aioresponse.get(CANDLES_URL, payload=candles(
+            ["2024-05-10 11:00:00", 252.0], ["2024-05-10 12:00:00", 253.0]))
+
+        await history.get("SBER")
+        history.fresh_ttl = 0
+        stale = await history.get("SBER")
+        await asyncio.gather(*history._background)
+        history.fresh_ttl = 60
+        refreshed = await history.get("SBER")
+
+        last_call = list(mock_aioresponse.requests.values())[-1][-1]
+        assert stale.cache_status == "stale"
+        assert stale.closes == [250.0, 251.0]
+        assert refreshed.closes == [250.0, 252.0, 253.0]
+        assert last_call.kwargs["params"]["from"] == "2024-05-10 11:00:00"
+
+    async def test_unknown_board_is_rejected(self, history):
+        """Тикер режима, которого нет в настройках, не запрашивается."""
+        with pytest.raises(KeyError):
+            await history.get("TQTF:FXGD")
+
+    async def test_batch_reports_errors_per_ticker(
+        self, history, mock_aioresponse
+    ):
+        """Ошибка одного тикера пакета не мешает получить остальные."""
+        mock_aioresponse.get(CANDLES_URL, payload=candles(
+            ["2024-05-10 10:00:00", 250.0]))
+        mock_aioresponse.get(GAZP_CANDLES_URL, status=500)
+
+        results = await history.get_many(["SBER", "GAZP", "TQTF:FXGD"])
+
+        assert list(results) == ["SBER", "GAZP", "TQTF:FXGD"]
+        assert results["SBER"].closes == [250.0]
+        assert isinstance(results["GAZP"], ValueError)
+        assert isinstance(results["TQTF:FXGD"], KeyError)
@@ -0,0 +1,198 @@
+"""Модуль тестирует класс DatabaseGateway."""
+
+import asyncio
+import logging
+import sqlite3
+
+import pytest
+import pytest_asyncio
+
+from alert_price.api.schemas import TrackingParameters
+from alert_price.services.database_gateway import MIGRATIONS, DatabaseGateway
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest_asyncio.fixture
+async def gateway(tmp_path):
+    """Открытый шлюз на временном файле базы данных.
+
+    Returns:
+        DatabaseGateway: Шлюз с двумя соединениями для чтения
+    """
+    async with DatabaseGateway(tmp_path / "test.db", readers=2) as db:
+        yield db
+
+
+class TestDatabaseGateway:
+    """Набор тестов для класса DatabaseGateway."""
+
+    async def test_open_applies_migrations_and_wal(self, gateway):
+        """Схема создается при открытии, журнал в режиме WAL."""
+        async with gateway.conn.execute("PRAGMA user_version") as cursor:
+            assert (await cursor.fetchone())[0] == len(MIGRATIONS)
+        async with gateway.conn.execute("PRAGMA journal_mode") as cursor:
+            assert (await cursor.fetchone())[0] == "wal"
+
+    async def test_reopen_does_not_repeat_migrations(self, tmp_path):
+        """Повторное открытие базы не применяет миграции заново."""
+        path = tmp_path / "test.db"
+        async with DatabaseGateway(path, readers=1) as db:
+            await db.save_share(TrackingParameters(
+                ticker="SBER", buy_price="240", sell_price="260"))
+
+        async with DatabaseGateway(path, readers=1) as db:
+            stocks = await db.get_all_tracked_stocks()
+
+        assert [stock.ticker for stock in stocks] == ["SBER"]
+
+    async def test_save_and_delete_share(self, gateway):
+        """Запись заменяет тикер, удаление сообщает о результате."""
+        for price in ("240", "250"):
+            await gateway.save_share(TrackingParameters(
+                ticker="SBER", buy_price=price, sell_price="260"))
+
+        assert await gateway.get_alert_thresholds() == [
+            (2, "SBER", 250.0, 260.0)]
+        assert await gateway.delete_share("SBER")
+        assert not await gateway.delete_share("SBER")
+
+    async def test_read_during_write_transaction(self, gateway):
+        """Чтение не ждет открытую транзакцию записи."""
+        await gateway.save_share(TrackingParameters(
+            ticker="SBER", buy_price="240", sell_price="260"))
+
+        async with gateway._writer() as conn:
+            await conn.execute(
+                "INSERT INTO tracking_parameters "
+                "(ticker, buy_price, sell_price) VALUES ('GAZP', '1', '2')")
+            stocks = await asyncio.wait_for(
+                gateway.get_all_tracked_stocks(), timeout=1)
+
+        assert [stock.ticker for stock in stocks] == ["SBER"]
+        assert len(await gateway.get_all_tracked_stocks()) == 2
+
+    async def test_save_shares_and_paged_export(self, gateway):
+        """Пакет пишется одной транзакцией и читается страницами."""
+        saved = await gateway.save_shares(
+            TrackingParameters(ticker=f"T{i}", buy_price="1", sell_price="2")
+            for i in range(5))
+
+        pages = [page async for page in
+                 gateway.iter_tracking_parameters(page_size=2)]
+
+        assert saved == 5
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert pages[0][0] == ("T0", 1.0, 2.0)
+
+    async def test_text_prices_are_migrated_to_numbers(
+        self, tmp_path, caplog
+    ):
+        """Цены из старой схемы переносятся числами, строки с
+        нечисловыми ценами отбрасываются и попадают в журнал."""
+        path = tmp_path / "old.db"
+        with sqlite3.connect(path) as conn:
+            conn.execute(MIGRATIONS[0])
+            conn.execute("PRAGMA user_version = 1")
+            conn.executemany(
+                "INSERT INTO tracking_parameters "
+                "(ticker, buy_price, sell_price) VALUES (?, ?, ?)",
+                [("SBER", "240.5", "260"), ("GAZP", "abc", "200"),
+                 ("LKOH", "12abc", "7000"), ("ROSN", "240,5", "500"),
+                 ("VTBR", " 0.025 ", "1.2.3"), ("MOEX", " 150 ", "180.25")])
+        conn.close()
+
+        with caplog.at_level(logging.WARNING):
+            async with DatabaseGateway(path, readers=1) as db:
+                rows = await db.get_alert_thresholds()
+
+        assert rows == [(1, "SBER", 240.5, 260.0), (6, "MOEX", 150.0, 180.25)]
+        skipped = [record.args[2] for record in caplog.records
+                   if record.levelno == logging.WARNING]
+        assert skipped == ["GAZP", "LKOH", "ROSN", "VTBR"]
+
+    async def test_crossed_alerts_use_price_indexes(self, gateway):
+        """Пересеченные пороги ищутся по индексам (ticker, цена).
+
+        Запросы используют INDEXED BY, поэтому без индекса они
+        завершились бы ошибкой.
+        """
+        await gateway.save_shares([
+            TrackingParameters(ticker="SBER", buy_price=240,
+                               sell_price=260),
+            TrackingParameters(ticker="GAZP", buy_price=150,
+                               sell_price=200),
+        ])
+
+        assert await gateway.get_crossed_alerts("SBER", 250, 240) == [
+            (1, "buy", 240.0)]
+        assert await gateway.get_crossed_alerts("SBER", 250, 260) == [
+            (1, "sell", 260.0)]
+        assert await gateway.get_crossed_alerts("SBER", 260, 270) == []
+        assert await gateway.get_crossed_alerts("GAZP", 160, 160) == []
+
+    async def test_watchlists_are_per_owner(self, gateway):
+        """Один тикер может быть в списках разных владельцев."""
+        parameters = TrackingParameters(ticker="SBER", buy_price=240,
+                                        sell_price=260)
+        await gateway.save_share(parameters, owner_id="alice")
+        await gateway.save_share(parameters, owner_id="bob")
+
+        assert await gateway.delete_share("SBER", owner_id="alice")
+        assert await gateway.get_tracked_stocks_page("alice") == []
+        assert await gateway.get_tracked_stocks_page("bob") == [
+            ("SBER", 240.0, 260.0)]
+
+    async def test_keyset_pagination(self, gateway):
+        """Страницы идут по тикеру после курсора без пропусков."""
+        await gateway.save_shares(
+            [TrackingParameters(ticker=f"T{i:02}", buy_price=1,
+                                sell_price=2) for i in range(5)],
+            owner_id="alice")
+
+        first = await gateway.get_tracked_stocks_page("alice", limit=3)
+        second = await gateway.get_tracked_stocks_page(
+            "alice", after=first[-1][0], limit=3)
+
+        assert [row[0] for row in first + second] == [
+            "T00", "T01", "T02", "T03", "T04"]
+
+    async def test_page_is_read_in_chunks(self, gateway):
+        """Страница читается пачками по chunk_size строк."""
+        await gateway.save_shares(
+            TrackingParameters(ticker=f"T{i}", buy_price=1, sell_price=2)
+            for i in range(5))
+
+        chunks = await gateway.fetch_tracked_stocks(limit=3, chunk_size=2)
+        rest = await gateway.fetch_tracked_stocks(after="T2", limit=3)
+
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        assert chunks[-1][-1][0] == "T2"
+        assert [row[0] for chunk in rest for row in chunk] == ["T3", "T4"]
+
+    async def test_page_read_releases_reader(self, gateway):
+        """Соединение для чтения возвращается в пул до отправки страницы."""
+        await gateway.save_shares(
+            TrackingParameters(ticker=f"T{i}", buy_price=1, sell_price=2)
+            for i in range(5))
+
+        # Страницы, еще не переданные клиентам, не занимают пул
+        pages = [await gateway.fetch_tracked_stocks(limit=5)
+                 for _ in range(gateway.readers + 1)]
+
+        assert gateway._idle_readers.qsize() == gateway.readers
+        assert [len(page[0]) for page in pages] == [5, 5, 5]
+
+    async def test_thresholds_version_tracks_changes(self, gateway):
+        """Отпечаток порогов меняется при вставке, замене и удалении."""
+        parameters = TrackingParameters(ticker="SBER", buy_price=240,
+                                        sell_price=260)
+        versions = [await gateway.get_thresholds_version()]
+        await gateway.save_share(parameters)
+        versions.append(await gateway.get_thresholds_version())
+        await gateway.save_share(parameters)
+        versions.append(await gateway.get_thresholds_version())
+        await gateway.delete_share("SBER")
+        versions.append(await gateway.get_thresholds_version())
+
+        assert len(set(versions)) == len(versions)
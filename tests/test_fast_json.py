@@ -0,0 +1,29 @@
+"""Модуль тестирует быструю сериализацию JSON."""
+
+import json
+
+from alert_price.utils.fast_json import dumps, encode_json_array
+
+
+class TestFastJSON:
+    """Набор тестов для модуля fast_json."""
+
+    def test_pages_form_one_array(self):
+        """Пачки склеиваются в корректный массив объектов."""
+        body = encode_json_array(
+            [[("SBER", 240.0, 260.0)], [], [("GAZP", 150.0, 200.0)]],
+            ("ticker", "buy_price", "sell_price"))
+
+        assert json.loads(body) == [
+            {"ticker": "SBER", "buy_price": 240.0, "sell_price": 260.0},
+            {"ticker": "GAZP", "buy_price": 150.0, "sell_price": 200.0},
+        ]
+
+    def test_no_rows_is_empty_array(self):
+        """Без строк получается пустой массив."""
+        assert encode_json_array([], ("ticker",)) == b"[]"
+        assert encode_json_array([[]], ("ticker",)) == b"[]"
+
+    def test_dumps_is_compact_utf8(self):
+        """dumps возвращает компактный JSON без экранирования кириллицы."""
+        assert dumps({"a": [1, "б"]}) == '{"a":[1,"б"]}'.encode()
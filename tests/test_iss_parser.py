@@ -0,0 +1,58 @@
+"""Модуль тестирует разбор блоков ответа MOEX ISS."""
+
+import pytest
+
+from alert_price.services import iss_parser
+from alert_price.services.iss_parser import column_indexes, parse_quotes
+
+# Строки с корректными и отбрасываемыми значениями
+MIXED_BLOCK = {
+    "columns": ["BOARDID", "SECID", "LAST"],
+    "data": [
+        ["TQBR", "SBER", 250.5],
+        ["TQBR", "GAZP", "160.25"],
+        ["TQBR", "", 10],
+        ["TQBR", None, 10],
+        ["TQBR", "LKOH", None],
+        ["TQBR", "VTBR", "abc"],
+        ["TQBR", "ROSN", 0],
+        ["TQBR", "NVTK", -1],
+        ["TQBR", "MGNT", float("inf")],
+        ["TQBR", "YNDX"],
+    ]
+}
+
+PARSERS = [
+    pytest.param(False, id="python"),
+    pytest.param(True, id="numpy", marks=pytest.mark.skipif(
+        iss_parser.np is None, reason="NumPy не установлен")),
+]
+
+
+class TestIssParser:
+    """Набор тестов разбора блока marketdata."""
+
+    @pytest.mark.parametrize("use_numpy", PARSERS)
+    def test_invalid_rows_are_dropped_and_counted(self, use_numpy):
+        """Оба пути разбора отбрасывают одни и те же строки."""
+        quotes, errors = parse_quotes(MIXED_BLOCK, use_numpy=use_numpy)
+
+        assert quotes == {"SBER": 250.5, "GAZP": 160.25}
+        assert errors == 8
+
+    @pytest.mark.parametrize("use_numpy", PARSERS)
+    def test_prefix_and_numeric_column(self, use_numpy):
+        """Числовой столбец разбирается целиком, ключи получают префикс."""
+        block = {"columns": ["SECID", "LAST"],
+                 "data": [["FXGD", 12.3], ["FXUS", None]]}
+
+        assert parse_quotes(block, "TQTF:", use_numpy=use_numpy) == (
+            {"TQTF:FXGD": 12.3}, 1)
+
+    def test_column_indexes(self):
+        """Позиции берутся из columns, без него - по порядку имен."""
+        assert column_indexes({"columns": ["LAST", "SECID"]},
+                              ("SECID", "LAST")) == (1, 0)
+        assert column_indexes({}, ("SECID", "LAST")) == (0, 1)
+        with pytest.raises(ValueError, match="нет столбцов"):
+            column_indexes({"columns": ["SECID"]}, ("SECID", "LAST"))
@@ -0,0 +1,103 @@
+"""Модуль тестирует выбор ведущего процесса через аренду в Redis."""
+
+import asyncio
+
+import pytest_asyncio
+from fakeredis.aioredis import FakeRedis
+
+from alert_price.services.leader_lease import LeaderLease
+
+KEY = "test:leader"
+
+
+@pytest_asyncio.fixture
+async def redis():
+    """Пустой Redis в памяти."""
+    client = FakeRedis()
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+def lease(redis, name: str, ttl: float = 5.0,
+          renew_interval: float = 1.0) -> LeaderLease:
+    """Аренда процесса name на общем ключе."""
+    return LeaderLease(redis, key=KEY, ttl=ttl,
+                       renew_interval=renew_interval, identity=name)
+
+
+class TestLeaderLease:
+    """Набор тестов для класса LeaderLease."""
+
+    async def test_only_one_instance_acquires(self, redis):
+        """Свободную аренду захватывает только один из процессов."""
+        first, second = lease(redis, "a"), lease(redis, "b")
+
+        assert await first.try_acquire()
+        assert not await second.try_acquire()
+
+        assert first.is_leader and not second.is_leader
+        assert (await first.status())["leader"] == "a"
+
+    async def test_renew_extends_own_lease(self, redis):
+        """Ведущий продлевает аренду, чужая аренда не продлевается."""
+        first, second = lease(redis, "a", ttl=0.3), lease(redis, "b")
+        await first.try_acquire()
+
+        await asyncio.sleep(0.2)
+        assert await first.renew()
+        assert await redis.pttl(KEY) > 200
+        second._value = "b|0"
+        assert not await second.renew()
+
+    async def test_expired_lease_is_taken_over(self, redis):
+        """После истечения срока аренду захватывает другой процесс,
+        прежний ведущий ее уже не продлит."""
+        first, second = lease(redis, "a", ttl=0.1), lease(redis, "b")
+        await first.try_acquire()
+
+        await asyncio.sleep(0.15)
+
+        assert await second.try_acquire()
+        assert not await first.renew()
+        await first._step()
+        assert not first.is_leader and second.is_leader
+
+    async def test_release_keeps_other_owner_lease(self, redis):
+        """Освобождение не удаляет аренду, перехваченную другим."""
+        first, second = lease(redis, "a", ttl=0.1), lease(redis, "b")
+        await first.try_acquire()
+        await asyncio.sleep(0.15)
+        await second.try_acquire()
+
+        await first.release()
+
+        assert (await redis.get(KEY)).decode().startswith("b|")
+        await second.release()
+        assert await redis.get(KEY) is None
+
+    async def test_demotion_cancels_leader_tasks(self, redis):
+        """Потеря аренды отменяет задачи ведущего в run()."""
+        leader = lease(redis, "a", renew_interval=0.01)
+        started, cancelled = asyncio.Event(), asyncio.Event()
+
+        async def poll():
+            started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        stop_event = asyncio.Event()
+        runner = asyncio.create_task(leader.run(stop_event, lambda: [poll()]))
+        await asyncio.wait_for(started.wait(), 1)
+
+        await redis.set(KEY, "b|0")
+        await asyncio.wait_for(cancelled.wait(), 1)
+        assert not leader.is_leader
+
+        stop_event.set()
+        await asyncio.wait_for(runner, 1)
+        assert await redis.get(KEY) == b"b|0"
@@ -0,0 +1,110 @@
+"""Модуль тестирует L1-кеш снимка цен LocalPriceCache."""
+
+import asyncio
+
+import pytest_asyncio
+from fakeredis.aioredis import FakeRedis
+
+from alert_price.services.local_price_cache import LocalPriceCache
+from alert_price.services.price_cache import PriceCache
+
+
+@pytest_asyncio.fixture
+async def price_cache():
+    """Кеш цен в Redis в памяти с ценой SBER."""
+    client = FakeRedis()
+    cache = PriceCache(client)
+    await cache.save_prices({"SBER": 250.0})
+    try:
+        yield cache
+    finally:
+        await client.aclose()
+
+
+class TestLocalPriceCache:
+    """Набор тестов для класса LocalPriceCache."""
+
+    async def test_snapshot_is_served_from_memory_within_ttl(
+        self, price_cache
+    ):
+        """В пределах TTL снимок не перечитывается из Redis."""
+        local = LocalPriceCache(price_cache, ttl=60)
+        first = await local.get_snapshot()
+        await price_cache.save_prices({"SBER": 251.0})
+
+        second = await local.get_snapshot()
+
+        assert second is first and second.prices == {"SBER": 250.0}
+        assert (local.hits, local.misses) == (1, 1)
+
+    async def test_snapshot_is_reloaded_after_ttl(self, price_cache):
+        """После TTL снимок читается из Redis заново."""
+        local = LocalPriceCache(price_cache, ttl=0.05)
+        await local.get_snapshot()
+        await price_cache.save_prices({"SBER": 251.0})
+        await asyncio.sleep(0.06)
+
+        snapshot = await local.get_snapshot()
+
+        assert snapshot.prices == {"SBER": 251.0}
+        assert (local.hits, local.misses) == (0, 2)
+
+    async def test_invalidate_drops_inflight_fetch(self, price_cache):
+        """Снимок, прочитанный до сброса, не сохраняется в памяти."""
+        local = LocalPriceCache(price_cache, ttl=60)
+        fetching, release = asyncio.Event(), asyncio.Event()
+        get_snapshot = price_cache.get_snapshot
+
+        async def slow_snapshot():
+            snapshot = await get_snapshot()
+            fetching.set()
+            await release.wait()
+            return snapshot
+
+        price_cache.get_snapshot = slow_snapshot
+        reader = asyncio.create_task(local.get_snapshot())
+        await fetching.wait()
+        local.invalidate()
+        release.set()
+
+        assert (await reader).prices == {"SBER": 250.0}
+        assert local.get_fresh() is None
+
+    async def test_meta_miss_does_not_read_prices(self, price_cache):
+        """Промах get_meta читает только метаданные, без снимка цен."""
+        local = LocalPriceCache(price_cache, ttl=60)
+
+        async def no_snapshot():
+            raise AssertionError("HGETALL при промахе get_meta")
+
+        price_cache.get_snapshot = no_snapshot
+
+        version, updated_at, _ = await local.get_meta()
+
+        assert version == 1 and updated_at is not None
+        assert local.misses == 0
+
+    async def test_published_update_resets_snapshot(self, price_cache):
+        """Сообщение канала обновлений сбрасывает снимок в памяти."""
+        local = LocalPriceCache(price_cache, ttl=60)
+        stop_event = asyncio.Event()
+        listener = asyncio.create_task(
+            local.listen_invalidations(stop_event))
+        try:
+            # Подписка начинается со сброса снимка
+            while local.invalidations == 0:
+                await asyncio.sleep(0.01)
+            await local.get_snapshot()
+            assert local.get_fresh() is not None
+
+            await price_cache.save_prices({"SBER": 251.0})
+            for _ in range(100):
+                if local.get_fresh() is None:
+                    break
+                await asyncio.sleep(0.01)
+
+            assert local.get_fresh() is None
+            assert (await local.get_snapshot()).prices == {"SBER": 251.0}
+        finally:
+            stop_event.set()
+            await asyncio.wait_for(listener, 3)
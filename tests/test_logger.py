@@ -0,0 +1,90 @@
+"""Модуль тестирует настройку логирования."""
+
+import json
+import logging
+import sys
+
+import pytest
+
+from alert_price.utils.logger import (
+    JsonFormatter, ensure_logging, parse_levels, setup_logging,
+    stop_logging)
+
+
+@pytest.fixture
+def root_logger():
+    """Корневой логгер, восстанавливаемый после теста."""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield root
+    stop_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+class TestLogging:
+    """Набор тестов для модуля логирования."""
+
+    def test_json_record_keeps_extra_and_traceback(self):
+        """Запись JSON содержит поля extra и трассировку исключения."""
+        try:
+            raise ValueError("нет цены")
+        except ValueError:
+            record = logging.getLogger("poller").makeRecord(
+                "poller", logging.ERROR, __file__, 1, "Тикер %s", ("SBER",),
+                sys.exc_info(), extra={"board": "TQBR"})
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert entry["message"] == "Тикер SBER"
+        assert entry["level"] == "ERROR"
+        assert entry["board"] == "TQBR"
+        assert "ValueError: нет цены" in entry["exc_info"]
+
+    def test_module_levels_are_parsed(self):
+        """Уровни модулей задаются строкой "модуль=УРОВЕНЬ,..."."""
+        assert parse_levels("a.b=warning, c=DEBUG,") == {
+            "a.b": logging.WARNING, "c": logging.DEBUG}
+        with pytest.raises(ValueError):
+            parse_levels("a=LOUD")
+
+    def test_records_are_written_by_listener(
+        self, root_logger, tmp_path, monkeypatch
+    ):
+        """Записи попадают в файл через очередь, уровни модулей учтены."""
+        monkeypatch.setenv("LOG_LEVELS", "noisy=WARNING")
+        setup_logging(json_format=True, log_dir=tmp_path)
+
+        logging.getLogger("noisy").info("цикл опроса")
+        logging.getLogger("poller").info("цены %s", 42)
+        stop_logging()
+
+        lines = (tmp_path / "app.log").read_text(encoding="utf-8")
+        assert [json.loads(line)["message"]
+                for line in lines.splitlines()] == ["цены 42"]
+
+    def test_uvicorn_loggers_write_through_queue(
+        self, root_logger, tmp_path, monkeypatch
+    ):
+        """Записи uvicorn, настроенного CLI, попадают в файл журнала."""
+        access = logging.getLogger("uvicorn.access")
+        handlers, propagate = access.handlers[:], access.propagate
+        access.addHandler(logging.StreamHandler())
+        access.propagate = False
+        monkeypatch.setenv("LOG_DIR", str(tmp_path))
+        try:
+            ensure_logging()
+            ensure_logging()
+
+            assert access.handlers == [] and access.propagate
+            access.info("GET /api/prices 200")
+            stop_logging()
+        finally:
+            access.handlers[:] = handlers
+            access.propagate = propagate
+
+        assert "GET /api/prices 200" in (tmp_path / "app.log").read_text(
+            encoding="utf-8")
@@ -0,0 +1,72 @@
+"""Модуль тестирует метрики в формате Prometheus."""
+
+import pytest
+
+from alert_price.utils.metrics import (
+    Counter, Histogram, Registry, _Metric, timed)
+
+
+@pytest.fixture
+def registry():
+    """Пустой реестр метрик."""
+    return Registry()
+
+
+class TestMetrics:
+    """Набор тестов метрик и их текстового представления."""
+
+    def test_counter_is_rendered_per_label_set(self, registry):
+        """Значения счетчика выводятся для каждого набора меток."""
+        responses = Counter("moex_responses", "Ответы MOEX",
+                            ("board", "status"), registry=registry)
+        responses.labels("TQBR", "200").inc()
+        responses.labels("TQBR", "200").inc()
+        responses.labels("TQTF", "500").inc()
+
+        assert registry.render().splitlines() == [
+            "# HELP moex_responses_total Ответы MOEX",
+            "# TYPE moex_responses_total counter",
+            'moex_responses_total{board="TQBR",status="200"} 2.0',
+            'moex_responses_total{board="TQTF",status="500"} 1.0',
+        ]
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """Корзины гистограммы накопительные, последняя - +Inf."""
+        latency = Histogram("latency_seconds", "Задержка",
+                            buckets=(0.1, 1.0), registry=registry)
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+
+        lines = registry.render().splitlines()[2:]
+        assert lines == [
+            'latency_seconds_bucket{le="0.1"} 2',
+            'latency_seconds_bucket{le="1.0"} 3',
+            'latency_seconds_bucket{le="+Inf"} 4',
+            "latency_seconds_sum 3.65",
+            "latency_seconds_count 4",
+        ]
+
+    async def test_timed_records_failed_calls(self, registry):
+        """Длительность сопрограммы записывается и при исключении."""
+        operations = Histogram("operation_seconds", "Операции",
+                               ("operation",), registry=registry)
+
+        @timed(operations, "save")
+        async def save():
+            raise ConnectionError
+
+        with pytest.raises(ConnectionError):
+            await save()
+
+        assert sum(operations.labels("save").counts) == 1
+
+    def test_metric_base_is_abstract(self, registry):
+        """Метрика без _new_child и _samples не создается."""
+        with pytest.raises(TypeError):
+            _Metric("broken", "Без значений", registry=registry)
+
+    def test_duplicate_metric_is_rejected(self, registry):
+        """Имя метрики в реестре уникально."""
+        Counter("polls", "Циклы", registry=registry)
+        with pytest.raises(ValueError):
+            Counter("polls", "Циклы", registry=registry)
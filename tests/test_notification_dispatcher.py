@@ -0,0 +1,104 @@
+"""Модуль тестирует диспетчер оповещений NotificationDispatcher."""
+
+from datetime import datetime
+
+from alert_price.services.alert_engine import CrossingEvent
+from alert_price.services.notification_dispatcher import (
+    NotificationDispatcher)
+
+
+class MemorySink:
+    """Получатель, сохраняющий пачки в памяти (первые fail - с ошибкой)."""
+
+    name = "memory"
+
+    def __init__(self, fail: int = 0):
+        self.batches = []
+        self.fail = fail
+
+    async def send(self, events):
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("получатель недоступен")
+        self.batches.append(list(events))
+
+
+def crossing(alert_id=1, price=239.9, direction="buy", threshold=240.0):
+    """Событие пересечения порога SBER."""
+    return CrossingEvent(alert_id, "SBER", direction, threshold, price,
+                         240.1, datetime(2024, 5, 10, 10, 0))
+
+
+def dispatcher(sink, **kwargs):
+    """Диспетчер без задержек пачек и повторов."""
+    options = dict(queue_size=10, workers=1, cooldown=0, hysteresis=0.01,
+                   batch_size=10, batch_wait=0, retries=2, retry_delay=0)
+    options.update(kwargs)
+    return NotificationDispatcher([sink], **options)
+
+
+class TestNotificationDispatcher:
+    """Набор тестов для класса NotificationDispatcher."""
+
+    async def test_oscillating_price_is_notified_once(self):
+        """Порог срабатывает снова, только когда цена отошла от него."""
+        sink = MemorySink()
+        notifier = dispatcher(sink)
+
+        notifier.dispatch([crossing()], {"SBER": 239.9})
+        notifier.dispatch([crossing(price=239.8)], {"SBER": 239.8})
+        # 240.5 не выходит за полосу 1% - порог не взведен
+        notifier.dispatch([crossing(price=239.7)], {"SBER": 240.5})
+        notifier.dispatch([crossing(price=239.6)], {"SBER": 243.0})
+        notifier.start()
+        await notifier.join()
+        await notifier.close()
+
+        assert [[e.price for e in batch] for batch in sink.batches] == [
+            [239.9, 239.6]]
+        assert notifier.suppressed == 2
+
+    async def test_cooldown_suppresses_repeated_alert(self):
+        """До истечения cooldown порог не срабатывает даже взведенным."""
+        notifier = dispatcher(MemorySink(), cooldown=3600)
+
+        notifier.dispatch([crossing()], {"SBER": 239.9})
+        notifier.dispatch([crossing(price=239.0)], {"SBER": 250.0})
+
+        assert notifier.stats["memory"].enqueued == 1
+        assert notifier.suppressed == 1
+
+    async def test_failed_batch_is_retried(self):
+        """Неудачная отправка повторяется, пачка доставляется целиком."""
+        sink = MemorySink(fail=1)
+        notifier = dispatcher(sink)
+        notifier.dispatch([crossing(1), crossing(2)], {})
+
+        notifier.start()
+        await notifier.join()
+        await notifier.close()
+
+        stats = notifier.stats["memory"]
+        assert [len(batch) for batch in sink.batches] == [2]
+        assert (stats.sent, stats.retries, stats.failed) == (2, 1, 0)
+
+    async def test_undeliverable_batch_is_counted(self):
+        """После всех повторов пачка учитывается как недоставленная."""
+        notifier = dispatcher(MemorySink(fail=3))
+        notifier.dispatch([crossing()], {})
+
+        notifier.start()
+        await notifier.join()
+        await notifier.close()
+
+        assert notifier.stats["memory"].failed == 1
+
+    def test_full_queue_drops_without_blocking(self):
+        """Переполненная очередь отбрасывает оповещения, не блокируя."""
+        notifier = dispatcher(MemorySink(), queue_size=2)
+
+        notifier.dispatch([crossing(alert_id) for alert_id in range(5)])
+
+        status = notifier.status()["sinks"]["memory"]
+        assert (status["queued"], status["enqueued"],
+                status["dropped"]) == (2, 2, 3)
@@ -0,0 +1,58 @@
+"""Модуль тестирует свертку цен в свечи OHLC и прореживание LTTB."""
+
+from alert_price.services.ohlc_rollup import (
+    MOSCOW_OFFSET, Bar, OHLCRollup, bucket_start)
+from alert_price.utils.downsample import lttb
+
+# Полночь по Москве (2024-05-10 00:00 MSK)
+MIDNIGHT = 1715288400
+
+
+class TestOHLCRollup:
+    """Набор тестов свертки в свечи."""
+
+    def test_bucket_start_uses_moscow_days(self):
+        """Дневные свечи начинаются в полночь по Москве."""
+        assert (MIDNIGHT + MOSCOW_OFFSET) % 86400 == 0
+        assert bucket_start(MIDNIGHT + 5 * 3600, 86400) == MIDNIGHT
+        assert bucket_start(MIDNIGHT + 61, 60) == MIDNIGHT + 60
+
+    def test_update_builds_and_closes_bars(self):
+        """Цены внутри интервала меняют свечу, новая минута ее закрывает."""
+        rollup = OHLCRollup(redis_client=None, intervals={"1m": 60})
+        for offset, price in ((0, 100.0), (10, 105.0), (20, 95.0),
+                              (30, 101.0), (65, 102.0)):
+            rollup.update({"SBER": price}, MIDNIGHT + offset)
+
+        assert rollup._closed == [
+            ("1m", "SBER", Bar(MIDNIGHT, 100.0, 105.0, 95.0, 101.0))]
+        assert rollup._current["1m"]["SBER"] == Bar(
+            MIDNIGHT + 60, 102.0, 102.0, 102.0, 102.0)
+
+    def test_bar_pack_roundtrip(self):
+        """Свеча сохраняется в Redis без потери точности."""
+        bar = Bar(MIDNIGHT, 0.1, 0.30000000000000004, 0.05, 0.2)
+
+        assert Bar.unpack(bar.pack().encode()) == bar
+
+
+class TestLttb:
+    """Набор тестов прореживания LTTB."""
+
+    def test_keeps_ends_and_extremes(self):
+        """Крайние точки и пик сохраняются при сильном прореживании."""
+        points = [(x, 0.0) for x in range(1000)]
+        points[500] = (500, 100.0)
+
+        sampled = lttb(points, 10)
+
+        assert len(sampled) == 10
+        assert sampled[0] == points[0] and sampled[-1] == points[-1]
+        assert (500, 100.0) in sampled
+        assert [x for x, _ in sampled] == sorted(x for x, _ in sampled)
+
+    def test_short_series_is_unchanged(self):
+        """Ряд короче порога возвращается целиком."""
+        points = [(0, 1.0), (1, 2.0)]
+
+        assert lttb(points, 10) == points
@@ -0,0 +1,84 @@
+"""Модуль тестирует прием заголовка владельца X-Owner-Id."""
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+
+from alert_price.api.owner_auth import OwnerAuth
+from alert_price.api.routers import router
+from alert_price.api.schemas import TrackingParameters
+from alert_price.services.database_gateway import DatabaseGateway
+
+
+@pytest_asyncio.fixture
+async def app(tmp_path):
+    """Приложение со списками общего владельца и владельца alice."""
+    async with DatabaseGateway(tmp_path / "test.db", readers=1) as db:
+        await db.save_share(TrackingParameters(
+            ticker="SBER", buy_price=240, sell_price=260))
+        await db.save_share(TrackingParameters(
+            ticker="GAZP", buy_price=150, sell_price=200), "alice")
+        application = FastAPI()
+        application.include_router(router)
+        application.state.database = db
+        application.state.owner_auth = OwnerAuth()
+        yield application
+
+
+async def tickers(app: FastAPI, **headers) -> httpx.Response:
+    """Запрос списка отслеживания с адреса 127.0.0.1."""
+    transport = httpx.ASGITransport(app=app, client=("127.0.0.1", 5000))
+    async with httpx.AsyncClient(transport=transport,
+                                 base_url="http://test") as http:
+        return await http.get("/api/tracked-stocks", headers={
+            key.replace("_", "-"): value for key, value in headers.items()})
+
+
+class TestOwnerAuth:
+    """Набор тестов доверия заголовку X-Owner-Id."""
+
+    async def test_header_is_rejected_without_trusted_proxy(self, app):
+        """Без настроенного прокси X-Owner-Id отклоняется, а запрос без
+        него получает общий список."""
+        spoofed = await tickers(app, X_Owner_Id="alice")
+        shared = await tickers(app)
+
+        assert spoofed.status_code == 403
+        assert [row["ticker"] for row in shared.json()] == ["SBER"]
+
+    async def test_shared_secret_is_required(self, app):
+        """С секретом прокси заголовок принимается, без него - нет."""
+        app.state.owner_auth = OwnerAuth(secret="s3cret")
+
+        trusted = await tickers(app, X_Owner_Id="alice",
+                                X_Proxy_Secret="s3cret")
+        wrong = await tickers(app, X_Owner_Id="alice",
+                              X_Proxy_Secret="guess")
+        missing = await tickers(app, X_Owner_Id="alice")
+
+        assert [row["ticker"] for row in trusted.json()] == ["GAZP"]
+        assert wrong.status_code == missing.status_code == 403
+
+    async def test_trusted_proxy_network(self, app):
+        """Заголовок принимается только с адреса доверенной сети."""
+        app.state.owner_auth = OwnerAuth(trusted_proxies=["127.0.0.0/8"])
+        trusted = await tickers(app, X_Owner_Id="alice")
+        app.state.owner_auth = OwnerAuth(trusted_proxies=["10.0.0.0/8"])
+        outside = await tickers(app, X_Owner_Id="alice")
+
+        assert [row["ticker"] for row in trusted.json()] == ["GAZP"]
+        assert outside.status_code == 403
+
+    def test_configuration_from_env(self, monkeypatch):
+        """Настройки читаются из окружения, ошибка в сети - ValueError."""
+        monkeypatch.setenv("OWNER_TRUSTED_PROXIES", "10.0.0.5, fd00::/8")
+        monkeypatch.delenv("OWNER_PROXY_SECRET", raising=False)
+        auth = OwnerAuth.from_env()
+
+        assert auth.enabled and auth.secret is None
+        assert auth.is_trusted("fd00::1", None)
+        assert not auth.is_trusted("10.0.0.6", None)
+        assert not OwnerAuth().enabled
+        with pytest.raises(ValueError):
+            OwnerAuth(trusted_proxies=["10.0.0.300"])
@@ -0,0 +1,124 @@
+"""Модуль тестирует планировщик опросов MOEX."""
+
+import random
+from datetime import date, datetime
+
+import pytest
+
+from alert_price.services.poll_scheduler import (
+    MOSCOW_TZ, PollScheduler, TradingCalendar)
+
+
+def msk(*args) -> datetime:
+    """Возвращает момент по московскому времени."""
+    return datetime(*args, tzinfo=MOSCOW_TZ)
+
+
+class FakeClock:
+    """Управляемые монотонные часы."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Фикстура с управляемыми часами.
+
+    Returns:
+        FakeClock: Часы, начинающиеся с 1000 сек
+    """
+    return FakeClock()
+
+
+def make_scheduler(clock, wall, **kwargs) -> PollScheduler:
+    """Создает планировщик с фиксированным временем и разбросом."""
+    return PollScheduler(clock=clock, wall_clock=lambda: wall,
+                         rng=random.Random(1), **kwargs)
+
+
+class TestTradingCalendar:
+    """Набор тестов для класса TradingCalendar."""
+
+    @pytest.mark.parametrize("moment, phase", [
+        (msk(2026, 10, 14, 7, 30), TradingCalendar.PRE_OPEN),
+        (msk(2026, 10, 14, 12, 0), TradingCalendar.MAIN),
+        (msk(2026, 10, 14, 18, 55), TradingCalendar.CLOSED),
+        (msk(2026, 10, 14, 20, 0), TradingCalendar.EVENING),
+        (msk(2026, 10, 14, 3, 0), TradingCalendar.CLOSED),
+        (msk(2026, 10, 17, 12, 0), TradingCalendar.CLOSED),
+    ])
+    def test_phase(self, moment, phase):
+        """Фаза определяется по сессиям и дням недели."""
+        assert TradingCalendar().phase(moment) == phase
+
+    def test_holiday_is_closed(self):
+        """Праздничный будний день считается закрытым."""
+        calendar = TradingCalendar(holidays=[date(2026, 11, 4)])
+
+        assert calendar.phase(msk(2026, 11, 4, 12, 0)) == "closed"
+
+    def test_seconds_until_change(self):
+        """Время до смены фазы считается до ближайшей границы сессии."""
+        calendar = TradingCalendar()
+
+        assert calendar.seconds_until_change(msk(2026, 10, 14, 9, 59)) == 60
+
+
+class TestPollScheduler:
+    """Набор тестов для класса PollScheduler."""
+
+    def test_fixed_rate_accounts_for_cycle_time(self, clock):
+        """Интервал отсчитывается от начала цикла, а не от его конца."""
+        scheduler = make_scheduler(clock, msk(2026, 10, 14, 12, 0))
+        scheduler.start_cycle()
+        clock.now += 4
+        scheduler.record_success()
+
+        assert scheduler.next_delay() == pytest.approx(26)
+
+    def test_slow_cycle_does_not_sleep(self, clock):
+        """Если цикл дольше интервала, следующий начинается сразу."""
+        scheduler = make_scheduler(clock, msk(2026, 10, 14, 12, 0))
+        scheduler.start_cycle()
+        clock.now += 45
+
+        assert scheduler.next_delay() == 0
+
+    def test_closed_market_sleeps_until_open(self, clock):
+        """Ночью пауза длинная, но не дольше начала утренней сессии."""
+        scheduler = make_scheduler(clock, msk(2026, 10, 14, 6, 45))
+        scheduler.start_cycle()
+
+        assert scheduler.phase == "closed"
+        assert scheduler.next_delay() == pytest.approx(300)
+
+    def test_backoff_grows_with_jitter(self, clock):
+        """Пауза после ошибок растет и ограничена backoff_max."""
+        scheduler = make_scheduler(clock, msk(2026, 10, 14, 12, 0),
+                                   backoff_base=5, backoff_max=40)
+        delays = []
+        for _ in range(6):
+            scheduler.start_cycle()
+            scheduler.record_failure()
+            delays.append(scheduler.next_delay())
+
+        for failures, delay in enumerate(delays, start=1):
+            ceiling = min(5 * 2 ** (failures - 1), 40)
+            assert ceiling / 2 <= delay <= ceiling
+
+        scheduler.start_cycle()
+        scheduler.record_success()
+        assert scheduler.next_delay() == pytest.approx(30)
+
+    def test_fast_cadence_near_threshold(self, clock):
+        """Рядом с порогом во время торгов опрос ускоряется."""
+        scheduler = make_scheduler(clock, msk(2026, 10, 14, 12, 0),
+                                   fast_cadence=10)
+        scheduler.start_cycle()
+        scheduler.record_success(near_threshold=True)
+
+        assert scheduler.next_delay() == pytest.approx(10)
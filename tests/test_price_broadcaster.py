@@ -0,0 +1,52 @@
+"""Модуль тестирует класс PriceBroadcaster."""
+
+import asyncio
+
+import pytest
+
+from alert_price.services.price_broadcaster import PriceBroadcaster
+
+pytestmark = pytest.mark.asyncio
+
+
+class TestPriceBroadcaster:
+    """Набор тестов для класса PriceBroadcaster."""
+
+    async def test_subscriber_receives_published_snapshot(self):
+        """Подписчик получает кадр retry и затем опубликованный снимок."""
+        broadcaster = PriceBroadcaster()
+        stream = broadcaster.subscribe()
+
+        assert (await anext(stream)).startswith(b"retry:")
+        next_frame = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+
+        broadcaster.publish({"prices": {"SBER": 250.5}})
+        frame = await next_frame
+
+        assert frame.startswith(b"event: prices\n")
+        assert b'"SBER":250.5' in frame
+        await stream.aclose()
+        assert broadcaster.subscribers_count == 0
+
+    async def test_slow_subscriber_gets_latest_snapshot(self):
+        """Медленный подписчик пропускает устаревшие снимки."""
+        broadcaster = PriceBroadcaster()
+        stream = broadcaster.subscribe()
+        await anext(stream)
+
+        broadcaster.publish({"prices": {"SBER": 1}})
+        broadcaster.publish({"prices": {"SBER": 2}})
+
+        assert b'"SBER":2' in await anext(stream)
+        assert broadcaster.dropped == 1
+        await stream.aclose()
+
+    async def test_heartbeat_without_updates(self):
+        """При отсутствии снимков отправляется heartbeat."""
+        broadcaster = PriceBroadcaster(heartbeat_interval=0.01)
+        stream = broadcaster.subscribe()
+        await anext(stream)
+
+        assert await anext(stream) == PriceBroadcaster.HEARTBEAT_FRAME
+        await stream.aclose()
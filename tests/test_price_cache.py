@@ -0,0 +1,100 @@
+"""Модуль тестирует кеш цен PriceCache в Redis."""
+
+import pytest_asyncio
+from fakeredis.aioredis import FakeRedis
+
+from alert_price.services.price_cache import PriceCache
+
+
+@pytest_asyncio.fixture
+async def redis():
+    """Пустой Redis в памяти."""
+    client = FakeRedis()
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+class TestPriceCache:
+    """Набор тестов для класса PriceCache."""
+
+    async def test_unchanged_prices_keep_version(self, redis):
+        """Цикл без изменений обновляет только время, не версию."""
+        cache = PriceCache(redis)
+        await cache.save_prices({"SBER": 250.0, "GAZP": 180.0})
+        _, first_update, _ = await cache.get_meta()
+
+        assert await cache.save_prices({"SBER": 250.0, "GAZP": 180.0})
+
+        version, updated_at, _ = await cache.get_meta()
+        assert version == 1 and updated_at >= first_update
+        assert cache.last_changes == {}
+        assert await redis.llen(cache.changelog_key) == 1
+
+    async def test_only_changed_prices_are_written(self, redis):
+        """В журнал и хеш попадают только изменившиеся цены."""
+        cache = PriceCache(redis)
+        await cache.save_prices({"SBER": 250.0, "GAZP": 180.0})
+
+        await cache.save_prices({"SBER": 251.0, "GAZP": 180.0})
+
+        assert cache.last_changes == {"SBER": 251.0}
+        assert (await cache.get_snapshot()).prices == {
+            "SBER": 251.0, "GAZP": 180.0}
+
+    async def test_removed_tickers_are_deleted(self, redis):
+        """remove_prices удаляет тикеры и записывает удаление в журнал."""
+        cache = PriceCache(redis)
+        await cache.save_prices({"SBER": 250.0, "GAZP": 180.0})
+
+        assert await cache.remove_prices(["GAZP", "NOPE"])
+
+        snapshot = await cache.get_snapshot()
+        assert snapshot.prices == {"SBER": 250.0} and snapshot.version == 2
+        changes, full = await cache.get_changes_since(1)
+        assert changes.prices == {"GAZP": None} and not full
+        # Тикеров нет в кеше - версия не меняется
+        assert await cache.remove_prices(["GAZP"])
+        assert (await cache.get_meta())[0] == 2
+
+    async def test_changes_since_returns_newer_versions(self, redis):
+        """Возвращаются изменения после версии клиента, последние
+        значения перекрывают ранние."""
+        cache = PriceCache(redis)
+        await cache.save_prices({"SBER": 250.0, "GAZP": 180.0})
+        await cache.save_prices({"SBER": 251.0})
+        await cache.save_prices({"SBER": 252.0, "LKOH": 7000.0})
+
+        changes, full = await cache.get_changes_since(1)
+        current, _ = await cache.get_changes_since(3)
+
+        assert not full and changes.version == 3
+        assert changes.prices == {"SBER": 252.0, "LKOH": 7000.0}
+        assert current.prices == {} and current.version == 3
+
+    async def test_old_version_gets_full_snapshot(self, redis):
+        """Клиент старше журнала (или из будущего) получает весь снимок."""
+        cache = PriceCache(redis, changelog_size=2)
+        for price in (250.0, 251.0, 252.0, 253.0):
+            await cache.save_prices({"SBER": price, "GAZP": 180.0})
+
+        stale, stale_full = await cache.get_changes_since(1)
+        ahead, ahead_full = await cache.get_changes_since(10)
+
+        assert stale_full and ahead_full
+        assert stale.prices == ahead.prices == {"SBER": 253.0, "GAZP": 180.0}
+        assert stale.version == 4
+
+    async def test_prices_for_reports_missing_tickers(self, redis):
+        """HMGET пачками возвращает найденные цены и список отсутствующих."""
+        cache = PriceCache(redis)
+        await cache.save_prices({"SBER": 250.0, "GAZP": 180.0,
+                                 "LKOH": 7000.0})
+
+        snapshot, missing = await cache.get_prices_for(
+            ["LKOH", "NOPE", "SBER", "YNDX"], batch_size=3)
+
+        assert snapshot.prices == {"LKOH": 7000.0, "SBER": 250.0}
+        assert missing == ["NOPE", "YNDX"]
+        assert snapshot.version == 1 and snapshot.updated_at is not None
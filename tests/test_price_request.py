@@ -1,8 +1,10 @@
 """Модуль тестирует класс PriceRequest."""
 
 import pytest
+from yarl import URL
 
-from alert_price.services.prices_request import PriceRequest
+from alert_price.services.prices_request import (
+    PriceRequest, create_moex_session, parse_sources)
 
 pytestmark = pytest.mark.asyncio
 
@@ -139,3 +141,79 @@ class TestPriceRequest:
 
         with pytest.raises(ValueError):
             await price_request.request_share_sber()
+
+    async def test_check_health_records_result(
+        self,
+        price_request,
+        mock_aioresponse,
+        sber_response_data
+    ):
+        """Проверка доступности запоминает результат и ошибку.
+
+        Args:
+            price_request: Фикстура клиента PriceRequest
+            mock_aioresponse: Фикстура мокирования HTTP-запросов
+            sber_response_data: Фикстура с тестовыми данными SBER
+        """
+        mock_aioresponse.get(PriceRequest.SHARE_SBER_URL,
+                             payload=sber_response_data)
+        mock_aioresponse.get(PriceRequest.SHARE_SBER_URL, status=500)
+
+        assert await price_request.check_health() is True
+        assert await price_request.check_health() is False
+        assert price_request.last_health_error is not None
+        assert price_request.last_health_check is not None
+
+    async def test_request_securities_skips_health_probe(
+        self,
+        price_request,
+        mock_aioresponse
+    ):
+        """Запрос котировок не обращается к SBER перед основным запросом.
+
+        Args:
+            price_request: Фикстура клиента PriceRequest
+            mock_aioresponse: Фикстура мокирования HTTP-запросов
+        """
+        mock_aioresponse.get(PriceRequest.SHARE_URL,
+                             payload={"marketdata": {"data": []}})
+
+        await price_request.request_securities()
+
+        assert [url.path for _, url in mock_aioresponse.requests] == [
+            URL(PriceRequest.SHARE_URL).path]
+
+    async def test_shared_session_is_not_closed(self):
+        """Клиент не закрывает переданную ему сессию приложения."""
+        session = create_moex_session()
+        try:
+            async with PriceRequest(session) as pr:
+                assert pr.session is session
+            assert not session.closed
+        finally:
+            await session.close()
+
+    async def test_boards_are_namespaced_and_isolated(
+        self,
+        mock_aioresponse
+    ):
+        """Режимы торгов запрашиваются вместе, ошибка одного не мешает.
+
+        Args:
+            mock_aioresponse: Фикстура мокирования HTTP-запросов
+        """
+        sources = parse_sources(
+            "stock/shares/TQBR,stock/shares/TQTF,stock/bonds/TQOB@2")
+        mock_aioresponse.get(sources[0].url, payload={
+            "marketdata": {"data": [["SBER", 250.5]]}})
+        mock_aioresponse.get(sources[1].url, payload={
+            "marketdata": {"data": [["FXGD", 12.3]]}})
+        mock_aioresponse.get(sources[2].url, status=500)
+
+        async with PriceRequest(sources=sources, concurrency=2) as pr:
+            await pr.request_securities()
+            quotes = await pr.generates_quotes_dictionary()
+
+        assert sources[2].timeout == 2
+        assert quotes == {"SBER": 250.5, "TQTF:FXGD": 12.3}
+        assert list(pr.source_errors) == ["TQOB"]
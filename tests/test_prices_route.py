@@ -0,0 +1,142 @@
+"""Модуль тестирует маршрут /api/prices: условные запросы и фильтр tickers."""
+
+import asyncio
+
+import httpx
+import pytest_asyncio
+from fakeredis.aioredis import FakeRedis
+from fastapi import FastAPI
+
+from alert_price.api.routers import _parse_tickers, router
+from alert_price.services.event_loop_handler import POLL_INTERVAL
+from alert_price.services.price_cache import PriceCache
+
+
+@pytest_asyncio.fixture
+async def price_cache():
+    """Кеш цен в Redis в памяти с ценами SBER и GAZP."""
+    redis = FakeRedis()
+    cache = PriceCache(redis)
+    await cache.save_prices({"SBER": 250.0, "GAZP": 180.0})
+    try:
+        yield cache
+    finally:
+        await redis.aclose()
+
+
+@pytest_asyncio.fixture
+async def client(price_cache):
+    """Клиент приложения с маршрутами и кешем цен без L1-кеша."""
+    app = FastAPI()
+    app.include_router(router)
+    app.state.price_cache = price_cache
+    app.state.price_reader = price_cache
+    app.state.local_price_cache = None
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport,
+                                 base_url="http://test") as http:
+        yield http
+
+
+def max_age(response: httpx.Response) -> int:
+    """Значение max-age заголовка Cache-Control."""
+    directives = dict(item.strip().partition("=")[::2] for item in
+                      response.headers["cache-control"].split(","))
+    return int(directives["max-age"])
+
+
+class TestPricesRoute:
+    """Набор тестов маршрута /api/prices."""
+
+    async def test_matching_etag_gets_304(self, client):
+        """Повтор с If-None-Match получает 304 с тем же ETag."""
+        first = await client.get("/api/prices")
+        etag = first.headers["etag"]
+
+        second = await client.get("/api/prices",
+                                  headers={"If-None-Match": etag})
+        weak = await client.get("/api/prices",
+                                headers={"If-None-Match": f"W/{etag}"})
+
+        assert first.status_code == 200
+        assert first.json()["prices"] == {"SBER": 250.0, "GAZP": 180.0}
+        assert second.status_code == weak.status_code == 304
+        assert second.headers["etag"] == etag and second.content == b""
+
+    async def test_poll_without_changes_changes_etag(
+        self, client, price_cache
+    ):
+        """Опрос без изменений цен меняет last_updated, а значит и ETag."""
+        first = await client.get("/api/prices")
+        await asyncio.sleep(0.01)
+        await price_cache.save_prices({"SBER": 250.0, "GAZP": 180.0})
+
+        second = await client.get(
+            "/api/prices", headers={"If-None-Match": first.headers["etag"]})
+
+        assert second.status_code == 200
+        assert second.json()["version"] == first.json()["version"]
+        assert second.json()["last_updated"] != first.json()["last_updated"]
+        assert second.headers["etag"] != first.headers["etag"]
+
+    async def test_incremental_response_has_own_etag(
+        self, client, price_cache
+    ):
+        """Ответ ?since= помечается отдельным ETag."""
+        full = await client.get("/api/prices")
+        await price_cache.save_prices({"SBER": 251.0, "GAZP": 180.0})
+
+        changes = await client.get("/api/prices?since=1")
+        repeat = await client.get(
+            "/api/prices?since=1",
+            headers={"If-None-Match": changes.headers["etag"]})
+
+        assert changes.json()["prices"] == {"SBER": 251.0}
+        assert changes.headers["etag"] != full.headers["etag"]
+        assert repeat.status_code == 304
+
+    async def test_max_age_follows_scheduled_poll(self, client, price_cache):
+        """max-age равен времени до опроса, назначенного поллером."""
+        default = await client.get("/api/prices")
+        await price_cache.set_next_poll(5)
+        fast = await client.get("/api/prices")
+        await price_cache.set_next_poll(600)
+        closed = await client.get(
+            "/api/prices", headers={"If-None-Match": fast.headers["etag"]})
+
+        assert 0 <= max_age(default) <= POLL_INTERVAL
+        assert 3 <= max_age(fast) <= 5
+        assert closed.status_code == 304
+        assert 598 <= max_age(closed) <= 600
+
+    def test_ticker_filter_is_normalized(self):
+        """Тикеры приводятся к верхнему регистру, повторы и пустые
+        элементы отбрасываются, порядок запроса сохраняется."""
+        assert _parse_tickers(" gazp,SBER,,sber , Gazp") == ["GAZP", "SBER"]
+        assert _parse_tickers(None) is None
+        assert _parse_tickers(",") == []
+
+    async def test_filtered_response_lists_missing(self, client):
+        """Фильтр tickers возвращает найденные цены и missing."""
+        response = await client.get("/api/prices?tickers=sber,NOPE,sber")
+
+        assert response.json()["prices"] == {"SBER": 250.0}
+        assert response.json()["missing"] == ["NOPE"]
+
+    async def test_filtered_response_has_own_etag(self, client):
+        """ETag ответа с фильтром зависит от набора тикеров, но не от
+        регистра и повторов."""
+        full = await client.get("/api/prices")
+        filtered = await client.get("/api/prices?tickers=SBER,GAZP")
+        same = await client.get(
+            "/api/prices?tickers=sber,gazp,SBER",
+            headers={"If-None-Match": filtered.headers["etag"]})
+        other = await client.get(
+            "/api/prices?tickers=SBER",
+            headers={"If-None-Match": filtered.headers["etag"]})
+        unfiltered = await client.get(
+            "/api/prices", headers={"If-None-Match": filtered.headers["etag"]})
+
+        assert filtered.headers["etag"] != full.headers["etag"]
+        assert same.status_code == 304
+        assert other.status_code == unfiltered.status_code == 200
@@ -0,0 +1,82 @@
+"""Модуль тестирует хранилище тиков в Redis Streams."""
+
+import time
+
+import pytest_asyncio
+from fakeredis.aioredis import FakeRedis
+
+from alert_price.services.tick_store import TickStore
+
+
+@pytest_asyncio.fixture
+async def redis():
+    """Пустой Redis в памяти."""
+    client = FakeRedis()
+    try:
+        yield client
+    finally:
+        await client.aclose()
+
+
+def now_ms() -> int:
+    """Текущее время в миллисекундах, как в идентификаторах записей."""
+    return int(time.time() * 1000)
+
+
+class TestTickStore:
+    """Набор тестов для класса TickStore."""
+
+    async def test_ticks_are_read_in_time_order(self, redis):
+        """Тики возвращаются по возрастанию времени, пустой тикер - []."""
+        store = TickStore(redis)
+        for price in (250.5, 251.0, 249.75):
+            await store.append({"SBER": price})
+
+        ticks = await store.read(["SBER", "GAZP"])
+
+        assert [price for _, price in ticks["SBER"]] == [250.5, 251.0, 249.75]
+        times = [stamp for stamp, _ in ticks["SBER"]]
+        assert times == sorted(times)
+        assert ticks["GAZP"] == []
+
+    async def test_read_honours_limit_and_since(self, redis):
+        """limit оставляет последние тики, since отсекает ранние."""
+        store = TickStore(redis)
+        start = now_ms()
+        for offset, price in ((-3000, 1.0), (-2000, 2.0), (-1000, 3.0)):
+            await redis.xadd(store._key("SBER"), {"p": repr(price)},
+                             id=f"{start + offset}-0")
+
+        latest = await store.read(["SBER"], limit=2)
+        recent = await store.read(["SBER"], since=(start - 2000) / 1000)
+
+        assert latest["SBER"] == [(start - 2000, 2.0), (start - 1000, 3.0)]
+        assert recent["SBER"] == latest["SBER"]
+
+    async def test_stream_length_is_capped_by_maxlen(self, redis):
+        """В потоке хранится не больше maxlen последних тиков."""
+        store = TickStore(redis, maxlen=3)
+        for price in range(5):
+            await store.append({"SBER": float(price)})
+
+        assert await redis.xlen(store._key("SBER")) == 3
+        ticks = await store.read(["SBER"])
+        assert [price for _, price in ticks["SBER"]] == [2.0, 3.0, 4.0]
+
+    async def test_trim_drops_old_ticks_and_keeps_idle_ttl(self, redis):
+        """Очистка удаляет тики старше retention и не продлевает
+        срок жизни потоков без новых тиков."""
+        store = TickStore(redis, retention=3600, trim_every=2)
+        old_id = f"{now_ms() - 7200 * 1000}-0"
+        for ticker in ("SBER", "GAZP"):
+            await redis.xadd(store._key(ticker), {"p": "1.0"}, id=old_id)
+        await redis.expire(store._key("GAZP"), 60)
+
+        await store.append({"SBER": 2.0}, ["SBER", "GAZP"])
+        assert await redis.xlen(store._key("SBER")) == 2
+        await store.append({"SBER": 3.0}, ["SBER", "GAZP"])
+
+        assert await redis.xlen(store._key("SBER")) == 2
+        assert await redis.xlen(store._key("GAZP")) == 0
+        assert await redis.ttl(store._key("SBER")) > 3600
+        assert 0 < await redis.ttl(store._key("GAZP")) <= 60
@@ -0,0 +1,49 @@
+"""Модуль тестирует маршрут /api/tracked-stocks (страницы и курсор)."""
+
+import httpx
+import pytest_asyncio
+from fastapi import FastAPI
+
+from alert_price.api.routers import router
+from alert_price.api.schemas import TrackingParameters
+from alert_price.services.database_gateway import DatabaseGateway
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path):
+    """Клиент приложения со шлюзом на временной базе из пяти акций."""
+    async with DatabaseGateway(tmp_path / "test.db", readers=1) as db:
+        await db.save_shares(
+            TrackingParameters(ticker=f"T{i}", buy_price=1, sell_price=2)
+            for i in range(5))
+        app = FastAPI()
+        app.include_router(router)
+        app.state.database = db
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport,
+                                     base_url="http://test") as http:
+            yield http
+
+
+class TestTrackedStocksRoute:
+    """Набор тестов постраничной выдачи списка отслеживания."""
+
+    async def test_full_page_returns_next_cursor(self, client):
+        """Курсор полной страницы - ее последний тикер."""
+        first = await client.get("/api/tracked-stocks?limit=3")
+        cursor = first.headers["x-next-cursor"]
+        last = await client.get(f"/api/tracked-stocks?limit=3&after={cursor}")
+
+        assert [row["ticker"] for row in first.json()] == ["T0", "T1", "T2"]
+        assert cursor == "T2"
+        assert 'after=T2&limit=3>; rel="next"' in first.headers["link"]
+        assert [row["ticker"] for row in last.json()] == ["T3", "T4"]
+        assert "x-next-cursor" not in last.headers
+
+    async def test_exact_last_page_still_has_cursor(self, client):
+        """Страница ровно из limit строк дает курсор на пустую страницу."""
+        page = await client.get("/api/tracked-stocks?limit=5")
+        empty = await client.get("/api/tracked-stocks?limit=5&after=T4")
+
+        assert page.headers["x-next-cursor"] == "T4"
+        assert empty.json() == [] and "x-next-cursor" not in empty.headers
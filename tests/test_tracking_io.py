@@ -0,0 +1,60 @@
+"""Модуль тестирует разбор и выгрузку списка отслеживания."""
+
+import pytest
+
+from alert_price.services.tracking_io import (
+    encode_tracking_rows, parse_tracking_parameters)
+
+
+class TestTrackingIO:
+    """Набор тестов для модуля tracking_io."""
+
+    def test_csv_rows_are_validated_one_by_one(self):
+        """Некорректные строки отклоняются с номером строки."""
+        result = parse_tracking_parameters(
+            "ticker,buy_price,sell_price\n"
+            "SBER,240,260\n"
+            "GAZP,abc,200\n"
+            ",1,2\n"
+            "LKOH,-1,2\n",
+            "csv"
+        )
+
+        assert [p.ticker for p in result.parameters] == ["SBER"]
+        assert result.rejected == 3
+        assert [error["line"] for error in result.errors] == [3, 4, 5]
+
+    def test_csv_without_required_columns(self):
+        """CSV без обязательных колонок отклоняется целиком."""
+        with pytest.raises(ValueError, match="sell_price"):
+            parse_tracking_parameters("ticker,buy_price\nSBER,1\n", "csv")
+
+    def test_ndjson_reports_malformed_lines(self):
+        """Пустые строки пропускаются, некорректный JSON - ошибка строки."""
+        result = parse_tracking_parameters(
+            '{"ticker": "SBER", "buy_price": 240, "sell_price": 260}\n'
+            "\n"
+            "{oops\n",
+            "ndjson"
+        )
+
+        assert result.parameters[0].buy_price == 240.0
+        assert result.errors == [
+            {"line": 3, "error": result.errors[0]["error"]}]
+
+    def test_errors_are_capped(self):
+        """В ответ попадает не больше max_errors ошибок."""
+        result = parse_tracking_parameters("[]\n" * 5, "ndjson",
+                                           max_errors=2)
+
+        assert result.rejected == 5
+        assert len(result.errors) == 2
+
+    def test_encode_rows(self):
+        """Страница строк сериализуется в CSV и NDJSON."""
+        rows = [("SBER", "240", "260")]
+
+        assert encode_tracking_rows(rows, "csv", header=True) == (
+            b"ticker,buy_price,sell_price\nSBER,240,260\n")
+        assert encode_tracking_rows(rows, "ndjson") == (
+            b'{"ticker": "SBER", "buy_price": "240", "sell_price": "260"}\n')